@@ -6,6 +6,8 @@ Handles all HTTP requests for client operations including create, read, update,
 from typing import List, Optional
 
 from fastapi import APIRouter, Depends, Query, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 
 from app.auth.router import get_admin_user, get_current_user
@@ -17,6 +19,12 @@ from app.clients.schema import (
     ServiceUpdate,
 )
 from app.clients.service.client_service import ClientService
+from app.clients.service.logic import RECOMMENDATION_CHUNK_SIZE
+from app.clients.service.recommendation_service import (
+    MATERIALIZED_TOP_K,
+    get_client_recommendation,
+    stream_recommendations,
+)
 from app.database import get_db
 from app.models import User
 
@@ -152,6 +160,36 @@ async def get_clients_by_case_worker(
     return ClientService.get_clients_by_case_worker(db, case_worker_id)
 
 
+@router.get("/case-worker/{case_worker_id}/recommendations")
+async def stream_case_worker_recommendations(
+    case_worker_id: int,
+    top_k: int = Query(default=3, ge=1, le=128, description="Combinations per client"),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """Stream intervention recommendations for a case worker's clients as NDJSON"""
+    clients = ClientService.iter_clients_by_case_worker(
+        db, case_worker_id, RECOMMENDATION_CHUNK_SIZE
+    )
+    return StreamingResponse(
+        stream_recommendations(clients, top_k), media_type="application/x-ndjson"
+    )
+
+
+@router.get("/{client_id}/recommendations")
+async def get_client_recommendations(
+    client_id: int,
+    top_k: int = Query(
+        default=3, ge=1, le=MATERIALIZED_TOP_K, description="Number of combinations"
+    ),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """Get a client's stored intervention recommendation, refreshing it if stale"""
+    # Refreshing a stale row scores the model, so keep it off the event loop
+    return await run_in_threadpool(get_client_recommendation, db, client_id, top_k)
+
+
 @router.put("/{client_id}", response_model=ClientResponse)
 async def update_client(
     client_id: int,
@@ -160,7 +198,8 @@ async def update_client(
     db: Session = Depends(get_db),
 ):
     """Update a client's information"""
-    return ClientService.update_client(db, client_id, client_data)
+    # Changed answers are rescored, so keep the update off the event loop
+    return await run_in_threadpool(ClientService.update_client, db, client_id, client_data)
 
 
 @router.put("/{client_id}/services/{user_id}", response_model=ServiceResponse)
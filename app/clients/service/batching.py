@@ -0,0 +1,192 @@
+"""
+Micro-batching of single-row predictions.
+
+Concurrent single-row requests for the same model are collected and predicted with one
+vectorised call, then each waiting request receives its own row's prediction. Batching
+adapts to load. An idle model dispatches on the next event loop iteration, so a lone
+request is not delayed. While a batch for the model is running, new requests wait for it
+to finish, for the batching window to elapse or for the batch to fill, whichever is first.
+
+Enabled with PREDICT_MICRO_BATCHING=1; PREDICT_BATCH_MAX_SIZE and PREDICT_BATCH_WINDOW_MS
+tune the latency/throughput trade-off.
+"""
+
+# pylint: disable=too-few-public-methods, too-many-instance-attributes
+
+import asyncio
+import os
+import time
+from bisect import bisect_left
+
+import numpy as np
+from dotenv import load_dotenv
+
+load_dotenv()
+
+DEFAULT_MAX_BATCH_SIZE = 32
+DEFAULT_WINDOW_MS = 2.0
+# Upper bounds of the batch size histogram buckets
+BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128)
+
+
+class BatchingMetrics:
+    """Queue depth, batch size and wait time counters of a MicroBatcher"""
+
+    def __init__(self):
+        self.requests = 0
+        self.batches = 0
+        self.queue_depth = 0
+        self.max_queue_depth = 0
+        self.rows_batched = 0
+        self.max_batch_size = 0
+        self.batch_size_counts = [0] * (len(BATCH_SIZE_BUCKETS) + 1)
+        self.wait_seconds_total = 0.0
+        self.max_wait_seconds = 0.0
+
+    def enqueued(self):
+        self.requests += 1
+        self.queue_depth += 1
+        self.max_queue_depth = max(self.max_queue_depth, self.queue_depth)
+
+    def dispatched(self, waits):
+        """Record a batch leaving the queue, given each request's wait in seconds"""
+        size = len(waits)
+        self.batches += 1
+        self.queue_depth -= size
+        self.rows_batched += size
+        self.max_batch_size = max(self.max_batch_size, size)
+        self.batch_size_counts[bisect_left(BATCH_SIZE_BUCKETS, size)] += 1
+        self.wait_seconds_total += sum(waits)
+        self.max_wait_seconds = max(self.max_wait_seconds, *waits)
+
+    def snapshot(self):
+        """Counters plus mean batch size and wait time, as a JSON-ready dict"""
+        labels = [f"<={bound}" for bound in BATCH_SIZE_BUCKETS] + [f">{BATCH_SIZE_BUCKETS[-1]}"]
+        return {
+            "requests": self.requests,
+            "batches": self.batches,
+            "queue_depth": self.queue_depth,
+            "max_queue_depth": self.max_queue_depth,
+            "mean_batch_size": self.rows_batched / self.batches if self.batches else None,
+            "max_batch_size": self.max_batch_size,
+            "batch_sizes": dict(zip(labels, self.batch_size_counts)),
+            "mean_wait_ms": (
+                self.wait_seconds_total / self.rows_batched * 1000 if self.rows_batched else None
+            ),
+            "max_wait_ms": self.max_wait_seconds * 1000,
+        }
+
+
+class _ModelQueue:
+    """Requests waiting for one model, and the model's batches in flight"""
+
+    def __init__(self, model):
+        self.model = model
+        self.items = []
+        self.timer = None
+        self.in_flight = 0
+
+
+def _predict(model, matrix):
+    return model.predict(matrix)
+
+
+class MicroBatcher:
+    """Coalesce concurrent single-row predictions per model into vectorised calls"""
+
+    def __init__(
+        self,
+        max_batch_size=DEFAULT_MAX_BATCH_SIZE,
+        window_ms=DEFAULT_WINDOW_MS,
+        predict=_predict,
+        executor=None,
+    ):
+        """
+        Args:
+            max_batch_size (int): Rows per predict call at most
+            window_ms (float): Longest a request waits for a busy model's batch to fill
+            predict (callable): predict(model, matrix) -> 1-D predictions, or a coroutine
+                function that is awaited on the event loop instead of run in executor
+            executor: concurrent.futures executor for predict calls, None for the default
+        """
+        self.max_batch_size = max_batch_size
+        self.window = window_ms / 1000
+        self.metrics = BatchingMetrics()
+        self._predict = predict
+        self._executor = executor
+        self._queues = {}
+        self._tasks = set()
+
+    async def predict(self, model, row):
+        """
+        Predict one feature row with model, batched with concurrent requests.
+
+        Returns:
+            float: The row's prediction
+        """
+        loop = asyncio.get_running_loop()
+        queue = self._queues.get(id(model))
+        if queue is None:
+            queue = self._queues[id(model)] = _ModelQueue(model)
+        future = loop.create_future()
+        queue.items.append((row, future, time.perf_counter()))
+        self.metrics.enqueued()
+        if len(queue.items) >= self.max_batch_size:
+            self._dispatch(queue)
+        elif queue.timer is None:
+            delay = self.window if queue.in_flight else 0
+            queue.timer = loop.call_later(delay, self._dispatch, queue)
+        return await future
+
+    def _dispatch(self, queue):
+        if queue.timer is not None:
+            queue.timer.cancel()
+            queue.timer = None
+        if not queue.items:
+            return
+        items = queue.items[: self.max_batch_size]
+        del queue.items[: self.max_batch_size]
+        now = time.perf_counter()
+        self.metrics.dispatched([now - enqueued for _, _, enqueued in items])
+        queue.in_flight += 1
+        task = asyncio.get_running_loop().create_task(self._run(queue, items))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        if len(queue.items) >= self.max_batch_size:
+            self._dispatch(queue)
+
+    async def _run(self, queue, items):
+        matrix = np.array([row for row, _, _ in items], dtype=float)
+        try:
+            if asyncio.iscoroutinefunction(self._predict):
+                predictions = await self._predict(queue.model, matrix)
+            else:
+                predictions = await asyncio.get_running_loop().run_in_executor(
+                    self._executor, self._predict, queue.model, matrix
+                )
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            for _, future, _ in items:
+                if not future.done():
+                    future.set_exception(e)
+        else:
+            for (_, future, _), prediction in zip(items, predictions):
+                if not future.done():
+                    future.set_result(float(prediction))
+        finally:
+            queue.in_flight -= 1
+            if queue.items:
+                # Requests that queued behind this batch go next
+                self._dispatch(queue)
+            elif not queue.in_flight and self._queues.get(id(queue.model)) is queue:
+                del self._queues[id(queue.model)]
+
+
+def batcher_from_env(predict=_predict):
+    """Return a MicroBatcher configured from the environment, or None if not enabled"""
+    if os.getenv("PREDICT_MICRO_BATCHING", "0").lower() not in ("1", "true", "yes"):
+        return None
+    return MicroBatcher(
+        max_batch_size=int(os.getenv("PREDICT_BATCH_MAX_SIZE", str(DEFAULT_MAX_BATCH_SIZE))),
+        window_ms=float(os.getenv("PREDICT_BATCH_WINDOW_MS", str(DEFAULT_WINDOW_MS))),
+        predict=predict,
+    )
@@ -0,0 +1,241 @@
+"""
+In-process caching utilities for model results.
+Provides a thread-safe LRU cache with optional time-to-live and hit/miss counters, and
+the prediction cache of /ml_models/predict with an optional SQLite second tier.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+from dotenv import load_dotenv
+
+load_dotenv()
+
+DEFAULT_PREDICTION_CACHE_SIZE = 4096
+
+
+def feature_key(features):
+    """
+    Build a canonical hash of a feature vector.
+
+    Values are normalised to float64 first, so "23", 23 and 23.0 produce the
+    same key once cleaned, and -0.0 hashes like 0.0.
+
+    Args:
+        features (iterable): Numeric feature values
+
+    Returns:
+        bytes: 16-byte digest of the vector
+    """
+    vector = np.ascontiguousarray(features, dtype=np.float64) + 0.0
+    return hashlib.blake2b(vector.tobytes(), digest_size=16).digest()
+
+
+class LRUCache:
+    """Thread-safe least-recently-used cache whose entries optionally expire"""
+
+    def __init__(self, maxsize=1024, ttl_seconds=None):
+        self.maxsize = maxsize
+        self.ttl_seconds = ttl_seconds
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._counters = {"hits": 0, "misses": 0, "evictions": 0, "expirations": 0}
+
+    def get(self, key):
+        """Return the cached value for key, or None on a miss"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._counters["misses"] += 1
+                return None
+            value, expires_at = entry
+            if expires_at is not None and expires_at <= time.monotonic():
+                del self._entries[key]
+                self._counters["expirations"] += 1
+                self._counters["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self._counters["hits"] += 1
+            return value
+
+    def set(self, key, value):
+        """Store value under key, evicting the least recently used entries if full"""
+        expires_at = None if self.ttl_seconds is None else time.monotonic() + self.ttl_seconds
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self._counters["evictions"] += 1
+
+    def clear(self):
+        """Drop every entry, keeping the counters"""
+        with self._lock:
+            self._entries.clear()
+
+    def discard(self, predicate):
+        """Drop every entry whose key matches predicate; returns how many were dropped"""
+        with self._lock:
+            stale = [key for key in self._entries if predicate(key)]
+            for key in stale:
+                del self._entries[key]
+            return len(stale)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def stats(self):
+        """Return the cache counters and occupancy"""
+        with self._lock:
+            lookups = self._counters["hits"] + self._counters["misses"]
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "ttl_seconds": self.ttl_seconds,
+                **self._counters,
+                "hit_rate": self._counters["hits"] / lookups if lookups else 0.0,
+            }
+
+
+class SQLiteCacheStore:
+    """
+    Second cache tier in a SQLite file, so cached predictions survive restarts.
+
+    Any object with the same get, set and discard methods can be used instead.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock, self._connection:
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute("PRAGMA synchronous=NORMAL")
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS predictions "
+                "(key BLOB PRIMARY KEY, model TEXT NOT NULL, value TEXT NOT NULL)"
+            )
+
+    def get(self, key):
+        """Return the stored value for key, or None"""
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT value FROM predictions WHERE key = ?", (key,)
+            ).fetchone()
+        return None if row is None else json.loads(row[0])
+
+    def set(self, model_name, key, value):
+        """Store a JSON-serialisable value for key, tagged with its model"""
+        with self._lock, self._connection:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO predictions (key, model, value) VALUES (?, ?, ?)",
+                (key, model_name, json.dumps(value)),
+            )
+
+    def discard(self, model_name):
+        """Drop every value of a model"""
+        with self._lock, self._connection:
+            self._connection.execute("DELETE FROM predictions WHERE model = ?", (model_name,))
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
+
+
+class PredictionCache:
+    """
+    Predictions keyed by model identity and the exact feature vector.
+
+    The identity includes the artifact signature and engine, so a reloaded or switched
+    model never reads another version's entries; invalidate() also frees them. A memory
+    miss falls through to the optional second tier, and hits there are copied to memory.
+    A lookup counts as a miss only when both tiers miss.
+    """
+
+    def __init__(self, maxsize=DEFAULT_PREDICTION_CACHE_SIZE, store=None):
+        """
+        Args:
+            maxsize (int): Entries kept in memory before the least recently used is evicted
+            store (SQLiteCacheStore): Optional second tier
+        """
+        self.memory = LRUCache(maxsize)
+        self.store = store
+        self._lock = threading.Lock()
+        self._store_hits = 0
+
+    @staticmethod
+    def key(model, features):
+        """
+        Cache key of a prediction, or None for models without a loaded artifact.
+
+        Returns:
+            tuple: (model name, digest of the identity and the feature vector)
+        """
+        if getattr(model, "loaded_signature", None) is None:
+            return None
+        identity = repr(model.identity()).encode()
+        digest = hashlib.blake2b(identity + feature_key(features), digest_size=16).digest()
+        return (str(model), digest)
+
+    def get(self, key):
+        """Return the cached prediction for a key from key(), or None on a miss"""
+        if key is None:
+            return None
+        value = self.memory.get(key)
+        if value is None and self.store is not None:
+            value = self.store.get(key[1])
+            if value is not None:
+                with self._lock:
+                    self._store_hits += 1
+                self.memory.set(key, value)
+        return value
+
+    def set(self, key, value):
+        """Cache a JSON-serialisable prediction under a key from key()"""
+        if key is None:
+            return
+        self.memory.set(key, value)
+        if self.store is not None:
+            self.store.set(key[0], key[1], value)
+
+    def invalidate(self, model_name):
+        """Drop every cached prediction of a model, in both tiers"""
+        self.memory.discard(lambda key: key[0] == model_name)
+        if self.store is not None:
+            self.store.discard(model_name)
+
+    def stats(self):
+        """Return counters over both tiers, plus the hits served by each tier"""
+        memory = self.memory.stats()
+        with self._lock:
+            store_hits = self._store_hits
+        hits = memory["hits"] + store_hits
+        # Memory misses the store answered are hits overall
+        misses = memory["misses"] - store_hits
+        return {
+            **memory,
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": hits / (hits + misses) if hits + misses else 0.0,
+            "memory_hits": memory["hits"],
+            "store_hits": store_hits,
+            "store": None if self.store is None else self.store.path,
+        }
+
+
+def prediction_cache_from_env():
+    """
+    Return the prediction cache configured by the environment, or None when
+    PREDICTION_CACHE_SIZE is 0. PREDICTION_CACHE_SQLITE names the optional SQLite file.
+    """
+    maxsize = int(os.getenv("PREDICTION_CACHE_SIZE", str(DEFAULT_PREDICTION_CACHE_SIZE)))
+    if maxsize <= 0:
+        return None
+    path = os.getenv("PREDICTION_CACHE_SQLITE")
+    return PredictionCache(maxsize, SQLiteCacheStore(path) if path else None)
@@ -4,13 +4,15 @@ Provides CRUD operations and business logic for client management.
 """
 # pylint: disable=arguments-differ, arguments-renamed, too-many-arguments, too-many-positional-arguments, too-many-locals
 from abc import ABC, abstractmethod
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterator, List, Optional
 
 from fastapi import HTTPException, status
 from sqlalchemy.orm import Session
 
 from app.clients.schema import ClientUpdate, ServiceUpdate
-from app.models import Client, ClientCase, User
+from app.clients.service.constants import COLUMNS_FIELDS
+from app.clients.service.recommendation_service import refresh_recommendations
+from app.models import Client, ClientCase, ClientRecommendation, User
 
 
 class InterfaceClientQueryService(ABC):
@@ -44,6 +46,12 @@ class InterfaceClientQueryService(ABC):
     def get_clients_by_case_worker(self, db: Session, case_worker_id: int) -> List[Client]:
         "Get clients filtered by case worker"
 
+    @abstractmethod
+    def iter_clients_by_case_worker(
+        self, db: Session, case_worker_id: int, chunk_size: int
+    ) -> Iterator[Client]:
+        "Iterate over a case worker's clients, fetching chunk_size rows at a time"
+
 
 class InterfaceClientManagementService(ABC):
     """Interface for client management operations"""
@@ -239,6 +247,19 @@ class ClientQueryService(InterfaceClientQueryService):
     @staticmethod
     def get_clients_by_case_worker(db: Session, case_worker_id: int):
         """Get all clients assigned to a specific case worker"""
+        return ClientQueryService._case_worker_clients_query(db, case_worker_id).all()
+
+    @staticmethod
+    def iter_clients_by_case_worker(db: Session, case_worker_id: int, chunk_size: int = 256):
+        """
+        Iterate over the clients assigned to a case worker without loading them all.
+        The case worker is checked immediately; rows are fetched chunk_size at a time.
+        """
+        query = ClientQueryService._case_worker_clients_query(db, case_worker_id)
+        return query.yield_per(chunk_size)
+
+    @staticmethod
+    def _case_worker_clients_query(db: Session, case_worker_id: int):
         case_worker = db.query(User).filter(User.id == case_worker_id).first()
         if not case_worker:
             raise HTTPException(
@@ -246,7 +267,7 @@ class ClientQueryService(InterfaceClientQueryService):
                 detail=f"Case worker with id {case_worker_id} not found",
             )
 
-        return db.query(Client).join(ClientCase).filter(ClientCase.user_id == case_worker_id).all()
+        return db.query(Client).join(ClientCase).filter(ClientCase.user_id == case_worker_id)
 
 
 class ClientManagementService(InterfaceClientManagementService):
@@ -263,13 +284,21 @@ class ClientManagementService(InterfaceClientManagementService):
             )
 
         update_data = client_update.model_dump(exclude_unset=True)
+        features_changed = any(
+            field in COLUMNS_FIELDS and getattr(client, field) != value
+            for field, value in update_data.items()
+        )
         for field, value in update_data.items():
             setattr(client, field, value)
 
         try:
+            if features_changed:
+                # Drop the stored recommendation with the update so it is never stale
+                db.query(ClientRecommendation).filter(
+                    ClientRecommendation.client_id == client_id
+                ).delete()
             db.commit()
             db.refresh(client)
-            return client
         except Exception as e:
             db.rollback()
             raise HTTPException(
@@ -277,6 +306,15 @@ class ClientManagementService(InterfaceClientManagementService):
                 detail=f"Failed to update client: {str(e)}",
             ) from e
 
+        if features_changed:
+            try:
+                refresh_recommendations(db, [client])
+            except Exception:  # pylint: disable=broad-exception-caught
+                # The update is saved; the recommendation is recomputed when next read
+                db.rollback()
+                db.refresh(client)
+        return client
+
     @staticmethod
     def update_client_services(
         db: Session, client_id: int, user_id: int, service_update: ServiceUpdate
@@ -383,8 +421,11 @@ class ClientManagementService(InterfaceClientManagementService):
             )
 
         try:
-            # Delete associated client_cases
+            # Delete associated client_cases and the stored recommendation
             db.query(ClientCase).filter(ClientCase.client_id == client_id).delete()
+            db.query(ClientRecommendation).filter(
+                ClientRecommendation.client_id == client_id
+            ).delete()
 
             # Delete the client
             db.delete(client)
@@ -433,6 +474,10 @@ class ClientService:
     def get_clients_by_case_worker(db: Session, case_worker_id: int):
         return ClientQueryService.get_clients_by_case_worker(db, case_worker_id)
 
+    @staticmethod
+    def iter_clients_by_case_worker(db: Session, case_worker_id: int, chunk_size: int = 256):
+        return ClientQueryService.iter_clients_by_case_worker(db, case_worker_id, chunk_size)
+
     # Modification methods
     @staticmethod
     def update_client(db: Session, client_id: int, client_update: ClientUpdate):
@@ -32,5 +32,67 @@ INTERVENTION_FIELDS = [
     "specialized_services",
     "employment_related_financial_supports",
     "employer_financial_supports",
-    "enhanced_referrals"
+    "enhanced_referrals",
 ]
+
+
+# Text answers from the front end and their numeric codes
+BOOLEAN_LABELS = {
+    "": 0,
+    "true": 1,
+    "false": 0,
+    "no": 0,
+    "yes": 1,
+    "No": 0,
+    "Yes": 1,
+}
+
+SCHOOLING_LABELS = {
+    "Grade 0-8": 1,
+    "Grade 9": 2,
+    "Grade 10": 3,
+    "Grade 11": 4,
+    "Grade 12 or equivalent": 5,
+    "OAC or Grade 13": 6,
+    "Some college": 7,
+    "Some university": 8,
+    "Some apprenticeship": 9,
+    "Certificate of Apprenticeship": 10,
+    "Journeyperson": 11,
+    "Certificate/Diploma": 12,
+    "Bachelor's degree": 13,
+    "Post graduate": 14,
+}
+
+HOUSING_LABELS = {
+    "Renting-private": 1,
+    "Renting-subsidized": 2,
+    "Boarding or lodging": 3,
+    "Homeowner": 4,
+    "Living with family/friend": 5,
+    "Institution": 6,
+    "Temporary second residence": 7,
+    "Band-owned home": 8,
+    "Homeless or transient": 9,
+    "Emergency hostel": 10,
+}
+
+INCOME_SOURCE_LABELS = {
+    "No Source of Income": 1,
+    "Employment Insurance": 2,
+    "Workplace Safety and Insurance Board": 3,
+    "Ontario Works applied or receiving": 4,
+    "Ontario Disability Support Program applied or receiving": 5,
+    "Dependent of someone receiving OW or ODSP": 6,
+    "Crown Ward": 7,
+    "Employment": 8,
+    "Self-Employment": 9,
+    "Other (specify)": 10,
+}
+
+# Columns whose answers use a categorical label set besides BOOLEAN_LABELS
+COLUMN_LABELS = {
+    "level_of_schooling": SCHOOLING_LABELS,
+    "housing": HOUSING_LABELS,
+    "income_source": INCOME_SOURCE_LABELS,
+}
@@ -0,0 +1,139 @@
+"""
+Encoder module turning client answers into model features.
+Maps every demographic column through one precomputed lookup, whole columns at a time.
+"""
+
+import numpy as np
+
+from app.clients.service.constants import BOOLEAN_LABELS, COLUMN_LABELS, COLUMNS_FIELDS
+
+
+class UnknownLabelError(ValueError):
+    """Raised when answers cannot be mapped to a numeric feature"""
+
+    def __init__(self, unknown):
+        self.unknown = unknown
+        details = "; ".join(f"{column}: {', '.join(labels)}" for column, labels in unknown.items())
+        super().__init__(f"Unknown labels in {details}")
+
+
+class CategoricalEncoder:
+    """Column-aware encoder for the demographic features in COLUMNS_FIELDS"""
+
+    def __init__(self, columns=None, column_labels=None):
+        column_labels = COLUMN_LABELS if column_labels is None else column_labels
+        self.columns = list(COLUMNS_FIELDS if columns is None else columns)
+        # One lookup for every label: label -> (code, label set). Label set 0 holds the
+        # answers valid in any column; set i > 0 is only valid where _column_sets == i.
+        label_sets = [BOOLEAN_LABELS] + [column_labels[c] for c in column_labels]
+        self._lookup = {
+            label: (code, set_index)
+            for set_index, labels in enumerate(label_sets)
+            for label, code in labels.items()
+        }
+        set_indices = {column: i + 1 for i, column in enumerate(column_labels)}
+        self._column_sets = np.array([set_indices.get(c, 0) for c in self.columns])
+
+    def encode_records(self, records):
+        """
+        Encode a list of answer dicts.
+
+        Args:
+            records (list): Dicts keyed by every column name
+
+        Returns:
+            tuple: (n_records, n_columns) float matrix and {column: [unknown labels]}
+        """
+        cells = [[record[column] for column in self.columns] for record in records]
+        return self.encode_matrix(np.array(cells, dtype=object).reshape(-1, len(self.columns)))
+
+    def encode_frame(self, frame):
+        """
+        Encode the columns of a pandas DataFrame.
+
+        Args:
+            frame (pd.DataFrame): Frame holding every column name
+
+        Returns:
+            tuple: (n_rows, n_columns) float matrix and {column: [unknown labels]}
+        """
+        return self.encode_matrix(frame[self.columns].to_numpy(dtype=object))
+
+    def encode_matrix(self, cells):
+        """
+        Encode a 2-D array of answers laid out in column order.
+
+        Numeric columns are converted with a single cast each. The columns that
+        hold text labels are resolved together: each distinct label is looked up
+        once and broadcast back, so the Python work grows with the number of
+        distinct labels rather than cells. Unknown cells are encoded as NaN and
+        reported per column.
+
+        Args:
+            cells (np.array): (n_rows, n_columns) array of answers
+
+        Returns:
+            tuple: (n_rows, n_columns) float matrix and {column: [unknown labels]}
+        """
+        try:
+            encoded = cells.astype(float)
+            label_columns = []
+        except (TypeError, ValueError):
+            encoded = np.empty(cells.shape, dtype=float)
+            label_columns = []
+            for index in range(cells.shape[1]):
+                try:
+                    encoded[:, index] = cells[:, index].astype(float)
+                except (TypeError, ValueError):
+                    label_columns.append(index)
+        label_unknown = self._encode_labels(cells, encoded, label_columns) if label_columns else {}
+        unknown = {
+            self.columns[index]: ["nan"] for index in np.flatnonzero(np.isnan(encoded).any(axis=0))
+        }
+        return encoded, {**unknown, **label_unknown}
+
+    def _encode_labels(self, cells, encoded, label_columns):
+        text = cells[:, label_columns].astype(str)
+        labels, inverse = np.unique(text, return_inverse=True)
+        resolved = [self._lookup.get(label) or (_parse_number(label), 0) for label in labels]
+        label_codes = np.array([code for code, _ in resolved], dtype=float)
+        label_sets = np.array([label_set for _, label_set in resolved])
+        codes = label_codes[inverse].reshape(text.shape)
+        sets = label_sets[inverse].reshape(text.shape)
+        invalid = np.isnan(codes) | ((sets != 0) & (sets != self._column_sets[label_columns]))
+        codes[invalid] = np.nan
+        encoded[:, label_columns] = codes
+        return {
+            self.columns[label_columns[i]]: sorted(set(text[invalid[:, i], i]))
+            for i in np.flatnonzero(invalid.any(axis=0))
+        }
+
+
+def _parse_number(label):
+    try:
+        return float(label)
+    except ValueError:
+        return np.nan
+
+
+DEFAULT_ENCODER = CategoricalEncoder()
+
+
+def encode_profiles(records, encoder=DEFAULT_ENCODER):
+    """
+    Encode client profiles into the demographic feature matrix.
+
+    Args:
+        records (list): Client answer dicts keyed by COLUMNS_FIELDS
+        encoder (CategoricalEncoder): Encoder to use
+
+    Returns:
+        np.array: (n_records, len(COLUMNS_FIELDS)) float matrix
+
+    Raises:
+        UnknownLabelError: If any answer cannot be encoded
+    """
+    encoded, unknown = encoder.encode_records(records)
+    if unknown:
+        raise UnknownLabelError(unknown)
+    return encoded
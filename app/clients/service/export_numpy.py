@@ -0,0 +1,21 @@
+"""
+Export the trained models to NumPy artifacts, served with MODEL_BACKEND=numpy.
+See app.clients.service.numpy_models.
+
+Run from the repository root after training: python -m app.clients.service.export_numpy
+"""
+
+from app.clients.service.logic import MODEL_PATH
+from app.clients.service.model_catalog import MODEL_CATALOG
+from app.clients.service.numpy_models import export_model
+
+
+def main():
+    """Export every catalogued model and the recommendation model"""
+    paths = [MODEL_CATALOG.artifact_path(name) for name in MODEL_CATALOG.names()]
+    for path in [*paths, MODEL_PATH]:
+        print(f"Exported {path} to {export_model(path)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,199 @@
+"""
+A fitted RandomForestRegressor flattened into plain node arrays.
+
+sklearn keeps every tree in private buffers that it fills again whenever a forest is
+unpickled, so a forest cannot be memory-mapped. FlatForestRegressor holds the same nodes
+in a few contiguous numpy arrays. Loaded with joblib's mmap_mode, those arrays stay backed
+by the artifact file. Its predictions are bit-identical to the forest's: inputs are
+compared as float32 like sklearn does, and leaf values are summed tree by tree in
+estimator order.
+
+CompactForestRegressor is a serving engine built from the same nodes. It uses int32 node
+indices and float32 thresholds and values, and it advances every tree for every row one
+level per vectorised step. It avoids sklearn's per-call overhead on small batches. Split
+decisions match predict exactly; leaf values agree to float32 precision.
+"""
+
+# pylint: disable=too-many-arguments, too-many-positional-arguments
+
+import numpy as np
+
+
+class FlatForestRegressor:
+    """Single-output regression forest stored as concatenated per-tree node arrays"""
+
+    def __init__(self, offsets, children_left, children_right, feature, threshold, value):
+        """
+        Args:
+            offsets (np.array): (n_trees + 1,) start of each tree's nodes in the node arrays
+            children_left (np.array): Left child of each node, relative to its tree, -1 at leaves
+            children_right (np.array): Right child of each node, relative to its tree
+            feature (np.array): Split column of each node, negative at leaves
+            threshold (np.array): Split threshold of each node
+            value (np.array): Prediction of each node
+        """
+        self.offsets = offsets
+        self.children_left = children_left
+        self.children_right = children_right
+        self.feature = feature
+        self.threshold = threshold
+        self.value = value
+
+    @classmethod
+    def from_forest(cls, forest):
+        """Flatten a fitted single-output RandomForestRegressor"""
+        trees = [estimator.tree_ for estimator in forest.estimators_]
+        offsets = np.cumsum([0] + [tree.node_count for tree in trees])
+        return cls(
+            offsets,
+            np.concatenate([tree.children_left for tree in trees]),
+            np.concatenate([tree.children_right for tree in trees]),
+            np.concatenate([tree.feature for tree in trees]),
+            np.concatenate([tree.threshold for tree in trees]),
+            np.concatenate([tree.value[:, 0, 0] for tree in trees]),
+        )
+
+    @property
+    def n_estimators(self):
+        return len(self.offsets) - 1
+
+    def tree_arrays(self):
+        """
+        Per-tree views of the node arrays.
+
+        Returns:
+            list: (children_left, children_right, feature, threshold, value) per tree
+        """
+        return [
+            (
+                self.children_left[start:end],
+                self.children_right[start:end],
+                self.feature[start:end],
+                self.threshold[start:end],
+                self.value[start:end],
+            )
+            for start, end in zip(self.offsets[:-1], self.offsets[1:])
+        ]
+
+    def predict(self, features):
+        """
+        Predict like RandomForestRegressor.predict.
+
+        Args:
+            features (array-like): (n_rows, n_features) feature matrix
+
+        Returns:
+            np.array: (n_rows,) predictions
+        """
+        matrix = np.asarray(features, dtype=np.float32)
+        total = np.zeros(len(matrix))
+        for left, right, feature, threshold, value in self.tree_arrays():
+            nodes = np.zeros(len(matrix), dtype=np.intp)
+            active = np.arange(len(matrix))
+            while active.size:
+                current = nodes[active]
+                split = feature[current] >= 0
+                active, current = active[split], current[split]
+                go_left = matrix[active, feature[current]] <= threshold[current]
+                nodes[active] = np.where(go_left, left[current], right[current])
+            total += value[nodes]
+        return total / self.n_estimators
+
+
+class CompactForestRegressor:
+    """Forest evaluated level by level over all trees and a block of rows at once"""
+
+    # Rows per traversal; keeps the (trees x rows) working arrays cache-resident
+    ROW_BLOCK = 256
+
+    def __init__(self, roots, level_trees, children, feature, threshold, value):
+        """
+        Args:
+            roots (np.array): (n_trees,) int32 root node of each tree, deepest tree first
+            level_trees (np.array): int32 number of trees still splitting at each depth
+            children (np.array): (2 * n_nodes,) int32 right then left child of each node;
+                leaves point to themselves
+            feature (np.array): (n_nodes,) int32 split column, 0 at leaves
+            threshold (np.array): (n_nodes,) float32 split threshold
+            value (np.array): (n_nodes,) float32 prediction of each node
+        """
+        self.roots = roots
+        self.level_trees = level_trees
+        self.children = children
+        self.feature = feature
+        self.threshold = threshold
+        self.value = value
+
+    @classmethod
+    def from_forest(cls, forest):
+        """Export a fitted single-output RandomForestRegressor or a FlatForestRegressor"""
+        if not isinstance(forest, FlatForestRegressor):
+            forest = FlatForestRegressor.from_forest(forest)
+        offsets = np.asarray(forest.offsets)
+        base = np.repeat(offsets[:-1], np.diff(offsets))
+        nodes = np.arange(len(base))
+        leaf = np.asarray(forest.children_left) < 0
+        left = np.where(leaf, nodes, forest.children_left + base)
+        right = np.where(leaf, nodes, forest.children_right + base)
+        # Round thresholds down to float32 so x <= threshold decides as it does in float64
+        threshold = np.asarray(forest.threshold).astype(np.float32)
+        rounded_up = threshold > forest.threshold
+        threshold[rounded_up] = np.nextafter(threshold[rounded_up], np.float32(-np.inf))
+        depths = np.zeros(len(offsets) - 1, dtype=int)
+        frontier, trees = offsets[:-1], np.arange(len(depths))
+        while frontier.size:
+            split = ~leaf[frontier]
+            frontier, trees = frontier[split], trees[split]
+            depths[np.unique(trees)] += 1
+            frontier = np.concatenate([left[frontier], right[frontier]])
+            trees = np.concatenate([trees, trees])
+        # Deepest trees first, so the trees still splitting at a depth are a prefix
+        order = np.argsort(-depths, kind="stable")
+        return cls(
+            offsets[:-1][order].astype(np.int32),
+            np.array([(depths > level).sum() for level in range(depths.max())], np.int32),
+            np.column_stack([right, left]).ravel().astype(np.int32),
+            np.where(leaf, 0, forest.feature).astype(np.int32),
+            np.where(leaf, 0, threshold).astype(np.float32),
+            np.asarray(forest.value, dtype=np.float32),
+        )
+
+    @property
+    def n_estimators(self):
+        return len(self.roots)
+
+    def predict(self, features):
+        """
+        Predict like RandomForestRegressor.predict, to float32 precision.
+
+        Args:
+            features (array-like): (n_rows, n_features) feature matrix
+
+        Returns:
+            np.array: (n_rows,) predictions
+        """
+        matrix = np.asarray(features, dtype=np.float32)
+        predictions = np.empty(len(matrix))
+        for start in range(0, len(matrix), self.ROW_BLOCK):
+            block = matrix[start : start + self.ROW_BLOCK]
+            predictions[start : start + len(block)] = self._predict_block(block)
+        return predictions / self.n_estimators
+
+    def _predict_block(self, block):
+        """Sum of the tree predictions for each row of a block"""
+        rows, columns = block.shape
+        cells = block.ravel()
+        # Tree-major: the pair (tree t, row r) sits at t * rows + r
+        nodes = np.repeat(self.roots, rows)
+        row_offsets = np.tile(np.arange(rows) * columns, len(self.roots))
+        for trees in self.level_trees:
+            # Indices are in range by construction, and clip skips the bounds checks
+            active = nodes[: trees * rows]
+            column = self.feature.take(active, mode="clip")
+            values = cells.take(row_offsets[: trees * rows] + column, mode="clip")
+            go_left = values <= self.threshold.take(active, mode="clip")
+            active += active
+            active += go_left
+            nodes[: trees * rows] = self.children.take(active, mode="clip")
+        leaves = self.value.take(nodes, mode="clip").reshape(len(self.roots), rows)
+        return leaves.sum(axis=0, dtype=np.float64)
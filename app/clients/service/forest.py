@@ -0,0 +1,197 @@
+"""
+Intervention-aware evaluation of a fitted RandomForestRegressor.
+
+The rows scored for one client differ only in the intervention columns, so each tree is
+descended once on the client's demographic features and only splits on an intervention
+column fan out. The candidate rows that reach each node are tracked as an integer bitmask.
+Leaf values are summed tree by tree in estimator order and divided by the number of trees,
+exactly as RandomForestRegressor.predict does, so the scores are bit-identical to it.
+"""
+
+# pylint: disable=too-many-locals
+
+import threading
+import weakref
+
+import numpy as np
+
+from app.clients.service.cache import LRUCache
+from app.clients.service.flat_forest import FlatForestRegressor
+from app.clients.service.model_helper import loaded_class
+
+# Column masks kept per evaluator, one per search space; as many as logic caches spaces
+MASK_CACHE_SIZE = 128
+
+
+class InterventionForestEvaluator:
+    """Score every intervention combination for a client with one traversal per tree"""
+
+    def __init__(self, forest, num_features, grid):
+        """
+        Args:
+            forest (RandomForestRegressor): Fitted single-output forest, or its
+                FlatForestRegressor
+            num_features (int): Number of leading demographic columns
+            grid (np.array): (n_combinations, n_interventions) 0/1 intervention grid
+        """
+        self.num_features = num_features
+        self.grid = grid
+        self.fitted_estimators = _fitted_state(forest)
+        self.trees = [tuple(array.tolist() for array in arrays) for arrays in _tree_arrays(forest)]
+        self._masks = LRUCache(MASK_CACHE_SIZE)
+
+    def _column_masks(self, rows):
+        """Bitmask of the candidate rows that set each intervention column"""
+        key = rows.tobytes()
+        masks = self._masks.get(key)
+        if masks is None:
+            weights = np.array([1 << j for j in range(len(rows))], dtype=object)
+            masks = [
+                int(weights[self.grid[rows, col] == 1].sum()) for col in range(self.grid.shape[1])
+            ]
+            self._masks.set(key, masks)
+        return masks
+
+    def _leaves(self, row, rows):
+        """Yield (tree index, leaf value, candidate bitmask) for every leaf the client reaches"""
+        num_features = self.num_features
+        ones = self._column_masks(rows)
+        full = (1 << len(rows)) - 1
+        for index, (left, right, feature, threshold, value) in enumerate(self.trees):
+            stack = [(0, full)]
+            while stack:
+                node, mask = stack.pop()
+                column = feature[node]
+                while column >= 0:
+                    if column < num_features:
+                        node = left[node] if row[column] <= threshold[node] else right[node]
+                    else:
+                        set_rows = ones[column - num_features]
+                        # Intervention columns only hold 0.0 or 1.0
+                        if threshold[node] >= 1.0:
+                            node = left[node]
+                        elif threshold[node] < 0.0:
+                            node = right[node]
+                        elif not mask & set_rows:
+                            node = left[node]
+                        elif not mask & ~set_rows:
+                            node = right[node]
+                        else:
+                            stack.append((right[node], mask & set_rows))
+                            mask &= ~set_rows
+                            node = left[node]
+                    column = feature[node]
+                yield index, value[node], mask
+
+    def score(self, row_data, rows):
+        """
+        Predict one client with every combination in rows.
+
+        Args:
+            row_data (array-like): NUM_FEATURES cleaned demographic features
+            rows (np.array): Indices into the intervention grid
+
+        Returns:
+            np.array: (len(rows),) predictions, equal to predict on the expanded matrix
+        """
+        return self.score_batch([row_data], rows)[0]
+
+    def score_batch(self, rows_data, rows):
+        """
+        Predict several clients with every combination in rows.
+
+        Args:
+            rows_data (array-like): (n_clients, NUM_FEATURES) cleaned demographic features
+            rows (np.array): Indices into the intervention grid
+
+        Returns:
+            np.array: (n_clients, len(rows)) predictions
+        """
+        # The forest compares float32 features against float64 thresholds
+        clients = np.asarray(rows_data, dtype=np.float32).astype(np.float64).tolist()
+        num_trees, width = len(self.trees), len(rows)
+        full = (1 << width) - 1
+        # Trees that do not split the candidates contribute a single leaf value
+        per_tree = np.empty((len(clients) * num_trees, 1))
+        split_trees, starts, values, masks = [], [], [], []
+        for i, row in enumerate(clients):
+            for index, value, mask in self._leaves(row, rows):
+                tree = i * num_trees + index
+                if mask == full:
+                    per_tree[tree] = value
+                    continue
+                if not split_trees or split_trees[-1] != tree:
+                    split_trees.append(tree)
+                    starts.append(len(masks))
+                values.append(value)
+                masks.append(mask)
+        per_tree = np.repeat(per_tree, width, axis=1)
+        if masks:
+            per_tree[split_trees] = _split_tree_values(masks, values, starts, width)
+        # Reducing over the tree axis adds the trees one at a time, in estimator order
+        predictions = np.add.reduce(per_tree.reshape(len(clients), num_trees, width), axis=1)
+        predictions /= num_trees
+        return predictions
+
+
+def _split_tree_values(masks, values, starts, width):
+    """Expand the leaves of trees that split the candidates into one row per tree"""
+    size = (width + 7) // 8
+    packed = np.frombuffer(b"".join(mask.to_bytes(size, "little") for mask in masks), np.uint8)
+    reached = np.unpackbits(packed.reshape(len(masks), size), axis=1, bitorder="little")
+    # The leaves of a tree partition the candidates, so each sum has one non-zero term
+    leaf_values = np.where(reached[:, :width], np.asarray(values)[:, None], 0.0)
+    return np.add.reduceat(leaf_values, starts, axis=0)
+
+
+_EVALUATORS = weakref.WeakKeyDictionary()
+_EVALUATORS_LOCK = threading.Lock()
+
+
+def _tree_arrays(forest):
+    if isinstance(forest, FlatForestRegressor):
+        return forest.tree_arrays()
+    return [
+        (tree.children_left, tree.children_right, tree.feature, tree.threshold, tree.value[:, 0, 0])
+        for tree in (estimator.tree_ for estimator in forest.estimators_)
+    ]
+
+
+def _fitted_state(forest):
+    """The attribute refitting replaces, to detect a stale evaluator"""
+    if isinstance(forest, FlatForestRegressor):
+        return forest.value
+    return forest.estimators_
+
+
+def supports(model):
+    """Whether model is (or wraps) a forest the evaluator reproduces exactly"""
+    forest = getattr(model, "model", model)
+    if isinstance(forest, FlatForestRegressor):
+        return True
+    forest_class = loaded_class("sklearn.ensemble", "RandomForestRegressor")
+    return (
+        forest_class is not None
+        and isinstance(forest, forest_class)
+        and hasattr(forest, "estimators_")
+        and forest.n_outputs_ == 1
+    )
+
+
+def get_evaluator(model, num_features, grid):
+    """
+    Return the evaluator for a model, building it once per fitted forest.
+
+    Returns:
+        InterventionForestEvaluator or None when the model is not a supported forest
+    """
+    if not supports(model):
+        return None
+    forest = getattr(model, "model", model)
+    with _EVALUATORS_LOCK:
+        evaluator = _EVALUATORS.get(forest)
+        # Refitting replaces estimators_, which invalidates the flattened trees
+        if evaluator is None or evaluator.fitted_estimators is not _fitted_state(forest):
+            evaluator = InterventionForestEvaluator(forest, num_features, grid)
+            _EVALUATORS[forest] = evaluator
+    return evaluator
@@ -0,0 +1,174 @@
+"""
+Bounded executor for CPU-heavy model inference.
+
+The ML and recommendation routes submit predictions here instead of running sklearn on
+the request worker, so the event loop and the CRUD endpoints stay responsive while heavy
+scoring runs. The pool is a thread pool by default. INFERENCE_EXECUTOR=process switches
+to a process pool, which side-steps the GIL. In that mode models are referred to by
+catalog name and each worker keeps its own resident copies. INFERENCE_WORKERS sizes the
+pool, and INFERENCE_MAX_PENDING bounds the submitted calls; further callers wait.
+
+Every pool worker preloads all catalogued models once when it starts.
+"""
+
+import asyncio
+import multiprocessing
+import os
+import time
+import weakref
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from dotenv import load_dotenv
+from fastapi import HTTPException
+
+from app.clients.service import logic, metrics
+from app.clients.service.ml_models import model_registry
+from app.clients.service.model_catalog import MODEL_CATALOG
+
+load_dotenv()
+
+# Reported when the client went away before its inference finished (nginx convention)
+CLIENT_CLOSED_REQUEST = 499
+DISCONNECT_POLL_SECONDS = 0.1
+
+
+def preload_models():
+    """Load every catalogued model into this process's registry; pool initializer"""
+    for model_name in MODEL_CATALOG.names():
+        model_registry.get(model_name)
+
+
+def _predict_timed(model, matrix):
+    started = time.perf_counter()
+    predictions = model.predict(matrix)
+    return predictions, time.perf_counter() - started
+
+
+def record_predict(model_name, rows, seconds):
+    """Record a predict call in the model catalog latency and the Prometheus metrics"""
+    MODEL_CATALOG.record_latency(model_name, seconds)
+    metrics.observe_predict(model_name, rows, seconds)
+
+
+def timed_predict(model, matrix):
+    """Predict a feature matrix and record the call's latency and row count"""
+    predictions, seconds = _predict_timed(model, matrix)
+    record_predict(str(model), len(matrix), seconds)
+    return predictions
+
+
+def predict_in_worker(model_name, matrix):
+    """
+    Predict with a pool process's resident copy of a model.
+
+    Returns:
+        tuple: (predictions, seconds); the parent records the timing, since metrics
+        recorded in a pool process would never be exported
+    """
+    return _predict_timed(model_registry.get(model_name), matrix)
+
+
+def recommend_in_worker(model_name, clients, top_k, search):
+    """Recommend interventions with a pool process's resident copy of a model"""
+    return logic.recommend_batch(clients, top_k, model_registry.get(model_name), **search)
+
+
+class InferenceExecutor:
+    """A thread or process pool that inference calls are submitted to asynchronously"""
+
+    def __init__(self, kind="thread", workers=None, max_pending=None):
+        """
+        Args:
+            kind (str): "thread" or "process"
+            workers (int): Pool size, defaults to the number of CPUs (at most 4)
+            max_pending (int): Calls submitted at once, defaults to 8 per worker
+        """
+        if kind not in ("thread", "process"):
+            raise ValueError(f"Unknown inference executor kind: {kind}")
+        self.kind = kind
+        self.workers = workers or min(4, os.cpu_count() or 1)
+        self.max_pending = max_pending or 8 * self.workers
+        self._pool = None
+        self._semaphores = weakref.WeakKeyDictionary()
+
+    @property
+    def pool(self):
+        """The underlying pool, started on first use"""
+        if self._pool is None:
+            if self.kind == "process":
+                self._pool = ProcessPoolExecutor(
+                    self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=preload_models,
+                )
+            else:
+                self._pool = ThreadPoolExecutor(
+                    self.workers, thread_name_prefix="inference", initializer=preload_models
+                )
+        return self._pool
+
+    def _semaphore(self):
+        # asyncio primitives belong to one event loop, so keep one per running loop
+        loop = asyncio.get_running_loop()
+        semaphore = self._semaphores.get(loop)
+        if semaphore is None:
+            semaphore = self._semaphores[loop] = asyncio.Semaphore(self.max_pending)
+        return semaphore
+
+    async def run(self, function, *args):
+        """Run function(*args) in the pool, waiting for a free slot first"""
+        async with self._semaphore():
+            return await asyncio.get_running_loop().run_in_executor(self.pool, function, *args)
+
+    async def predict(self, model, matrix):
+        """Predict a feature matrix with a resident model"""
+        if self.kind == "process":
+            predictions, seconds = await self.run(predict_in_worker, str(model), matrix)
+            record_predict(str(model), len(matrix), seconds)
+            return predictions
+        return await self.run(timed_predict, model, matrix)
+
+    async def recommend(self, model, clients, top_k, **search):
+        """Recommend interventions for raw client profiles, see logic.recommend_batch"""
+        if self.kind == "process":
+            return await self.run(recommend_in_worker, str(model), clients, top_k, search)
+        return await self.run(lambda: logic.recommend_batch(clients, top_k, model, **search))
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+
+async def run_cancellable(request, awaitable):
+    """
+    Await an inference call, cancelling it if the client disconnects first.
+
+    A call still queued for the pool is dropped; one already running finishes in the
+    background and its result is discarded.
+
+    Raises:
+        HTTPException: 499 if the client disconnected
+    """
+    task = asyncio.ensure_future(awaitable)
+    while True:
+        done, _ = await asyncio.wait({task}, timeout=DISCONNECT_POLL_SECONDS)
+        if done:
+            return task.result()
+        if await request.is_disconnected():
+            task.cancel()
+            raise HTTPException(status_code=CLIENT_CLOSED_REQUEST, detail="Client closed request")
+
+
+def executor_from_env():
+    """Return the InferenceExecutor configured by the environment"""
+    workers = os.getenv("INFERENCE_WORKERS")
+    max_pending = os.getenv("INFERENCE_MAX_PENDING")
+    return InferenceExecutor(
+        kind=os.getenv("INFERENCE_EXECUTOR", "thread").lower(),
+        workers=int(workers) if workers else None,
+        max_pending=int(max_pending) if max_pending else None,
+    )
+
+
+inference_executor = executor_from_env()
@@ -0,0 +1,107 @@
+"""
+Factorized intervention scoring for a fitted RBF-kernel SVR.
+
+The RBF kernel splits into a demographic factor and an intervention factor:
+exp(-g||x - s||^2) = exp(-g||d - s_d||^2) * exp(-g||i - s_i||^2). The intervention factor of
+every grid combination against every support vector is tabulated once per model. Scoring
+a client's combinations then takes one pass over the support vectors for the demographic
+factor, plus one matrix product with the table. The scores agree with SVR.predict to
+floating-point rounding.
+"""
+
+# pylint: disable=too-few-public-methods
+
+import threading
+import weakref
+
+import numpy as np
+
+from app.clients.service.model_helper import loaded_class
+from app.clients.service.numpy_models import NumpyRBFRegressor
+
+
+def _squared_distances(points, vectors):
+    """(len(points), len(vectors)) squared euclidean distances, summed term by term"""
+    return ((points[:, np.newaxis, :] - vectors[np.newaxis, :, :]) ** 2).sum(axis=2)
+
+
+class RBFInterventionScorer:
+    """Score intervention combinations of an RBF SVR from a precomputed kernel table"""
+
+    def __init__(self, model, num_features, grid):
+        """
+        Args:
+            model (SVR): Fitted RBF-kernel SVR with dense support vectors, or its
+                NumpyRBFRegressor export
+            num_features (int): Number of leading demographic columns
+            grid (np.array): (n_combinations, n_interventions) 0/1 intervention grid
+        """
+        support_vectors = np.asarray(model.support_vectors_, dtype=np.float64)
+        self.num_features = num_features
+        self.fitted_dual_coef = model.dual_coef_
+        if isinstance(model, NumpyRBFRegressor):
+            self.gamma = model.gamma
+        else:
+            self.gamma = model._gamma  # pylint: disable=protected-access
+        self.demographic_vectors = support_vectors[:, :num_features]
+        self.dual_coef = np.asarray(model.dual_coef_, dtype=np.float64).ravel()
+        self.intercept = float(np.ravel(model.intercept_)[0])
+        # (n_combinations, n_support_vectors) intervention factor of the kernel
+        self.table = np.exp(
+            -self.gamma * _squared_distances(grid, support_vectors[:, num_features:])
+        )
+
+    def score_batch(self, rows_data, rows):
+        """
+        Predict several clients with the given combinations.
+
+        Args:
+            rows_data (np.array): (n_clients, NUM_FEATURES) cleaned client rows
+            rows (np.array): Indices into the intervention grid
+
+        Returns:
+            np.array: (n_clients, len(rows)) predictions
+        """
+        distances = _squared_distances(
+            np.asarray(rows_data, dtype=np.float64), self.demographic_vectors
+        )
+        weights = np.exp(-self.gamma * distances) * self.dual_coef
+        return weights @ self.table[rows].T + self.intercept
+
+
+_SCORERS = weakref.WeakKeyDictionary()
+_SCORERS_LOCK = threading.Lock()
+
+
+def supports(model):
+    """Whether model is (or wraps) a fitted RBF-kernel SVR with dense support vectors"""
+    svr = getattr(model, "model", model)
+    if isinstance(svr, NumpyRBFRegressor):
+        return True
+    svr_class = loaded_class("sklearn.svm", "SVR")
+    return (
+        svr_class is not None
+        and isinstance(svr, svr_class)
+        and svr.kernel == "rbf"
+        and hasattr(svr, "dual_coef_")
+        and not svr._sparse  # pylint: disable=protected-access
+    )
+
+
+def get_scorer(model, num_features, grid):
+    """
+    Return the factorized scorer for a model, building it once per fitted SVR.
+
+    Returns:
+        RBFInterventionScorer or None when the model is not a supported SVR
+    """
+    if not supports(model):
+        return None
+    svr = getattr(model, "model", model)
+    with _SCORERS_LOCK:
+        scorer = _SCORERS.get(svr)
+        # Refitting replaces dual_coef_, which invalidates the kernel table
+        if scorer is None or scorer.fitted_dual_coef is not svr.dual_coef_:
+            scorer = RBFInterventionScorer(svr, num_features, grid)
+            _SCORERS[svr] = scorer
+    return scorer
@@ -0,0 +1,115 @@
+"""
+Closed-form intervention ranking for a fitted LinearRegression.
+
+A linear model adds the same contribution for an intervention combination to every
+client, so the ranking of the combinations is known before seeing the client. Only the
+combinations that could still reach the top k once rounding is accounted for are scored,
+with the same matrix product LinearRegression.predict performs. BLAS may round a product
+differently depending on the matrix it is part of, so the rates agree with predicting the
+full grid to within floating-point rounding, and combinations whose predictions tie to
+within rounding may be ordered differently.
+"""
+
+import threading
+import weakref
+
+import numpy as np
+
+from app.clients.service.model_helper import loaded_class
+from app.clients.service.numpy_models import NumpyLinearRegressor
+
+# Worst-case relative rounding of a float64 dot product over a few dozen features
+_ROUNDING = 64 * np.finfo(np.float64).eps
+
+
+class LinearInterventionScorer:
+    """Rank intervention combinations analytically from coef_ and intercept_"""
+
+    def __init__(self, model, num_features, grid):
+        """
+        Args:
+            model (LinearRegression): Fitted single-output linear model
+            num_features (int): Number of leading demographic columns
+            grid (np.array): (n_combinations, n_interventions) 0/1 intervention grid
+        """
+        self.num_features = num_features
+        self.grid = grid
+        self.fitted_coef = model.coef_
+        self.coef = np.asarray(model.coef_, dtype=np.float64)
+        self.intercept = model.intercept_
+        self.contributions = grid @ self.coef[num_features:]
+        self._scale = np.abs(self.coef[num_features:]).sum() + abs(self.intercept)
+
+    def shortlist(self, row_data, rows, top_k):
+        """
+        Positions in rows that can rank among the top_k for this client.
+
+        Args:
+            row_data (array-like): NUM_FEATURES cleaned demographic features
+            rows (np.array): Candidate indices into the intervention grid
+            top_k (int): Number of combinations requested
+
+        Returns:
+            np.array: Ascending positions into rows
+        """
+        contributions = self.contributions[rows]
+        if top_k >= len(rows):
+            return np.arange(len(rows))
+        kth = np.partition(contributions, len(rows) - top_k)[len(rows) - top_k]
+        scale = np.abs(np.asarray(row_data, dtype=np.float64)) @ np.abs(
+            self.coef[: self.num_features]
+        )
+        return np.flatnonzero(contributions >= kth - 2 * _ROUNDING * (scale + self._scale))
+
+    def score_rows(self, row_data, rows):
+        """
+        Predict one client with the given combinations, as predict would.
+
+        Args:
+            row_data (array-like): NUM_FEATURES cleaned demographic features
+            rows (np.array): Indices into the intervention grid
+
+        Returns:
+            np.array: (len(rows),) predictions, equal to predict to within rounding
+        """
+        matrix = np.empty((len(rows), len(self.coef)))
+        matrix[:, : self.num_features] = row_data
+        matrix[:, self.num_features :] = self.grid[rows]
+        return matrix @ self.coef + self.intercept
+
+
+_SCORERS = weakref.WeakKeyDictionary()
+_SCORERS_LOCK = threading.Lock()
+
+
+def supports(model):
+    """Whether model is (or wraps) a fitted single-output LinearRegression or its export"""
+    linear = getattr(model, "model", model)
+    if isinstance(linear, NumpyLinearRegressor):
+        return True
+    linear_class = loaded_class("sklearn.linear_model", "LinearRegression")
+    return (
+        linear_class is not None
+        and isinstance(linear, linear_class)
+        and hasattr(linear, "coef_")
+        and np.ndim(linear.coef_) == 1
+    )
+
+
+def get_scorer(model, num_features, grid):
+    """
+    Return the closed-form scorer for a model, building it once per fitted model.
+
+    Returns:
+        LinearInterventionScorer or None when the model is not a supported linear model
+    """
+    if not supports(model):
+        return None
+    linear = getattr(model, "model", model)
+    with _SCORERS_LOCK:
+        scorer = _SCORERS.get(linear)
+        # Refitting replaces coef_, which invalidates the precomputed contributions
+        if scorer is None or scorer.fitted_coef is not linear.coef_:
+            scorer = LinearInterventionScorer(linear, num_features, grid)
+            _SCORERS[linear] = scorer
+    return scorer
@@ -5,16 +5,25 @@ Handles data cleaning, model predictions, and intervention combinations analysis
 
 # Standard library imports
 import os
+import threading
+from functools import lru_cache
+from typing import NamedTuple
 
 # Third-party imports
-import pickle
-
-# import json
-from itertools import product
-
 import numpy as np
 
-from app.clients.service.constants import COLUMNS_FIELDS
+from app.clients.service import forest, kernel, linear
+from app.clients.service.cache import LRUCache, feature_key
+from app.clients.service.constants import (
+    BOOLEAN_LABELS,
+    COLUMNS_FIELDS,
+    HOUSING_LABELS,
+    INCOME_SOURCE_LABELS,
+    SCHOOLING_LABELS,
+)
+from app.clients.service.encoder import encode_profiles
+from app.clients.service.model_helper import LazyModelLoader
+from app.clients.service.shared_models import load_artifact
 
 # Constants
 COLUMN_INTERVENTIONS = [
@@ -26,12 +35,43 @@ COLUMN_INTERVENTIONS = [
     "Employer Financial Supports",
     "Enhanced Referrals for Skills Development",
 ]
-
-# Load model
+NUM_FEATURES = len(COLUMNS_FIELDS)
+NUM_INTERVENTIONS = len(COLUMN_INTERVENTIONS)
+NUM_COMBINATIONS = 2**NUM_INTERVENTIONS
+# Clients scored per predict call; bounds the batch matrix to ~8 MB
+RECOMMENDATION_CHUNK_SIZE = 256
+# Above this many clients one vectorised predict call beats walking the forest per client
+FOREST_EVALUATOR_MAX_CLIENTS = 8
+# Cached prediction vectors are ~1 KB each
+RECOMMENDATION_CACHE_SIZE = 4096
+RECOMMENDATION_CACHE_TTL_SECONDS = 15 * 60
+
+# Every text answer convert_text understands, regardless of column
+TEXT_LABELS = {**INCOME_SOURCE_LABELS, **HOUSING_LABELS, **SCHOOLING_LABELS, **BOOLEAN_LABELS}
+
+# The model is loaded on first use, not at import; SHARED_MODELS=1 maps a shared copy
 CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
-MODEL_PATH = os.path.join(CURRENT_DIR, "model.pkl")
-with open(MODEL_PATH, "rb") as model_file:
-    MODEL = pickle.load(model_file)
+MODEL_PATH = os.path.join(CURRENT_DIR, "model.joblib")
+MODEL_LOADER = LazyModelLoader(MODEL_PATH, load=load_artifact)
+
+RECOMMENDATION_CACHE = LRUCache(RECOMMENDATION_CACHE_SIZE, RECOMMENDATION_CACHE_TTL_SECONDS)
+
+
+def get_model():
+    """
+    Return the default recommendation model, loading it on first use.
+
+    Returns:
+        RandomForestRegressor: The fitted model from MODEL_PATH
+    """
+    return MODEL_LOADER.get()
+
+
+def __getattr__(name):
+    # Keeps logic.MODEL working without loading the model at import
+    if name == "MODEL":
+        return get_model()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 def clean_input_data(input_data):
@@ -43,16 +83,11 @@ def clean_input_data(input_data):
 
     Returns:
         list: Cleaned and formatted data ready for model input
-    """
 
-    demographics = {key: input_data[key] for key in COLUMNS_FIELDS}
-    output = []
-    for column in COLUMNS_FIELDS:
-        value = demographics.get(column, None)
-        if isinstance(value, str):
-            value = convert_text(value)  # Removed 'column' from here as it wasn't used
-        output.append(value)
-    return output
+    Raises:
+        UnknownLabelError: If an answer cannot be converted to a number
+    """
+    return encode_profiles([input_data])[0].tolist()
 
 
 def convert_text(text_data: str):
@@ -65,53 +100,8 @@ def convert_text(text_data: str):
     Returns:
         int: Converted numerical value
     """
-    categorical_mappings = [
-        {"": 0, "true": 1, "false": 0, "no": 0, "yes": 1, "No": 0, "Yes": 1},
-        {
-            "Grade 0-8": 1,
-            "Grade 9": 2,
-            "Grade 10": 3,
-            "Grade 11": 4,
-            "Grade 12 or equivalent": 5,
-            "OAC or Grade 13": 6,
-            "Some college": 7,
-            "Some university": 8,
-            "Some apprenticeship": 9,
-            "Certificate of Apprenticeship": 10,
-            "Journeyperson": 11,
-            "Certificate/Diploma": 12,
-            "Bachelor's degree": 13,
-            "Post graduate": 14,
-        },
-        {
-            "Renting-private": 1,
-            "Renting-subsidized": 2,
-            "Boarding or lodging": 3,
-            "Homeowner": 4,
-            "Living with family/friend": 5,
-            "Institution": 6,
-            "Temporary second residence": 7,
-            "Band-owned home": 8,
-            "Homeless or transient": 9,
-            "Emergency hostel": 10,
-        },
-        {
-            "No Source of Income": 1,
-            "Employment Insurance": 2,
-            "Workplace Safety and Insurance Board": 3,
-            "Ontario Works applied or receiving": 4,
-            "Ontario Disability Support Program applied or receiving": 5,
-            "Dependent of someone receiving OW or ODSP": 6,
-            "Crown Ward": 7,
-            "Employment": 8,
-            "Self-Employment": 9,
-            "Other (specify)": 10,
-        },
-    ]
-    for category in categorical_mappings:
-        if text_data in category:
-            return category[text_data]
-
+    if text_data in TEXT_LABELS:
+        return TEXT_LABELS[text_data]
     return int(text_data) if text_data.isnumeric() else text_data
 
 
@@ -119,28 +109,151 @@ def create_matrix(row_data):
     """
     Create matrix of all possible intervention combinations.
 
+    The matrix is a per-thread buffer whose intervention columns are filled once
+    from INTERVENTION_GRID; each call only broadcasts the client's features into
+    the leading columns. Copy the result if it must outlive the next call.
+
     Args:
         row_data (list): Base data row
 
     Returns:
         np.array: Matrix of all possible intervention combinations
     """
-    data = [row_data.copy() for _ in range(128)]
-    perms = intervention_permutations(7)
-    return np.concatenate((np.array(data), np.array(perms)), axis=1)
+    matrix = _get_matrix_buffer(1, FULL_SEARCH_SPACE.rows)
+    matrix[:, :NUM_FEATURES] = row_data
+    return matrix
+
+
+def create_batch_matrix(rows_data, combinations=None):
+    """
+    Create one matrix holding the given intervention combinations for several clients.
+
+    Client i occupies rows [i * m, (i + 1) * m) where m is the number of
+    combinations. Like create_matrix, the result is a reused per-thread buffer.
+
+    Args:
+        rows_data (np.array): (n_clients, NUM_FEATURES) cleaned client rows
+        combinations (np.array): Read-only INTERVENTION_GRID row indices, defaults to all
+
+    Returns:
+        np.array: (n_clients * m, NUM_FEATURES + NUM_INTERVENTIONS) matrix
+    """
+    combinations = FULL_SEARCH_SPACE.rows if combinations is None else combinations
+    num_clients = len(rows_data)
+    matrix = _get_matrix_buffer(num_clients, combinations)
+    blocks = matrix.reshape(num_clients, len(combinations), -1)
+    blocks[:, :, :NUM_FEATURES] = np.asarray(rows_data)[:, np.newaxis, :]
+    return matrix
 
 
 def intervention_permutations(num):
     """
     Generate all possible intervention combinations.
 
+    Rows follow the order of itertools.product([0, 1], repeat=num), so the first
+    row is the all-zero (baseline) combination.
+
     Args:
         num (int): Number of interventions
 
     Returns:
         np.array: Matrix of all possible combinations
     """
-    return np.array(list(product([0, 1], repeat=num)))
+    shifts = np.arange(num - 1, -1, -1)
+    return (np.arange(2**num)[:, np.newaxis] >> shifts) & 1
+
+
+# Built once at import; shared read-only by every recommendation
+INTERVENTION_GRID = intervention_permutations(NUM_INTERVENTIONS)
+INTERVENTION_GRID.setflags(write=False)
+
+
+class SearchSpace(NamedTuple):
+    """Grid rows scored for a constrained search; rows[0] is always the baseline"""
+
+    rows: np.ndarray
+    first_candidate: int
+    key: tuple
+
+
+@lru_cache(maxsize=128)
+def _build_search_space(max_interventions, include, exclude):
+    grid = INTERVENTION_GRID
+    feasible = np.ones(NUM_COMBINATIONS, dtype=bool)
+    if max_interventions is not None:
+        feasible &= grid.sum(axis=1) <= max_interventions
+    for column in include:
+        feasible &= grid[:, column] == 1
+    for column in exclude:
+        feasible &= grid[:, column] == 0
+    candidates = np.flatnonzero(feasible)
+    if len(candidates) == 0:
+        raise ValueError("No intervention combination satisfies the constraints")
+    # The baseline is always scored, but only ranked when it is itself feasible
+    first_candidate = 0 if feasible[0] else 1
+    rows = candidates if first_candidate == 0 else np.concatenate(([0], candidates))
+    rows.setflags(write=False)
+    return SearchSpace(rows, first_candidate, (max_interventions, include, exclude))
+
+
+def intervention_search_space(max_interventions=None, include=(), exclude=()):
+    """
+    Resolve search constraints into the grid rows that need scoring.
+
+    Infeasible combinations are dropped here, before any prediction, and the
+    result is cached so repeated queries share one read-only index array.
+
+    Args:
+        max_interventions (int): Maximum number of simultaneous interventions
+        include (iterable): Intervention names every combination must contain
+        exclude (iterable): Intervention names no combination may contain
+
+    Returns:
+        SearchSpace: Grid rows to score and where the ranked candidates start
+    """
+    unknown = [name for name in (*include, *exclude) if name not in COLUMN_INTERVENTIONS]
+    if unknown:
+        raise ValueError(f"Unknown interventions: {', '.join(unknown)}")
+    return _build_search_space(
+        max_interventions,
+        frozenset(COLUMN_INTERVENTIONS.index(name) for name in include),
+        frozenset(COLUMN_INTERVENTIONS.index(name) for name in exclude),
+    )
+
+
+FULL_SEARCH_SPACE = intervention_search_space()
+
+_matrix_buffers = threading.local()
+
+
+def _get_matrix_buffer(num_clients, combinations):
+    """
+    Return this thread's reusable feature matrix with the intervention columns filled.
+
+    The storage only grows, and the intervention columns are only rewritten when
+    the combinations or the number of prefilled rows change, so steady-state
+    calls never allocate.
+
+    Args:
+        num_clients (int): Number of client blocks needed
+        combinations (np.array): Cached, read-only INTERVENTION_GRID row indices
+
+    Returns:
+        np.array: (num_clients * len(combinations), NUM_FEATURES + NUM_INTERVENTIONS) matrix
+    """
+    width = NUM_FEATURES + NUM_INTERVENTIONS
+    num_rows = num_clients * len(combinations)
+    state = _matrix_buffers
+    storage = getattr(state, "storage", None)
+    if storage is None or len(storage) < num_rows * width:
+        storage = state.storage = np.empty(num_rows * width)
+        state.combinations, state.filled_rows = None, 0
+    matrix = storage[: num_rows * width].reshape(num_rows, width)
+    if state.combinations is not combinations or state.filled_rows < num_rows:
+        blocks = matrix.reshape(num_clients, len(combinations), width)
+        blocks[:, :, NUM_FEATURES:] = INTERVENTION_GRID[combinations]
+        state.combinations, state.filled_rows = combinations, num_rows
+    return matrix
 
 
 def get_baseline_row(row_data):
@@ -185,6 +298,224 @@ def process_results(baseline_pred, results_matrix):
     return {"baseline": baseline_pred[-1], "interventions": result_list}
 
 
+def model_identity(model=None):
+    """
+    Identify the model whose predictions are being cached.
+
+    Args:
+        model: Fitted regressor, defaults to MODEL
+
+    Returns:
+        tuple: Model name and artifact version, or None if the model cannot be identified
+    """
+    if model is None:
+        get_model()
+        return (os.path.basename(MODEL_PATH), MODEL_LOADER.signature)
+    if hasattr(model, "identity"):
+        return model.identity()
+    return None
+
+
+def score_interventions(rows_data, model=None, space=FULL_SEARCH_SPACE):
+    """
+    Predict the combinations of a search space for a batch of clients with one predict call.
+    Small batches scored by a random forest use the intervention-aware evaluator in forest.py
+    instead, which gives the same predictions without expanding the matrix. RBF SVMs are
+    scored from the factorized kernel in kernel.py.
+
+    Args:
+        rows_data (np.array): (n_clients, NUM_FEATURES) cleaned client rows
+        model: Fitted regressor, defaults to MODEL
+        space (SearchSpace): Combinations to score
+
+    Returns:
+        np.array: (n_clients, len(space.rows)) predictions; column 0 is the baseline
+    """
+    model = get_model() if model is None else model
+    # NaN rows go to predict, which rejects them
+    if not np.isnan(rows_data).any():
+        scorer = kernel.get_scorer(model, NUM_FEATURES, INTERVENTION_GRID)
+        if scorer is not None:
+            return scorer.score_batch(rows_data, space.rows)
+        if len(rows_data) <= FOREST_EVALUATOR_MAX_CLIENTS:
+            evaluator = forest.get_evaluator(model, NUM_FEATURES, INTERVENTION_GRID)
+            if evaluator is not None:
+                return evaluator.score_batch(rows_data, space.rows)
+    predictions = model.predict(create_batch_matrix(rows_data, space.rows))
+    return predictions.reshape(len(rows_data), len(space.rows))
+
+
+def top_k_indices(scores, top_k):
+    """
+    Select the positions of the top_k scores without sorting the whole array.
+
+    Uses a partial selection to find the k-th largest score and only sorts the
+    scores at or above it. Ties are broken by position, later positions ranking
+    higher, exactly as a stable full sort would.
+
+    Args:
+        scores (np.array): 1-D scores
+        top_k (int): Number of positions to return
+
+    Returns:
+        np.array: Positions of the top_k scores in ascending order of score
+    """
+    if top_k < len(scores):
+        threshold = np.partition(scores, len(scores) - top_k)[len(scores) - top_k]
+        positions = np.flatnonzero(scores >= threshold)
+    else:
+        positions = np.arange(len(scores))
+    order = positions[np.argsort(scores[positions], kind="stable")]
+    return order[-top_k:]
+
+
+def top_interventions(predictions, top_k=3, space=FULL_SEARCH_SPACE):
+    """
+    Build the recommendation for one client from its combination predictions.
+
+    Args:
+        predictions (np.array): Predictions for space.rows, baseline first
+        top_k (int): Number of combinations to return
+        space (SearchSpace): Combinations the predictions belong to
+
+    Returns:
+        dict: Baseline and the top_k combinations in ascending order of prediction
+    """
+    candidate_predictions = predictions[space.first_candidate :]
+    top = top_k_indices(candidate_predictions, top_k)
+    top_rows = space.rows[space.first_candidate :][top]
+    top_results = np.column_stack((INTERVENTION_GRID[top_rows], candidate_predictions[top]))
+    return process_results(predictions[:1], top_results)
+
+
+def linear_recommendation(row_data, scorer, top_k=3, space=FULL_SEARCH_SPACE):
+    """
+    Build the recommendation for one client of a linear model without scoring the grid.
+
+    Combinations are shortlisted from the model's coefficients and only the baseline and
+    the shortlist are predicted, giving the same result as top_interventions over every
+    prediction in the space to within floating-point rounding.
+
+    Args:
+        row_data (np.array): NUM_FEATURES cleaned client features
+        scorer (LinearInterventionScorer): Scorer for the active linear model
+        top_k (int): Number of combinations to return
+        space (SearchSpace): Combinations to rank
+
+    Returns:
+        dict: Baseline and the top_k combinations in ascending order of prediction
+    """
+    candidates = space.rows[space.first_candidate :]
+    shortlist = candidates[scorer.shortlist(row_data, candidates, top_k)]
+    predictions = scorer.score_rows(row_data, np.concatenate(([0], shortlist)))
+    top = top_k_indices(predictions[1:], top_k)
+    top_results = np.column_stack((INTERVENTION_GRID[shortlist[top]], predictions[1:][top]))
+    return process_results(predictions[:1], top_results)
+
+
+def iter_recommendations(
+    clients,
+    top_k=3,
+    model=None,
+    chunk_size=RECOMMENDATION_CHUNK_SIZE,
+    cache=RECOMMENDATION_CACHE,
+    **search,
+):
+    """
+    Lazily generate recommendations for many clients, scoring them chunk by chunk.
+
+    Prediction vectors are cached per cleaned feature vector, model identity and
+    search space, so repeated profiles skip the model entirely. Models without an
+    identity (see model_identity) are never cached. Linear models are ranked in
+    closed form instead, see linear_recommendation.
+
+    Args:
+        clients (iterable): Raw input dicts, one per client
+        top_k (int): Number of combinations per client
+        model: Fitted regressor, defaults to MODEL
+        chunk_size (int): Clients scored per predict call
+        cache (LRUCache): Prediction cache, or None to always score
+        **search: max_interventions, include and exclude constraints,
+            see intervention_search_space
+
+    Yields:
+        dict: Processed results for each client, in input order
+    """
+    space = intervention_search_space(**search)
+    if model_identity(model) is None:
+        cache = None
+    chunk = []
+    for input_data in clients:
+        chunk.append(input_data)
+        if len(chunk) == chunk_size:
+            yield from _recommend_chunk(chunk, top_k, model, space, cache)
+            chunk = []
+    if chunk:
+        yield from _recommend_chunk(chunk, top_k, model, space, cache)
+
+
+def _recommend_chunk(clients, top_k, model, space, cache):
+    rows = encode_profiles(clients)
+    active = get_model() if model is None else model
+    scorer = linear.get_scorer(active, NUM_FEATURES, INTERVENTION_GRID)
+    if scorer is not None:
+        for row in rows:
+            yield linear_recommendation(row, scorer, top_k, space)
+        return
+    if cache is None:
+        predictions = score_interventions(rows, model, space)
+    else:
+        predictions = _cached_predictions(rows, model, space, cache)
+    for client_predictions in predictions:
+        yield top_interventions(client_predictions, top_k, space)
+
+
+def _cached_predictions(rows, model, space, cache):
+    identity = model_identity(model)
+    keys = [(identity, space.key, feature_key(row)) for row in rows]
+    predictions = [cache.get(key) for key in keys]
+    missing = [i for i, cached in enumerate(predictions) if cached is None]
+    if missing:
+        for i, scored in zip(missing, score_interventions(rows[missing], model, space)):
+            predictions[i] = scored.copy()
+            predictions[i].setflags(write=False)
+            cache.set(keys[i], predictions[i])
+    return predictions
+
+
+def recommend_batch(clients, top_k=3, model=None, **options):
+    """
+    Generate recommendations for a list of clients.
+
+    Args:
+        clients (list): Raw input dicts, one per client
+        top_k (int): Number of combinations per client
+        model: Fitted regressor, defaults to MODEL
+        **options: chunk_size, cache and search constraints, see iter_recommendations
+
+    Returns:
+        list: Processed results for each client, in input order
+    """
+    return list(iter_recommendations(clients, top_k, model, **options))
+
+
+def search_interventions(input_data, top_k=3, model=None, **search):
+    """
+    Find the best intervention combinations for one client under constraints.
+
+    Args:
+        input_data (dict): Raw input data from client
+        top_k (int): Number of combinations to return
+        model: Fitted regressor, defaults to MODEL
+        **search: max_interventions, include and exclude constraints,
+            see intervention_search_space
+
+    Returns:
+        dict: Processed results with recommendations
+    """
+    return recommend_batch([input_data], top_k, model, **search)[0]
+
+
 def interpret_and_calculate(input_data):
     """
     Main function to process input data and generate intervention recommendations.
@@ -195,16 +526,7 @@ def interpret_and_calculate(input_data):
     Returns:
         dict: Processed results with recommendations
     """
-    raw_data = clean_input_data(input_data)
-    baseline_row = get_baseline_row(raw_data).reshape(1, -1)
-    intervention_rows = create_matrix(raw_data)
-    baseline_prediction = MODEL.predict(baseline_row)
-    intervention_predictions = MODEL.predict(intervention_rows).reshape(-1, 1)
-    result_matrix = np.concatenate((intervention_rows, intervention_predictions), axis=1)
-    result_order = result_matrix[:, -1].argsort()
-    result_matrix = result_matrix[result_order]
-    top_results = result_matrix[-3:, -8:]
-    return process_results(baseline_prediction, top_results)
+    return recommend_batch([input_data])[0]
 
 
 if __name__ == "__main__":
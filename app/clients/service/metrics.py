@@ -0,0 +1,76 @@
+"""
+Prometheus metrics of the ML prediction routes.
+
+Each prediction is timed per model and per stage: validate (turning the request into a
+feature row), build (assembling the numpy matrix), predict (the model call itself) and
+serialize (building the response). Predict calls also count the rows they scored. GET
+/ml_models/metrics exports everything in the Prometheus text format.
+"""
+
+import time
+from contextlib import contextmanager
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    CollectorRegistry,
+    Counter,
+    Histogram,
+    generate_latest,
+)
+
+STAGES = ("validate", "build", "predict", "serialize")
+# Seconds; single rows take well under a millisecond, large batches up to seconds
+STAGE_BUCKETS = (0.0001, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 5)
+ROWS_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256, 512, 1024, 2048, 4096, 8192)
+
+# Kept apart from prometheus_client's global registry so tests and reloads start clean
+METRICS_REGISTRY = CollectorRegistry()
+
+STAGE_SECONDS = Histogram(
+    "model_stage_seconds",
+    "Time spent in each stage of a prediction request",
+    ["model", "stage"],
+    buckets=STAGE_BUCKETS,
+    registry=METRICS_REGISTRY,
+)
+PREDICT_ROWS = Histogram(
+    "model_predict_rows",
+    "Rows scored per model predict call",
+    ["model"],
+    buckets=ROWS_BUCKETS,
+    registry=METRICS_REGISTRY,
+)
+PREDICT_ERRORS = Counter(
+    "model_predict_errors", "Prediction requests that failed", ["model"], registry=METRICS_REGISTRY
+)
+
+
+def observe_stage(model_name, stage, seconds):
+    """Record how long one stage of a prediction took"""
+    STAGE_SECONDS.labels(model=model_name, stage=stage).observe(seconds)
+
+
+def observe_predict(model_name, rows, seconds):
+    """Record one model predict call and the rows it scored"""
+    observe_stage(model_name, "predict", seconds)
+    PREDICT_ROWS.labels(model=model_name).observe(rows)
+
+
+@contextmanager
+def stage_timer(model_name, stage):
+    """Time the enclosed block as a stage of a prediction with model_name"""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe_stage(model_name, stage, time.perf_counter() - started)
+
+
+def render():
+    """
+    Return the metrics in the Prometheus text exposition format.
+
+    Returns:
+        tuple: (payload bytes, content type)
+    """
+    return generate_latest(METRICS_REGISTRY), CONTENT_TYPE_LATEST
@@ -1,25 +1,51 @@
+import logging
 import os
+import threading
+import time
 from abc import ABC, abstractmethod
-from typing import List
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
 
 import pickle
 import numpy as np
-from sklearn.ensemble import RandomForestRegressor
-from sklearn.linear_model import LinearRegression
-from sklearn.svm import SVR
 
-from app.clients.service.model_helper import get_all_feature_columns, get_true_file_name
+from app.clients.service.flat_forest import CompactForestRegressor
+from app.clients.service.model_catalog import MODEL_CATALOG, ModelCatalog
+from app.clients.service.model_helper import (
+    artifact_checksum,
+    artifact_signature,
+    get_all_feature_columns,
+    get_true_file_name,
+)
+from app.clients.service.numpy_models import (
+    NUMPY_SUFFIX,
+    load_numpy_artifact,
+    serving_artifact_path,
+)
+from app.clients.service.shared_models import load_shared, shared_models_enabled
+
+logger = logging.getLogger(__name__)
 
 default_unformatted_model_path = os.path.join(
     os.path.dirname(__file__), "pretrained_models", "model_{}.pkl"
 )
 
+# Prediction engines a loaded estimator can be compiled to, see ModelSpec.engines
+DEFAULT_ENGINE = "sklearn"
+MODEL_ENGINES = {
+    DEFAULT_ENGINE: lambda estimator: estimator,
+    "arrays": CompactForestRegressor.from_forest,
+}
+
 
 class InterfaceBaseMLModel(ABC):
     """Interface of a base ML Model"""
 
     def __init__(self):
         self.feature_columns = get_all_feature_columns()
+        self.model = None
+        self.model_path = None
+        self.loaded_signature = None
+        self.engine = DEFAULT_ENGINE
 
     @abstractmethod
     def fit(self, features: np.ndarray, targets: np.ndarray):
@@ -42,17 +68,45 @@ class InterfaceBaseMLModel(ABC):
     def __str__(self) -> str:
         """Return the name of the model"""
 
+    def artifact_path(self) -> str:
+        """Path of the pretrained artifact for this model"""
+        if self.model_path is not None:
+            return self.model_path
+        return get_true_file_name(str(self), default_unformatted_model_path)
+
     def load_if_trained(self):
-        pass
+        path = self.artifact_path()
+        logger.debug("Attempting to load model from: %s", path)
+        if os.path.exists(path):
+            logger.debug("Model file exists, loading...")
+            signature = artifact_signature(path)
+            if path.endswith(NUMPY_SUFFIX):
+                self.model = load_numpy_artifact(path)
+            elif shared_models_enabled():
+                self.model = load_shared(path)
+            else:
+                self.model = InterfaceBaseMLModel.load(path)
+            self.loaded_signature = signature
+        else:
+            logger.debug("Model file not found at %s", path)
 
+    def identity(self):
+        """Identify the model, its engine and the artifact version currently in memory"""
+        if self.engine == DEFAULT_ENGINE:
+            return (str(self), self.loaded_signature)
+        return (f"{self}/{self.engine}", self.loaded_signature)
 
-class LinearRegressionModel(InterfaceBaseMLModel):
-    def __init__(self):
-        super().__init__()
-        self.model = LinearRegression()
 
+# sklearn is imported when a model is fitted, not at import, so serving from NumPy
+# exports never loads it
+# pylint: disable=import-outside-toplevel
+
+
+class LinearRegressionModel(InterfaceBaseMLModel):
     def fit(self, features, targets):
-        self.model.fit(features, targets)
+        from sklearn.linear_model import LinearRegression
+
+        self.model = LinearRegression().fit(features, targets)
 
     def predict(self, features):
         return self.model.predict(features)
@@ -60,23 +114,19 @@ class LinearRegressionModel(InterfaceBaseMLModel):
     def __str__(self):
         return "Linear Regression"
 
-    def load_if_trained(self):
-        path = get_true_file_name(str(self), default_unformatted_model_path)
-        print(f"Attempting to load model from: {path}")
-        if os.path.exists(path):
-            print("Model file exists, loading...")
-            self.model = InterfaceBaseMLModel.load(path)
-        else:
-            print(f"Model file not found at {path}")
-
 
 class RandomForestModel(InterfaceBaseMLModel):
     def __init__(self, n_estimators=100, random_state=42):
         super().__init__()
-        self.model = RandomForestRegressor(n_estimators=n_estimators, random_state=random_state)
+        self.n_estimators = n_estimators
+        self.random_state = random_state
 
     def fit(self, features, targets):
-        self.model.fit(features, targets)
+        from sklearn.ensemble import RandomForestRegressor
+
+        self.model = RandomForestRegressor(
+            n_estimators=self.n_estimators, random_state=self.random_state
+        ).fit(features, targets)
 
     def predict(self, features):
         return self.model.predict(features)
@@ -84,38 +134,21 @@ class RandomForestModel(InterfaceBaseMLModel):
     def __str__(self):
         return "Random Forest Regressor"
 
-    def load_if_trained(self):
-        path = get_true_file_name(str(self), default_unformatted_model_path)
-        print(f"Attempting to load model from: {path}")
-        if os.path.exists(path):
-            print("Model file exists, loading...")
-            self.model = InterfaceBaseMLModel.load(path)
-        else:
-            print(f"Model file not found at {path}")
-
 
 class SVMModel(InterfaceBaseMLModel):
-    def __init__(self):
-        super().__init__()
-        self.model = SVR()
-
     def fit(self, features, targets):
-        self.model.fit(features, targets)
+        from sklearn.svm import SVR
+
+        self.model = SVR().fit(features, targets)
 
     def predict(self, features):
         return self.model.predict(features)
 
     def __str__(self):
-        return "SVM3"
+        return "Support Vector Machine"
 
-    def load_if_trained(self):
-        path = get_true_file_name(str(self), default_unformatted_model_path)
-        print(f"Attempting to load model from: {path}")
-        if os.path.exists(path):
-            print("Model file exists, loading...")
-            self.model = InterfaceBaseMLModel.load(path)
-        else:
-            print(f"Model file not found at {path}")
+
+# pylint: enable=import-outside-toplevel
 
 
 class InterfaceMLModelRepository(ABC):
@@ -144,37 +177,270 @@ class InterfaceMLModelManager(ABC):
     def switch_model(self, model_name: str) -> bool:
         """Switch between models"""
 
+    @abstractmethod
+    def rollback(self):
+        """Switch back to the previously active model"""
+
 
 class MLModelRepository(InterfaceMLModelRepository):
-    def __init__(self):
-        self._model_map = {
-            "Linear Regression": LinearRegressionModel,
-            "Random Forest Regressor": RandomForestModel,
-            "Support Vector Machine": SVMModel,
-        }
+    """Models described by a ModelCatalog; classes are only imported when instantiated"""
+
+    def __init__(self, catalog: ModelCatalog = MODEL_CATALOG):
+        self.catalog = catalog
 
     def list_models(self) -> List[InterfaceBaseMLModel]:
-        return [model_class() for model_class in self._model_map.values()]
+        return [self.get_model_instance(name) for name in self.catalog.names()]
 
     def is_model_available(self, model_name: str) -> bool:
-        return model_name in self._model_map
+        return model_name in self.catalog
 
     def get_model_instance(self, model_name: str) -> InterfaceBaseMLModel:
-        if not self.is_model_available(model_name):
-            raise ValueError(f"Model '{model_name}' is not available.")
-        return self._model_map[model_name]()
+        return self.catalog.model_class(model_name)()
+
+
+class ResidentModel(NamedTuple):
+    """A loaded model and the artifact version it was loaded from"""
+
+    model: InterfaceBaseMLModel
+    path: str
+    signature: Optional[Tuple[int, int]]
+    checksum: Optional[str]
+
+    def is_current(self, path, signature) -> bool:
+        return (self.path, self.signature) == (path, signature)
+
+
+class ModelRegistry:
+    """
+    Process-wide store of loaded models, keyed by model name.
+
+    Each resident model remembers the artifact path, (mtime, size) signature and
+    checksum it was loaded from. A lookup only stats the artifact. If the signature
+    changed but the contents did not, the resident model is kept; otherwise the
+    artifact is loaded again. Loads are single-flight: concurrent lookups of the
+    same model wait for one load instead of each unpickling the artifact.
+
+    Each model is served with the first engine its catalog spec lists unless another
+    supported engine is selected for it. Callbacks registered with on_change hear about
+    every resident model that is reloaded or dropped.
+    """
+
+    def __init__(self, repository: MLModelRepository, engines: Optional[Dict[str, str]] = None):
+        """
+        Args:
+            repository (MLModelRepository): Models and their catalog
+            engines (dict): Engine to serve each model with, {model name: engine}
+
+        Raises:
+            ValueError: If a model does not support the engine selected for it
+        """
+        self._repository = repository
+        self._resident: Dict[str, ResidentModel] = {}
+        self._locks: Dict[str, threading.Lock] = {}
+        self._locks_lock = threading.Lock()
+        self._engines: Dict[str, str] = {}
+        self._listeners: List[Callable[[str], None]] = []
+        for model_name, engine in (engines or {}).items():
+            self._check_engine(model_name, engine)
+            self._engines[model_name] = engine
+
+    def on_change(self, callback: Callable[[str], None]):
+        """Call callback(model_name) whenever a resident model is reloaded or dropped"""
+        self._listeners.append(callback)
+
+    def _changed(self, model_name: str):
+        for callback in self._listeners:
+            callback(model_name)
+
+    def _check_engine(self, model_name: str, engine: str):
+        if engine not in self._repository.catalog.spec(model_name).engines:
+            raise ValueError(f"Model '{model_name}' cannot be served with engine '{engine}'.")
+
+    def engine(self, model_name: str) -> str:
+        """The engine a model is served with"""
+        default = self._repository.catalog.spec(model_name).engines[0]
+        return self._engines.get(model_name, default)
+
+    def set_engine(self, model_name: str, engine: str):
+        """
+        Serve a model with another engine, compiled on its next lookup.
+
+        Raises:
+            ValueError: If the model is unknown or does not support the engine
+        """
+        self._check_engine(model_name, engine)
+        with self._lock_for(model_name):
+            self._engines[model_name] = engine
+            if self._resident.pop(model_name, None) is not None:
+                self._changed(model_name)
+
+    def _lock_for(self, model_name: str) -> threading.Lock:
+        with self._locks_lock:
+            return self._locks.setdefault(model_name, threading.Lock())
+
+    def get(self, model_name: str) -> InterfaceBaseMLModel:
+        """
+        Return the resident model, loading it only if its artifact changed.
+
+        Raises:
+            ValueError: If the model name is not in the repository
+        """
+        path = serving_artifact_path(self._repository.catalog.artifact_path(model_name))
+        resident = self._resident.get(model_name)
+        if resident is not None and resident.is_current(path, artifact_signature(path)):
+            return resident.model
+        with self._lock_for(model_name):
+            resident = self._resident.get(model_name)
+            signature = artifact_signature(path)
+            if resident is not None and resident.is_current(path, signature):
+                return resident.model
+            checksum = artifact_checksum(path) if signature is not None else None
+            if resident is not None and (resident.path, resident.checksum) == (path, checksum):
+                # Touched or copied over with identical contents: keep the model in memory
+                resident = resident._replace(signature=signature)
+            else:
+                model = self._repository.get_model_instance(model_name)
+                model.model_path = path
+                model.load_if_trained()
+                if model.loaded_signature is not None:
+                    model.engine = self.engine(model_name)
+                    model.model = MODEL_ENGINES[model.engine](model.model)
+                resident = ResidentModel(model, path, model.loaded_signature, checksum)
+                if model_name in self._resident:
+                    self._changed(model_name)
+            self._resident[model_name] = resident
+            return resident.model
+
+    def evict(self, model_name: str):
+        """Drop a resident model so the next lookup loads it again"""
+        with self._lock_for(model_name):
+            if self._resident.pop(model_name, None) is not None:
+                self._changed(model_name)
+
+
+class ActiveModel(NamedTuple):
+    """A version of the manager's current model selection and how long switching to it took"""
+
+    name: str
+    version: int
+    load_ms: float = 0.0
+    warmup_ms: float = 0.0
+    duration_ms: float = 0.0
+
+    def describe(self) -> dict:
+        return {
+            "model": self.name,
+            "version": self.version,
+            "load_ms": round(self.load_ms, 3),
+            "warmup_ms": round(self.warmup_ms, 3),
+            "duration_ms": round(self.duration_ms, 3),
+        }
 
 
 class MLModelManager(InterfaceMLModelManager):
-    def __init__(self, repository: InterfaceMLModelRepository):
+    """
+    Tracks the current model as a versioned ActiveModel reference.
+
+    Switching is two-phase: the target is loaded into the registry and warmed with one
+    prediction while requests keep being served by the current model, then the reference
+    is replaced in a single assignment. A request holds the model object it looked up, so
+    one in flight during a swap finishes on the old model. The previous model stays
+    resident in the registry, so rolling back needs no load.
+    """
+
+    def __init__(
+        self, repository: InterfaceMLModelRepository, registry: Optional[ModelRegistry] = None
+    ):
         self._repository = repository
-        self._current_model = repository.get_model_instance("Random Forest Regressor")
+        self._registry = registry or ModelRegistry(repository)
+        self._active = ActiveModel("Random Forest Regressor", 1)
+        self._previous: Optional[ActiveModel] = None
+        self._swap_lock = threading.Lock()
+
+    @property
+    def registry(self) -> ModelRegistry:
+        return self._registry
+
+    @property
+    def active(self) -> ActiveModel:
+        return self._active
+
+    @property
+    def previous(self) -> Optional[ActiveModel]:
+        return self._previous
 
     def get_current_model(self) -> InterfaceBaseMLModel:
-        return self._current_model
+        return self._registry.get(self._active.name)
+
+    def prepare(self, model_name: str) -> Tuple[float, float]:
+        """
+        Load a model into the registry and warm it with one prediction.
+
+        Returns:
+            tuple: (load_ms, warmup_ms)
+
+        Raises:
+            ValueError: If the model is unknown or has no trained artifact
+        """
+        started = time.perf_counter()
+        model = self._registry.get(model_name)
+        loaded = time.perf_counter()
+        if model.loaded_signature is None:
+            raise ValueError(f"Model '{model_name}' has no trained artifact.")
+        model.predict(np.zeros((1, len(model.feature_columns))))
+        return (loaded - started) * 1000, (time.perf_counter() - loaded) * 1000
+
+    def swap(self, model_name: str) -> ActiveModel:
+        """
+        Prepare a model, then make it the current model.
+
+        Returns:
+            ActiveModel: The new current model version with its switch timings
+
+        Raises:
+            ValueError: If the model is unknown or cannot be loaded
+        """
+        started = time.perf_counter()
+        load_ms, warmup_ms = self.prepare(model_name)
+        with self._swap_lock:
+            self._previous = self._active
+            self._active = ActiveModel(
+                model_name,
+                self._previous.version + 1,
+                load_ms,
+                warmup_ms,
+                (time.perf_counter() - started) * 1000,
+            )
+            return self._active
 
     def switch_model(self, model_name: str) -> bool:
-        if self._repository.is_model_available(model_name):
-            self._current_model = self._repository.get_model_instance(model_name)
-            return True
-        return False
+        if not self._repository.is_model_available(model_name):
+            return False
+        try:
+            self.swap(model_name)
+        except ValueError:
+            return False
+        return True
+
+    def rollback(self) -> ActiveModel:
+        """
+        Make the previously active model current again; rolling back twice undoes it.
+
+        Raises:
+            ValueError: If there was no previous model
+        """
+        if self._previous is None:
+            raise ValueError("No previous model to roll back to.")
+        return self.swap(self._previous.name)
+
+
+def engines_from_env() -> Dict[str, str]:
+    """Parse MODEL_ENGINES, e.g. "Random Forest Regressor=arrays", into {model name: engine}"""
+    pairs = [item.split("=", 1) for item in os.getenv("MODEL_ENGINES", "").split(";") if item]
+    return {name.strip(): engine.strip() for name, engine in pairs}
+
+
+# Shared by the ML model endpoints and the recommendation service
+model_repository = MLModelRepository()
+model_registry = ModelRegistry(model_repository, engines_from_env())
+model_manager = MLModelManager(model_repository, model_registry)
@@ -1,65 +1,249 @@
+from typing import Optional
+
 import numpy as np
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, BackgroundTasks, HTTPException, Request, Response, status
+from fastapi.concurrency import run_in_threadpool
+
+from app.clients.service import metrics
+from app.clients.service.batching import batcher_from_env
+from app.clients.service.cache import prediction_cache_from_env
+from app.clients.service.inference import inference_executor, run_cancellable
 
-from app.clients.service.ml_models import MLModelManager, MLModelRepository, \
-    InterfaceBaseMLModel
-from app.clients.service.models import PredictionFeatures, PredictionRequest
+from app.clients.service.ml_models import InterfaceBaseMLModel, model_manager, \
+    model_registry
+from app.clients.service.model_catalog import MODEL_CATALOG
+from app.clients.service.models import BatchPredictionRequest, PredictionFeatures, \
+    PredictionRequest
+from app.clients.service.recommendation_service import backfill_in_new_session
+from app.clients.service.shadow import shadow_evaluator
+from app.clients.service.warmup import model_warmup
 
 router = APIRouter(prefix="/ml_models", tags=["model"])
-model_repository = MLModelRepository()
-model_manager = MLModelManager(model_repository)
+# Rows per predict call in /predict/batch; bounds the memory of one call
+BATCH_PREDICTION_CHUNK_SIZE = 8192
 
 
 @router.get("/list")
 def list_models():
-    """List all available ML models"""
-    # return {"models": model_repository.list_models()}
-    return {"models": [str(model) for model in model_repository.list_models()]}
+    """List all available ML models with their catalog metadata, without loading them"""
+    return {"models": MODEL_CATALOG.names(), "catalog": MODEL_CATALOG.describe_all()}
+
+
+@router.get("/info/{model_name}")
+def model_info(model_name: str):
+    """Describe one ML model from the catalog"""
+    try:
+        return MODEL_CATALOG.describe(model_name)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e)) from e
 
 
 @router.post("/switch/{model_name}")
-def switch_models(model_name: str):
-    """Switch between ML models"""
-    success = model_manager.switch_model(model_name)
-    if not success:
-        raise HTTPException(status_code=400, detail="Model switch failed")
-    return {"message": f"Model switched to {model_name}"}
+def switch_models(model_name: str, background_tasks: BackgroundTasks):
+    """
+    Switch between ML models. The target is loaded and warmed while requests are still
+    served by the current model, then swapped in; the response reports how long it took.
+    """
+    try:
+        active = model_manager.swap(model_name)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Model switch failed: {str(e)}") from e
+    # Re-tag the stored recommendations with the new model once the response is sent
+    background_tasks.add_task(backfill_in_new_session)
+    return {"message": f"Model switched to {model_name}", **active.describe()}
+
+
+@router.post("/rollback")
+def rollback_model(background_tasks: BackgroundTasks):
+    """Switch back to the previous model, which is still resident"""
+    try:
+        active = model_manager.rollback()
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Rollback failed: {str(e)}") from e
+    background_tasks.add_task(backfill_in_new_session)
+    return {"message": f"Model rolled back to {active.name}", **active.describe()}
+
+
+@router.get("/ready")
+def readiness(response: Response):
+    """Report whether start-up warmup finished, with per-model load and warmup timings"""
+    report = model_warmup.status()
+    if not report["ready"]:
+        response.status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    return report
 
 
 @router.get("/current")
 def current_model():
     """Get the current ML model"""
     # return {"current_model": model_manager.get_current_model()}
-    return {"current_model": str(model_manager.get_current_model())}
+    active, previous = model_manager.active, model_manager.previous
+    return {
+        "current_model": active.name,
+        "version": active.version,
+        "previous_model": None if previous is None else previous.name,
+    }
+
+
+@router.post("/predict/batch")
+async def predict_batch(
+    request: BatchPredictionRequest, http_request: Request, model_name: Optional[str] = None
+):
+    """Predict many rows with the current ML model, or with model_name if given"""
+    try:
+        if model_name is None:
+            model = await run_in_threadpool(model_manager.get_current_model)
+        else:
+            model = await run_in_threadpool(model_registry.get, model_name)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e)) from e
+    for stage, seconds in request.stage_seconds().items():
+        metrics.observe_stage(str(model), stage, seconds)
+    predictions = await run_cancellable(
+        http_request, predict_chunks(model, request.feature_matrix()))
+    with metrics.stage_timer(str(model), "serialize"):
+        return {
+            "model": str(model), "count": len(predictions), "predictions": predictions.tolist()
+        }
 
 
 @router.post("/predict/{model_name}")
-def predict_with_model_name(features: PredictionFeatures, model_name: str):
+async def predict_with_model_name(
+    features: PredictionFeatures, model_name: str, http_request: Request, response: Response
+):
     """Predict based on a given ML model name"""
-    model = model_repository.get_model_instance(model_name)
-    # model.load_if_trained()
-    return predict_model(model, features)
+    try:
+        model = await run_in_threadpool(model_registry.get, model_name)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e)) from e
+    return await run_cancellable(http_request, predict_single(model, features, response))
 
 
 @router.post("/predict")
-def predict_with_current_model(features: PredictionFeatures):
+async def predict_with_current_model(
+    features: PredictionFeatures, http_request: Request, response: Response
+):
     """Predict based on current ML model"""
-    model = model_manager.get_current_model()
-    # model.load_if_trained()
-    return predict_model(model, features)
+    model = await run_in_threadpool(model_manager.get_current_model)
+    return await run_cancellable(
+        http_request, predict_single(model, features, response, shadow=True))
+
+
+@router.get("/cache")
+def prediction_cache_stats():
+    """Report hit, miss and eviction counters of the prediction cache"""
+    if prediction_cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **prediction_cache.stats()}
+
+
+@router.get("/metrics")
+def prometheus_metrics():
+    """Export per-model, per-stage prediction timings and row counts for Prometheus"""
+    payload, content_type = metrics.render()
+    return Response(content=payload, media_type=content_type)
+
 
+@router.get("/shadow")
+def shadow_metrics():
+    """Report how far the shadow models disagree with the current model, and their latency"""
+    if shadow_evaluator is None:
+        return {"enabled": False}
+    return shadow_evaluator.snapshot()
 
-def predict_model(model: InterfaceBaseMLModel, features: PredictionFeatures):
-    """Predict based on given ML model"""
-    model.load_if_trained()
-    prediction_request = PredictionRequest.from_structured_features(features)
+
+@router.get("/batching")
+def batching_metrics():
+    """Report micro-batching settings and queue-depth, batch-size and wait-time metrics"""
+    if prediction_batcher is None:
+        return {"enabled": False}
+    return {
+        "enabled": True,
+        "max_batch_size": prediction_batcher.max_batch_size,
+        "window_ms": prediction_batcher.window * 1000,
+        "metrics": prediction_batcher.metrics.snapshot(),
+    }
+
+
+# Opt-in with PREDICT_MICRO_BATCHING=1, see app.clients.service.batching. Batches are
+# predicted on the inference executor like every other call.
+prediction_batcher = batcher_from_env(inference_executor.predict)
+# Single-row predictions by model identity and feature vector; PREDICTION_CACHE_SIZE=0
+# disables it. Entries of a reloaded or evicted model are dropped.
+prediction_cache = prediction_cache_from_env()
+if prediction_cache is not None:
+    model_registry.on_change(prediction_cache.invalidate)
+
+
+async def cache_call(method, *args):
+    """Call a prediction cache method, off the event loop if it reaches a second tier"""
+    if prediction_cache.store is None:
+        return method(*args)
+    return await run_in_threadpool(method, *args)
+
+
+async def predict_chunks(model: InterfaceBaseMLModel, matrix: np.ndarray) -> np.ndarray:
+    """Predict a feature matrix on the inference executor in bounded chunks"""
     try:
-        prediction = model.predict(np.array([prediction_request.features]))
-        return {
-            "model": str(model),
-            "input": prediction_request.features,
-            "prediction": prediction.tolist(),
-        }
+        return np.concatenate([
+            await inference_executor.predict(
+                model, matrix[start:start + BATCH_PREDICTION_CHUNK_SIZE])
+            for start in range(0, len(matrix), BATCH_PREDICTION_CHUNK_SIZE)
+        ])
     except Exception as e:
+        metrics.PREDICT_ERRORS.labels(model=str(model)).inc()
         raise HTTPException(status_code=500,
                             detail=f"Prediction failed: {str(e)}") from e
+
+
+async def predict_single(
+    model: InterfaceBaseMLModel,
+    features: PredictionFeatures,
+    response: Optional[Response] = None,
+    shadow: bool = False,
+):
+    """
+    Predict one row, coalesced with concurrent requests when micro-batching is enabled.
+    Results come from the prediction cache when possible; the X-Cache response header
+    says whether it was a HIT or a MISS. With shadow, a predicted row is also queued for
+    the shadow models.
+    """
+    model_name = str(model)
+    with metrics.stage_timer(model_name, "validate"):
+        prediction_request = PredictionRequest.from_structured_features(features)
+    cache_key = None
+    if prediction_cache is not None:
+        cache_key = prediction_cache.key(model, prediction_request.features)
+        prediction = await cache_call(prediction_cache.get, cache_key)
+        if response is not None:
+            response.headers["X-Cache"] = "MISS" if prediction is None else "HIT"
+        if prediction is not None:
+            return prediction_response(model_name, prediction_request, prediction)
+    try:
+        if prediction_batcher is None:
+            with metrics.stage_timer(model_name, "build"):
+                matrix = np.array([prediction_request.features])
+            predictions = await inference_executor.predict(model, matrix)
+        else:
+            predictions = [await prediction_batcher.predict(model, prediction_request.features)]
+    except Exception as e:
+        metrics.PREDICT_ERRORS.labels(model=model_name).inc()
+        raise HTTPException(status_code=500,
+                            detail=f"Prediction failed: {str(e)}") from e
+    if shadow and shadow_evaluator is not None:
+        shadow_evaluator.submit_prediction(
+            model_name, np.array([prediction_request.features]), predictions)
+    prediction = np.asarray(predictions).tolist()
+    if cache_key is not None:
+        await cache_call(prediction_cache.set, cache_key, prediction)
+    return prediction_response(model_name, prediction_request, prediction)
+
+
+def prediction_response(model_name, prediction_request, prediction):
+    """The body of a single-row prediction"""
+    with metrics.stage_timer(model_name, "serialize"):
+        return {
+            "model": model_name,
+            "input": prediction_request.features,
+            "prediction": prediction,
+        }
@@ -20,6 +20,7 @@ import pandas as pd
 # from sklearn.linear_model import LinearRegression
 from sklearn.model_selection import train_test_split
 from app.clients.service.constants import COLUMNS_FIELDS, INTERVENTION_FIELDS
+from app.clients.service.numpy_models import numpy_artifact_path, save_numpy_artifact
 from .ml_models import (
     InterfaceBaseMLModel,
     LinearRegressionModel,
@@ -123,6 +124,8 @@ def save_model(model, model_type, filename=DEFAULT_UNFORMATTED_MODEL_PATH):
     true_file_name = get_true_file_name(model_type, filename)
     with open(true_file_name, "wb") as model_file:
         pickle.dump(model, model_file)
+    # Served with MODEL_BACKEND=numpy, without sklearn
+    save_numpy_artifact(model.model, numpy_artifact_path(true_file_name))
 
 
 def load_model(model_type, filename=DEFAULT_UNFORMATTED_MODEL_PATH):
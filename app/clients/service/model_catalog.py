@@ -0,0 +1,131 @@
+"""
+Declarative catalog of the ML models served by the /ml_models endpoints.
+
+Describing a model only reads this module and stats its artifact; it never imports the
+model classes or sklearn, so listing and introspection stay cheap. The model class is
+imported on demand when an instance is actually needed.
+"""
+
+import importlib
+import os
+import threading
+from datetime import datetime, timezone
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from app.clients.service.constants import COLUMNS_FIELDS, INTERVENTION_FIELDS
+
+PRETRAINED_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "pretrained_models")
+
+
+class ModelSpec(NamedTuple):
+    """Static description of a servable model"""
+
+    name: str
+    model_class: str  # "module:Class" of the InterfaceBaseMLModel subclass
+    estimator: str  # Estimator the class wraps, for display only
+    artifact: str  # File name under pretrained_models
+    feature_count: int = len(COLUMNS_FIELDS) + len(INTERVENTION_FIELDS)
+    # Prediction engines the model can be served with, the default first
+    engines: Tuple[str, ...] = ("sklearn",)
+
+
+MODEL_SPECS = (
+    ModelSpec(
+        "Linear Regression",
+        "app.clients.service.ml_models:LinearRegressionModel",
+        "sklearn.linear_model.LinearRegression",
+        "model_Linear_Regression.pkl",
+    ),
+    ModelSpec(
+        "Random Forest Regressor",
+        "app.clients.service.ml_models:RandomForestModel",
+        "sklearn.ensemble.RandomForestRegressor",
+        "model_Random_Forest_Regressor.pkl",
+        engines=("sklearn", "arrays"),
+    ),
+    ModelSpec(
+        "Support Vector Machine",
+        "app.clients.service.ml_models:SVMModel",
+        "sklearn.svm.SVR",
+        "model_Support_Vector_Machine.pkl",
+    ),
+)
+
+
+class ModelCatalog:
+    """Model specs plus the latency last measured for each model in this process"""
+
+    def __init__(self, specs=MODEL_SPECS, artifact_dir=PRETRAINED_DIR):
+        self._specs: Dict[str, ModelSpec] = {spec.name: spec for spec in specs}
+        self._artifact_dir = artifact_dir
+        self._latencies: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def __contains__(self, model_name) -> bool:
+        return model_name in self._specs
+
+    def names(self) -> List[str]:
+        """Names of all catalogued models, in declaration order"""
+        return list(self._specs)
+
+    def spec(self, model_name: str) -> ModelSpec:
+        """
+        Return the spec of a model.
+
+        Raises:
+            ValueError: If the model is not catalogued
+        """
+        if model_name not in self._specs:
+            raise ValueError(f"Model '{model_name}' is not available.")
+        return self._specs[model_name]
+
+    def artifact_path(self, model_name: str) -> str:
+        """Path of the pretrained artifact for a model"""
+        return os.path.join(self._artifact_dir, self.spec(model_name).artifact)
+
+    def model_class(self, model_name: str):
+        """Import and return the InterfaceBaseMLModel subclass of a model"""
+        module_name, class_name = self.spec(model_name).model_class.split(":")
+        return getattr(importlib.import_module(module_name), class_name)
+
+    def record_latency(self, model_name: str, seconds: float):
+        """Remember how long the latest prediction with a model took"""
+        with self._lock:
+            self._latencies[model_name] = seconds
+
+    def describe(self, model_name: str) -> Dict[str, Optional[object]]:
+        """
+        Describe a model from its spec and artifact metadata, without loading it.
+
+        Returns:
+            dict: name, class, estimator, artifact path and size, training timestamp
+            (artifact modification time), feature count, supported engines and last
+            latency in ms
+        """
+        spec = self.spec(model_name)
+        path = self.artifact_path(model_name)
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            stat = None
+        latency = self._latencies.get(model_name)
+        return {
+            "name": spec.name,
+            "class": spec.model_class.split(":")[1],
+            "estimator": spec.estimator,
+            "artifact_path": path,
+            "artifact_size": stat.st_size if stat else None,
+            "trained_at": (
+                datetime.fromtimestamp(stat.st_mtime, timezone.utc).isoformat() if stat else None
+            ),
+            "feature_count": spec.feature_count,
+            "engines": list(spec.engines),
+            "last_latency_ms": latency * 1000 if latency is not None else None,
+        }
+
+    def describe_all(self) -> List[Dict[str, Optional[object]]]:
+        """Describe every catalogued model"""
+        return [self.describe(model_name) for model_name in self._specs]
+
+
+MODEL_CATALOG = ModelCatalog()
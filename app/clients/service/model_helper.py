@@ -1,3 +1,11 @@
+import hashlib
+import os
+import pickle
+import sys
+import threading
+
+import joblib
+
 from app.clients.service.constants import COLUMNS_FIELDS, INTERVENTION_FIELDS
 
 
@@ -19,3 +27,99 @@ def get_all_feature_columns():
 def get_true_file_name(model_type, filename):
     """Format pickle file name"""
     return filename.format(model_type).replace(" ", "_")
+
+
+def artifact_signature(path):
+    """Return (mtime_ns, size) of a model artifact, or None if it does not exist"""
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+def artifact_checksum(path, chunk_size=1 << 20):
+    """Return the blake2b hex digest of a model artifact's contents"""
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as artifact:
+        for chunk in iter(lambda: artifact.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def loaded_class(module_name, class_name):
+    """
+    Return a class if its module is already imported, else None.
+
+    isinstance checks against sklearn estimators use it, so code that can serve
+    sklearn-free models never imports sklearn itself. A model cannot be an instance
+    of a class whose module was never imported.
+    """
+    module = sys.modules.get(module_name)
+    return None if module is None else getattr(module, class_name, None)
+
+
+def load_model_artifact(path, mmap_mode="r"):
+    """
+    Load a fitted model artifact.
+
+    joblib artifacts are memory-mapped, so their numpy arrays are backed by the
+    page cache and shared between processes loading the same file. Legacy
+    pickles are still read in full.
+
+    Args:
+        path: Path of a .joblib or .pkl artifact
+        mmap_mode: numpy memmap mode for joblib artifacts, None to read into memory
+
+    Returns:
+        The fitted model
+    """
+    if path.endswith(".pkl"):
+        with open(path, "rb") as model_file:
+            return pickle.load(model_file)
+    return joblib.load(path, mmap_mode=mmap_mode)
+
+
+def save_model_artifact(model, path):
+    """Write a model as an uncompressed joblib artifact so it can be memory-mapped"""
+    joblib.dump(model, path, compress=0)
+
+
+class LazyModelLoader:
+    """Thread-safe loader that reads a model artifact on first use and after it changes"""
+
+    def __init__(self, path, load=None):
+        """
+        Args:
+            path: Path of the model artifact
+            load (callable): load(path) -> model, defaults to load_model_artifact
+        """
+        self.path = path
+        self.signature = None
+        self._load = load
+        self._model = None
+        self._lock = threading.Lock()
+
+    @property
+    def loaded(self):
+        return self._model is not None
+
+    def _stale(self):
+        # A missing artifact keeps the loaded model; a retrained one replaces it
+        if self._model is None:
+            return True
+        signature = artifact_signature(self.path)
+        return signature is not None and signature != self.signature
+
+    def get(self):
+        """
+        Return the model, loading it once across threads, and reloading it whenever the
+        artifact's (mtime, size) signature changes, as ModelRegistry does.
+        """
+        if self._stale():
+            with self._lock:
+                if self._stale():
+                    signature = artifact_signature(self.path)
+                    self._model = (self._load or load_model_artifact)(self.path)
+                    self.signature = signature
+        return self._model
@@ -1,6 +1,14 @@
-from typing import List
+import time
+from operator import itemgetter
+from typing import Dict, List, Optional, Union
 
-from pydantic import BaseModel, Field
+import numpy as np
+from pydantic import BaseModel, Field, PrivateAttr, model_validator
+
+from app.clients.service.model_helper import get_all_feature_columns
+
+# Largest batch accepted by /ml_models/predict/batch
+MAX_BATCH_PREDICTION_ROWS = 100_000
 
 
 class PredictionFeatures(BaseModel):
@@ -105,3 +113,101 @@ class PredictionRequest(BaseModel):
             structured_features.enhanced_referrals,
         ]
         return cls(features=features)
+
+
+class BatchPredictionRequest(BaseModel):
+    """Template class for batch prediction; send either rows or columns"""
+
+    rows: Optional[List[Dict[str, float]]] = Field(
+        None, description="One object per row, keyed like PredictionFeatures"
+    )
+    columns: Optional[Dict[str, List[float]]] = Field(
+        None, description="One array per feature name in get_all_feature_columns() order"
+    )
+    _matrix: np.ndarray = PrivateAttr()
+    _stage_seconds: Dict[str, float] = PrivateAttr(default_factory=dict)
+
+    @model_validator(mode="after")
+    def build_matrix(self):
+        """Validate every row at once and assemble the (n_rows, 31) float matrix"""
+        started = time.perf_counter()
+        if (self.rows is None) == (self.columns is None):
+            raise ValueError("Send exactly one of 'rows' or 'columns'")
+        names = get_all_feature_columns()
+        if self.columns is not None:
+            missing = [name for name in names if name not in self.columns]
+            unknown = [name for name in self.columns if name not in names]
+            if missing or unknown:
+                raise ValueError(f"Missing columns: {missing}; unknown columns: {unknown}")
+            lengths = {len(values) for values in self.columns.values()}
+            if len(lengths) != 1:
+                raise ValueError("All columns must have the same length")
+            build_started = time.perf_counter()
+            matrix = np.column_stack(
+                [np.asarray(self.columns[name], dtype=float) for name in names]
+            )
+        else:
+            expected = set(names)
+            invalid = [i for i, row in enumerate(self.rows) if row.keys() != expected]
+            if invalid:
+                raise ValueError(f"Rows without exactly the 31 feature names: {invalid[:20]}")
+            build_started = time.perf_counter()
+            matrix = np.array(list(map(itemgetter(*names), self.rows)), dtype=float)
+        build_seconds = time.perf_counter() - build_started
+        if not 0 < len(matrix) <= MAX_BATCH_PREDICTION_ROWS:
+            raise ValueError(f"Send between 1 and {MAX_BATCH_PREDICTION_ROWS} rows")
+        non_finite = np.flatnonzero(~np.isfinite(matrix).all(axis=1))
+        if len(non_finite):
+            raise ValueError(f"Rows with non-finite values: {non_finite[:20].tolist()}")
+        self._matrix = matrix
+        self._stage_seconds = {
+            "validate": time.perf_counter() - started - build_seconds,
+            "build": build_seconds,
+        }
+        return self
+
+    def feature_matrix(self) -> np.ndarray:
+        """The validated (n_rows, 31) float matrix, in get_all_feature_columns() order"""
+        return self._matrix
+
+    def stage_seconds(self) -> Dict[str, float]:
+        """Seconds spent validating the payload and building the matrix"""
+        return self._stage_seconds
+
+
+class RecommendationOptions(BaseModel):
+    """Template class for intervention search options"""
+
+    top_k: int = Field(3, ge=1, le=128, description="Number of combinations to return per client")
+    max_interventions: Optional[int] = Field(
+        None, ge=0, le=7, description="Maximum number of simultaneous interventions"
+    )
+    include: List[str] = Field(
+        default_factory=list, description="Interventions every combination must contain"
+    )
+    exclude: List[str] = Field(
+        default_factory=list, description="Interventions no combination may contain"
+    )
+
+    def search_constraints(self):
+        return {
+            "max_interventions": self.max_interventions,
+            "include": self.include,
+            "exclude": self.exclude,
+        }
+
+
+class InterventionSearchRequest(RecommendationOptions):
+    """Template class for a single-client intervention search"""
+
+    client: Dict[str, Union[float, str]] = Field(
+        ..., description="Client profile keyed by the 24 demographic feature names"
+    )
+
+
+class BatchRecommendationRequest(RecommendationOptions):
+    """Template class for a batch intervention recommendation request"""
+
+    clients: List[Dict[str, Union[float, str]]] = Field(
+        ..., min_length=1, description="Client profiles keyed by the 24 demographic feature names"
+    )
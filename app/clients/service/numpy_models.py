@@ -0,0 +1,168 @@
+"""
+Serving backends that predict from plain NumPy arrays, without importing sklearn.
+
+The export step writes each trained model next to its artifact as a .npz file:
+- linear regression: coefficients and intercept;
+- RBF support vector regression: support vectors, dual coefficients, intercept and gamma;
+- random forest: the concatenated node arrays of FlatForestRegressor.
+
+With MODEL_BACKEND=numpy the models are served from those files. sklearn is then only
+needed for training and for exporting. Linear and forest predictions are bit-identical
+to sklearn's. RBF predictions compute the kernel the way libsvm does, and agree to
+floating-point rounding.
+
+Training writes the export; python -m app.clients.service.export_numpy exports the
+artifacts already on disk.
+"""
+
+# pylint: disable=too-few-public-methods
+
+import os
+
+import numpy as np
+from dotenv import load_dotenv
+
+from app.clients.service.flat_forest import FlatForestRegressor
+from app.clients.service.model_helper import load_model_artifact
+
+load_dotenv()
+
+NUMPY_SUFFIX = ".npz"
+# Rows per kernel block of NumpyRBFRegressor.predict; bounds its (rows, n_sv) buffers
+RBF_ROW_BLOCK = 4096
+
+
+class NumpyLinearRegressor:
+    """Linear regression predicting with the same matrix product as LinearRegression"""
+
+    def __init__(self, coef, intercept):
+        """
+        Args:
+            coef (np.array): (n_features,) coefficients
+            intercept (float): Intercept
+        """
+        self.coef_ = coef
+        self.intercept_ = intercept
+
+    def predict(self, features):
+        return np.asarray(features, dtype=np.float64) @ self.coef_ + self.intercept_
+
+
+class NumpyRBFRegressor:
+    """Epsilon-SVR with an RBF kernel, predicting from its support vectors"""
+
+    def __init__(self, support_vectors, dual_coef, intercept, gamma):
+        """
+        Args:
+            support_vectors (np.array): (n_sv, n_features) support vectors
+            dual_coef (np.array): (n_sv,) dual coefficients
+            intercept (float): Intercept
+            gamma (float): Kernel coefficient
+        """
+        self.support_vectors_ = support_vectors
+        self.dual_coef_ = dual_coef
+        self.intercept_ = intercept
+        self.gamma = gamma
+        self._squared_norms = np.einsum("ij,ij->i", support_vectors, support_vectors)
+
+    def predict(self, features):
+        features = np.asarray(features, dtype=np.float64)
+        predictions = np.empty(len(features))
+        for start in range(0, len(features), RBF_ROW_BLOCK):
+            block = features[start : start + RBF_ROW_BLOCK]
+            # |x - s|^2 expanded as |x|^2 + |s|^2 - 2 x.s, as libsvm evaluates it
+            distances = (
+                np.einsum("ij,ij->i", block, block)[:, np.newaxis]
+                + self._squared_norms
+                - 2 * block @ self.support_vectors_.T
+            )
+            kernel = np.exp(-self.gamma * distances)
+            predictions[start : start + RBF_ROW_BLOCK] = kernel @ self.dual_coef_ + self.intercept_
+        return predictions
+
+
+def numpy_backend_enabled():
+    """Whether MODEL_BACKEND asks for models to be served from their NumPy exports"""
+    return os.getenv("MODEL_BACKEND", "sklearn").lower() == "numpy"
+
+
+def numpy_artifact_path(path):
+    """Path of the NumPy export of a model artifact"""
+    return os.path.splitext(path)[0] + NUMPY_SUFFIX
+
+
+def serving_artifact_path(path):
+    """The artifact to serve: the NumPy export with MODEL_BACKEND=numpy, if it exists"""
+    if numpy_backend_enabled():
+        exported = numpy_artifact_path(path)
+        if os.path.exists(exported):
+            return exported
+    return path
+
+
+def model_arrays(model):
+    """
+    The arrays a fitted model is exported as, tagged with its kind.
+
+    Raises:
+        ValueError: If the model is not a linear regression, an RBF SVR or a
+            single-output random forest
+    """
+    # Exporting is part of training, where sklearn is available
+    # pylint: disable=import-outside-toplevel
+    from sklearn.ensemble import RandomForestRegressor
+    from sklearn.linear_model import LinearRegression
+    from sklearn.svm import SVR
+
+    if isinstance(model, LinearRegression) and np.ndim(model.coef_) == 1:
+        return {"kind": "linear", "coef": model.coef_, "intercept": model.intercept_}
+    # pylint: disable-next=protected-access
+    if isinstance(model, SVR) and model.kernel == "rbf" and not model._sparse:
+        return {
+            "kind": "rbf_svr",
+            "support_vectors": model.support_vectors_,
+            "dual_coef": model.dual_coef_[0],
+            "intercept": model.intercept_[0],
+            "gamma": model._gamma,  # pylint: disable=protected-access
+        }
+    if isinstance(model, RandomForestRegressor) and model.n_outputs_ == 1:
+        model = FlatForestRegressor.from_forest(model)
+    if isinstance(model, FlatForestRegressor):
+        return {"kind": "forest", **vars(model)}
+    raise ValueError(f"Cannot export {type(model).__name__} to NumPy arrays.")
+
+
+def save_numpy_artifact(model, path):
+    """Write a fitted model's arrays to an uncompressed .npz file"""
+    np.savez(path, **model_arrays(model))
+
+
+def load_numpy_artifact(path):
+    """
+    Load a model exported by save_numpy_artifact.
+
+    Returns:
+        NumpyLinearRegressor, NumpyRBFRegressor or FlatForestRegressor
+    """
+    with np.load(path, allow_pickle=False) as data:
+        arrays = dict(data)
+    kind = str(arrays.pop("kind"))
+    if kind == "linear":
+        return NumpyLinearRegressor(arrays["coef"], float(arrays["intercept"]))
+    if kind == "rbf_svr":
+        return NumpyRBFRegressor(
+            arrays["support_vectors"],
+            arrays["dual_coef"],
+            float(arrays["intercept"]),
+            float(arrays["gamma"]),
+        )
+    if kind == "forest":
+        return FlatForestRegressor(**arrays)
+    raise ValueError(f"Unknown NumPy model kind '{kind}' in {path}")
+
+
+def export_model(path):
+    """Export one sklearn artifact next to itself; returns the export's path"""
+    target = numpy_artifact_path(path)
+    save_numpy_artifact(load_model_artifact(path, mmap_mode=None), target)
+    return target
@@ -0,0 +1,238 @@
+"""
+Recommendation service module connecting stored clients to the intervention recommender.
+Scores clients with the active ML model, serialises results for streaming and maintains
+the materialized client_recommendations table.
+"""
+
+import json
+from collections import deque
+
+from fastapi import HTTPException, status
+from sqlalchemy import or_
+from sqlalchemy.orm import Session
+
+from app.clients.service import logic
+from app.clients.service.constants import COLUMNS_FIELDS
+from app.clients.service.ml_models import model_manager
+from app.database import SessionLocal
+from app.models import Client, ClientRecommendation
+
+# Combinations stored per client; reads may ask for any top_k up to this
+MATERIALIZED_TOP_K = 10
+
+
+def get_recommendation_model():
+    """Return the active ML model, reloading it if its artifact was retrained"""
+    return model_manager.get_current_model()
+
+
+def model_version(model):
+    """Version tag of a model: its name plus the signature of the artifact in memory"""
+    name, signature = model.identity()
+    if signature is None:
+        return name
+    return f"{name}@{signature[0]}-{signature[1]}"
+
+
+def client_profile(client):
+    """Return the demographic answers of a Client row keyed by COLUMNS_FIELDS"""
+    return {column: getattr(client, column) for column in COLUMNS_FIELDS}
+
+
+def has_complete_profile(client):
+    """Whether every demographic answer of a Client row is filled in"""
+    return all(getattr(client, column) is not None for column in COLUMNS_FIELDS)
+
+
+def refresh_recommendations(db: Session, clients, model=None):
+    """
+    Recompute and store the materialized recommendations of some clients.
+
+    Clients with missing answers cannot be scored; any stored row for them is removed.
+
+    Args:
+        db (Session): Database session, committed on return
+        clients (list): Client rows
+        model: ML model to score with, defaults to the active model
+
+    Returns:
+        int: Number of clients whose recommendation was stored
+    """
+    model = get_recommendation_model() if model is None else model
+    version = model_version(model)
+    scorable = [client for client in clients if has_complete_profile(client)]
+    incomplete = [client.id for client in clients if not has_complete_profile(client)]
+    if incomplete:
+        db.query(ClientRecommendation).filter(
+            ClientRecommendation.client_id.in_(incomplete)
+        ).delete(synchronize_session=False)
+    results = logic.recommend_batch(
+        [client_profile(client) for client in scorable], MATERIALIZED_TOP_K, model
+    )
+    for client, result in zip(scorable, results):
+        db.merge(
+            ClientRecommendation(
+                client_id=client.id,
+                model_version=version,
+                baseline=float(result["baseline"]),
+                interventions=[[float(rate), names] for rate, names in result["interventions"]],
+            )
+        )
+    db.commit()
+    return len(scorable)
+
+
+def backfill_recommendations(db: Session, chunk_size=logic.RECOMMENDATION_CHUNK_SIZE, model=None):
+    """
+    Populate the materialized table for clients without an up-to-date recommendation.
+
+    Clients are paged by id and each page is scored and committed on its own, so the
+    job can be interrupted and resumed, and rows already tagged with the current model
+    version are skipped.
+
+    Args:
+        db (Session): Database session
+        chunk_size (int): Clients scored and committed together
+        model: ML model to score with, defaults to the active model
+
+    Returns:
+        int: Number of recommendations written
+    """
+    model = get_recommendation_model() if model is None else model
+    version = model_version(model)
+    written, last_id = 0, 0
+    while True:
+        clients = (
+            db.query(Client)
+            .outerjoin(ClientRecommendation, ClientRecommendation.client_id == Client.id)
+            .filter(Client.id > last_id)
+            .filter(
+                or_(
+                    ClientRecommendation.client_id.is_(None),
+                    ClientRecommendation.model_version != version,
+                )
+            )
+            .order_by(Client.id)
+            .limit(chunk_size)
+            .all()
+        )
+        if not clients:
+            return written
+        last_id = clients[-1].id
+        written += refresh_recommendations(db, clients, model)
+
+
+def backfill_in_new_session():
+    """
+    Run backfill_recommendations in a session of its own, closed when done.
+    For background tasks, which run after the request's session was closed.
+
+    Returns:
+        int: Number of recommendations written
+    """
+    with SessionLocal() as db:
+        return backfill_recommendations(db)
+
+
+def get_client_recommendations(db: Session, client_ids, top_k=3):
+    """
+    Read materialized recommendations, refreshing rows that are missing or stale.
+
+    Args:
+        db (Session): Database session
+        client_ids (list): Ids of the clients to read
+        top_k (int): Number of combinations per client, at most MATERIALIZED_TOP_K
+
+    Returns:
+        dict: Recommendation per client id, for clients that could be scored
+    """
+    model = get_recommendation_model()
+    version = model_version(model)
+    rows = {
+        row.client_id: row
+        for row in db.query(ClientRecommendation).filter(
+            ClientRecommendation.client_id.in_(client_ids)
+        )
+    }
+    stale = [
+        client_id
+        for client_id in client_ids
+        if client_id not in rows or rows[client_id].model_version != version
+    ]
+    if stale:
+        refresh_recommendations(db, db.query(Client).filter(Client.id.in_(stale)).all(), model)
+        for row in db.query(ClientRecommendation).filter(ClientRecommendation.client_id.in_(stale)):
+            rows[row.client_id] = row
+    return {
+        client_id: {
+            "client_id": client_id,
+            "model_version": row.model_version,
+            "baseline": row.baseline,
+            "interventions": row.interventions[-top_k:],
+        }
+        for client_id, row in rows.items()
+    }
+
+
+def get_client_recommendation(db: Session, client_id: int, top_k=3):
+    """Read one client's materialized recommendation; see get_client_recommendations"""
+    recommendation = get_client_recommendations(db, [client_id], top_k).get(client_id)
+    if recommendation is None:
+        if db.get(Client, client_id) is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Client with id {client_id} not found",
+            )
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Client {client_id} has missing answers and cannot be scored",
+        )
+    return recommendation
+
+
+def stream_recommendations(clients, top_k=3, chunk_size=logic.RECOMMENDATION_CHUNK_SIZE):
+    """
+    Score clients chunk by chunk and yield one NDJSON line per client.
+
+    Clients are consumed lazily, so only one chunk is held in memory and the
+    first lines are sent as soon as the first chunk is scored. Clients with
+    missing answers are reported as error lines instead of being scored.
+
+    Args:
+        clients (iterable): Client rows, e.g. a yield_per query
+        top_k (int): Number of combinations per client
+        chunk_size (int): Clients scored per predict call
+
+    Yields:
+        str: JSON object terminated by a newline
+    """
+    client_ids = deque()
+    errors = deque()
+
+    def profiles():
+        for client in clients:
+            profile = client_profile(client)
+            missing = [column for column, value in profile.items() if value is None]
+            if missing:
+                errors.append({"client_id": client.id, "error": f"Missing answers: {missing}"})
+                continue
+            client_ids.append(client.id)
+            yield profile
+
+    results = logic.iter_recommendations(
+        profiles(), top_k, get_recommendation_model(), chunk_size=chunk_size
+    )
+    for result in results:
+        while errors:
+            yield json.dumps(errors.popleft()) + "\n"
+        yield json.dumps({"client_id": client_ids.popleft(), **result}) + "\n"
+    while errors:
+        yield json.dumps(errors.popleft()) + "\n"
+
+
+if __name__ == "__main__":
+    # Bulk backfill job: python -m app.clients.service.recommendation_service
+    from app.database import Base, engine
+
+    Base.metadata.create_all(bind=engine)
+    print(f"Stored {backfill_in_new_session()} client recommendations")
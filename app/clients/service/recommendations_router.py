@@ -0,0 +1,55 @@
+from fastapi import APIRouter, HTTPException, Request, status
+from fastapi.concurrency import run_in_threadpool
+
+from app.clients.service import logic
+from app.clients.service.inference import inference_executor, run_cancellable
+from app.clients.service.models import BatchRecommendationRequest, InterventionSearchRequest
+from app.clients.service.recommendation_service import get_recommendation_model
+from app.clients.service.shadow import shadow_evaluator
+
+router = APIRouter(prefix="/recommendations", tags=["recommendations"])
+
+
+@router.post("/search")
+async def search_interventions(request: InterventionSearchRequest, http_request: Request):
+    """Find the top intervention combinations for one client under constraints"""
+    results = await run_cancellable(http_request, run_recommendations([request.client], request))
+    return results[0]
+
+
+@router.post("/batch")
+async def recommend_batch(request: BatchRecommendationRequest, http_request: Request):
+    """Recommend the top interventions for a batch of client profiles"""
+    return {
+        "results": await run_cancellable(
+            http_request, run_recommendations(request.clients, request)
+        )
+    }
+
+
+@router.get("/cache")
+def cache_stats():
+    """Report hit, miss and eviction counters of the recommendation cache"""
+    return logic.RECOMMENDATION_CACHE.stats()
+
+
+async def run_recommendations(clients, request):
+    """
+    Score clients on the inference executor, mapping bad input to HTTP errors. The
+    clients are then queued for the shadow models, if any are configured.
+    """
+    model = await run_in_threadpool(get_recommendation_model)
+    search = request.search_constraints()
+    try:
+        results = await inference_executor.recommend(model, clients, request.top_k, **search)
+    except KeyError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail=f"Missing client feature: {e}"
+        ) from e
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail=f"Invalid request: {str(e)}"
+        ) from e
+    if shadow_evaluator is not None:
+        shadow_evaluator.submit_recommendations(str(model), clients, request.top_k, search, results)
+    return results
@@ -0,0 +1,258 @@
+"""
+Shadow evaluation of challenger models on live traffic.
+
+The primary model answers every request as usual. After it has answered, the request's
+feature rows (or client profiles, for recommendations) and the primary output are put on
+a bounded queue. When the queue is full the work is dropped, never waited for. One
+background thread with lowered scheduling priority drains the queue. It scores every
+shadow model on the same input and aggregates, per primary and shadow model, how far the
+shadow's outputs are from the primary's and how long the shadow took.
+
+Enabled by listing the shadow models in SHADOW_MODELS, separated by ";".
+SHADOW_QUEUE_SIZE bounds the queue (default 256 requests).
+"""
+
+# pylint: disable=too-few-public-methods, too-many-instance-attributes
+
+import os
+import queue
+import threading
+import time
+from collections import deque
+
+import numpy as np
+from dotenv import load_dotenv
+
+from app.clients.service import logic
+from app.clients.service.ml_models import model_registry
+
+load_dotenv()
+
+DEFAULT_QUEUE_SIZE = 256
+# Shadow latencies kept per comparison for the percentiles
+LATENCY_WINDOW = 1024
+# Niceness of the worker thread, so the primary path keeps the CPU when both are busy
+SHADOW_NICENESS = 10
+
+
+class ShadowStats:
+    """Disagreement and latency aggregates of one shadow model against one primary"""
+
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.rows = 0
+        self.abs_diff_total = 0.0
+        self.max_abs_diff = 0.0
+        self.top_choice_matches = 0
+        self.top_choice_compared = 0
+        self.latencies = deque(maxlen=LATENCY_WINDOW)
+
+    def record(self, differences, seconds, top_choice_matches=None):
+        """
+        Record one shadow call.
+
+        Args:
+            differences (np.array): Absolute difference of each row's shadow and primary score
+            seconds (float): Shadow latency
+            top_choice_matches (list): Per client, whether both picked the same best
+                interventions; recommendations only
+        """
+        self.calls += 1
+        self.rows += len(differences)
+        self.abs_diff_total += float(np.sum(differences))
+        self.max_abs_diff = max(self.max_abs_diff, float(np.max(differences, initial=0.0)))
+        if top_choice_matches is not None:
+            self.top_choice_matches += sum(top_choice_matches)
+            self.top_choice_compared += len(top_choice_matches)
+        self.latencies.append(seconds)
+
+    def snapshot(self):
+        latencies_ms = np.asarray(self.latencies) * 1000
+        has_latencies = len(latencies_ms) > 0
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "rows": self.rows,
+            "mean_abs_diff": self.abs_diff_total / self.rows if self.rows else None,
+            "max_abs_diff": self.max_abs_diff,
+            "top_choice_agreement": (
+                self.top_choice_matches / self.top_choice_compared
+                if self.top_choice_compared
+                else None
+            ),
+            "latency_ms": {
+                "mean": float(latencies_ms.mean()) if has_latencies else None,
+                "p50": float(np.percentile(latencies_ms, 50)) if has_latencies else None,
+                "p99": float(np.percentile(latencies_ms, 99)) if has_latencies else None,
+                "max": float(latencies_ms.max()) if has_latencies else None,
+            },
+        }
+
+
+def _lower_thread_priority():
+    # On Linux a thread has its own niceness, addressed by its native id
+    try:
+        os.setpriority(os.PRIO_PROCESS, threading.get_native_id(), SHADOW_NICENESS)
+    except (AttributeError, OSError):
+        pass
+
+
+class ShadowEvaluator:
+    """Scores shadow models on a background thread and aggregates their disagreement"""
+
+    def __init__(self, shadow_models, queue_size=DEFAULT_QUEUE_SIZE, registry=model_registry):
+        """
+        Args:
+            shadow_models (list): Names of the models to shadow the primary with
+            queue_size (int): Requests waiting for shadow scoring before work is dropped
+            registry (ModelRegistry): Where shadow models are loaded from
+        """
+        self.shadow_models = list(shadow_models)
+        self.queue_size = queue_size
+        self._registry = registry
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._stats = {}
+        self._lock = threading.Lock()
+        self._worker = None
+        self.submitted = 0
+        self.dropped = 0
+
+    def _start(self):
+        with self._lock:
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._drain, name="shadow", daemon=True)
+                self._worker.start()
+
+    def _submit(self, item):
+        if self._worker is None:
+            self._start()
+        try:
+            self._queue.put_nowait(item)
+        except queue.Full:
+            with self._lock:
+                self.dropped += 1
+            return False
+        with self._lock:
+            self.submitted += 1
+        return True
+
+    def submit_prediction(self, primary, matrix, predictions):
+        """
+        Queue a prediction for shadow scoring without waiting.
+
+        Args:
+            primary (str): Name of the primary model
+            matrix (np.array): Feature rows the primary predicted
+            predictions (np.array): The primary's predictions
+
+        Returns:
+            bool: False if the queue was full and the work was dropped
+        """
+        return self._submit(("predict", primary, matrix, np.asarray(predictions)))
+
+    def submit_recommendations(self, primary, clients, top_k, search, results):
+        """
+        Queue a recommendation batch for shadow scoring without waiting.
+
+        Args:
+            primary (str): Name of the primary model
+            clients (list): Raw client profiles
+            top_k (int): Combinations returned per client
+            search (dict): Search constraints, see logic.intervention_search_space
+            results (list): The primary's recommendations, one per client
+
+        Returns:
+            bool: False if the queue was full and the work was dropped
+        """
+        return self._submit(("recommend", primary, (clients, top_k, search), results))
+
+    def _drain(self):
+        _lower_thread_priority()
+        while True:
+            item = self._queue.get()
+            try:
+                self._evaluate(*item)
+            finally:
+                self._queue.task_done()
+
+    def _evaluate(self, kind, primary, work, primary_output):
+        for shadow in self.shadow_models:
+            if shadow == primary:
+                continue
+            compare = _compare_predictions if kind == "predict" else _compare_recommendations
+            try:
+                comparison = compare(self._registry.get(shadow), work, primary_output)
+            except Exception:  # pylint: disable=broad-exception-caught
+                # A failing challenger must never affect the service
+                comparison = None
+            with self._lock:
+                stats = self._stats.setdefault((kind, primary, shadow), ShadowStats())
+                if comparison is None:
+                    stats.errors += 1
+                else:
+                    stats.record(*comparison)
+
+    def join(self):
+        """Wait until every queued request was scored"""
+        self._queue.join()
+
+    def snapshot(self):
+        """Queue counters and the per-comparison statistics, as a JSON-ready dict"""
+        with self._lock:
+            comparisons = [
+                {"route": kind, "primary": primary, "shadow": shadow, **stats.snapshot()}
+                for (kind, primary, shadow), stats in self._stats.items()
+            ]
+            counters = {"submitted": self.submitted, "dropped": self.dropped}
+        return {
+            "enabled": True,
+            "shadow_models": self.shadow_models,
+            "queue_size": self.queue_size,
+            "queued": self._queue.qsize(),
+            **counters,
+            "comparisons": comparisons,
+        }
+
+
+def _compare_predictions(model, matrix, primary_predictions):
+    """(absolute differences, shadow seconds, None) of a shadow model's predictions"""
+    started = time.perf_counter()
+    predictions = model.predict(matrix)
+    seconds = time.perf_counter() - started
+    return np.abs(predictions - primary_predictions), seconds, None
+
+
+def _compare_recommendations(model, work, primary_results):
+    """(baseline differences, shadow seconds, top choice matches) of shadow recommendations"""
+    clients, top_k, search = work
+    started = time.perf_counter()
+    # Bypass the recommendation cache so shadow results never evict primary ones
+    results = logic.recommend_batch(clients, top_k, model, cache=None, **search)
+    seconds = time.perf_counter() - started
+    pairs = list(zip(results, primary_results))
+    return (
+        np.array([abs(shadow["baseline"] - primary["baseline"]) for shadow, primary in pairs]),
+        seconds,
+        [_top_choice(shadow) == _top_choice(primary) for shadow, primary in pairs],
+    )
+
+
+def _top_choice(result):
+    """Intervention names of a recommendation's best combination"""
+    # Combinations are listed in ascending order of score, so the best comes last
+    interventions = result["interventions"]
+    return interventions[-1][1] if interventions else None
+
+
+def shadow_from_env():
+    """Return the ShadowEvaluator configured by SHADOW_MODELS, or None when unset"""
+    names = [name.strip() for name in os.getenv("SHADOW_MODELS", "").split(";") if name.strip()]
+    if not names:
+        return None
+    return ShadowEvaluator(
+        names, queue_size=int(os.getenv("SHADOW_QUEUE_SIZE", str(DEFAULT_QUEUE_SIZE)))
+    )
+
+
+shadow_evaluator = shadow_from_env()
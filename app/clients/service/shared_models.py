@@ -0,0 +1,94 @@
+"""
+Model artifacts shared read-only by every worker process.
+
+By default each uvicorn worker unpickles its own copy of every model. With SHARED_MODELS=1
+each artifact is instead exported once to an uncompressed joblib file under
+SHARED_MODEL_DIR. Every process then memory-maps that file, so the models' numpy arrays
+live in the page cache once, whatever the number of workers. Forests are exported as
+FlatForestRegressor, because sklearn copies tree nodes into private memory on load.
+
+Exports are named after the source artifact's checksum, so a retrained model is exported
+afresh and a stale export is never mapped.
+"""
+
+import os
+import tempfile
+import threading
+
+from dotenv import load_dotenv
+
+from app.clients.service.flat_forest import FlatForestRegressor
+from app.clients.service.model_helper import (
+    artifact_checksum,
+    load_model_artifact,
+    loaded_class,
+    save_model_artifact,
+)
+from app.clients.service.numpy_models import (
+    NUMPY_SUFFIX,
+    load_numpy_artifact,
+    serving_artifact_path,
+)
+
+load_dotenv()
+
+SHARED_MODEL_DIR = os.getenv(
+    "SHARED_MODEL_DIR", os.path.join(tempfile.gettempdir(), "common-assessment-models")
+)
+
+
+def shared_models_enabled():
+    """Whether SHARED_MODELS asks for memory-mapped shared models"""
+    return os.getenv("SHARED_MODELS", "0").lower() in ("1", "true", "yes")
+
+
+def shareable(model):
+    """Return an equivalent of a fitted model whose state is plain numpy arrays"""
+    forest_class = loaded_class("sklearn.ensemble", "RandomForestRegressor")
+    if forest_class is not None and isinstance(model, forest_class) and model.n_outputs_ == 1:
+        return FlatForestRegressor.from_forest(model)
+    return model
+
+
+def shared_artifact_path(path, directory=None):
+    """Path the shared export of an artifact is written to, under SHARED_MODEL_DIR by default"""
+    directory = SHARED_MODEL_DIR if directory is None else directory
+    stem = os.path.splitext(os.path.basename(path))[0]
+    return os.path.join(directory, f"{stem}-{artifact_checksum(path)}.joblib")
+
+
+def load_shared(path, directory=None):
+    """
+    Memory-map the shared export of a model artifact, exporting it first if needed.
+
+    Concurrent workers, processes or threads, may export the same artifact at once; each
+    writes its own uniquely named temporary file and atomically renames it into place, so
+    readers never see a partial export.
+
+    Args:
+        path: Path of a .joblib or .pkl model artifact
+        directory: Directory holding the shared exports, defaults to SHARED_MODEL_DIR
+
+    Returns:
+        The fitted model, with its arrays mapped read-only
+    """
+    target = shared_artifact_path(path, directory)
+    if not os.path.exists(target):
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        partial = f"{target}.{os.getpid()}.{threading.get_ident()}.tmp"
+        save_model_artifact(shareable(load_model_artifact(path, mmap_mode=None)), partial)
+        os.replace(partial, target)
+    return load_model_artifact(target, mmap_mode="r")
+
+
+def load_artifact(path):
+    """
+    Load a model artifact. With MODEL_BACKEND=numpy its NumPy export is loaded when there
+    is one; otherwise the artifact is shared between processes when SHARED_MODELS is enabled.
+    """
+    path = serving_artifact_path(path)
+    if path.endswith(NUMPY_SUFFIX):
+        return load_numpy_artifact(path)
+    if shared_models_enabled():
+        return load_shared(path)
+    return load_model_artifact(path)
@@ -0,0 +1,122 @@
+"""
+Start-up warmup of the catalogued ML models.
+
+Every model in the catalog is loaded in parallel, then a synthetic batch and one
+intervention recommendation are run through it. That way the first real request does not
+pay for unpickling, sklearn's first-call overhead or numpy buffer allocation. GET
+/ml_models/ready reports not-ready until the warmup has finished, with per-model load and
+warmup timings. MODEL_WARMUP_ROWS sets the size of the synthetic batch.
+"""
+
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from dotenv import load_dotenv
+
+from app.clients.service import logic
+from app.clients.service.constants import COLUMNS_FIELDS
+from app.clients.service.inference import timed_predict
+from app.clients.service.ml_models import model_registry
+from app.clients.service.model_catalog import MODEL_CATALOG
+
+load_dotenv()
+
+DEFAULT_WARMUP_ROWS = 64
+# A profile every column accepts, used to exercise the recommendation path
+WARMUP_PROFILE = {column: "0" for column in COLUMNS_FIELDS}
+
+
+def synthetic_batch(feature_count, rows):
+    """Return a reproducible (rows, feature_count) matrix of small integer features"""
+    return np.random.default_rng(0).integers(0, 4, size=(rows, feature_count)).astype(float)
+
+
+class ModelWarmup:
+    """Loads and warms every catalogued model in parallel and tracks readiness"""
+
+    def __init__(self, registry=model_registry, catalog=MODEL_CATALOG, rows=DEFAULT_WARMUP_ROWS):
+        """
+        Args:
+            registry (ModelRegistry): Registry the warmed models stay resident in
+            catalog (ModelCatalog): Catalog listing the models to warm
+            rows (int): Rows of the synthetic prediction batch
+        """
+        self.rows = rows
+        self._registry = registry
+        self._catalog = catalog
+        self._lock = threading.Lock()
+        self._thread = None
+        self._models = {}
+        self._duration = None
+
+    def start(self):
+        """Warm the models on a background thread; later calls are no-ops"""
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self.run, name="model-warmup", daemon=True)
+                self._thread.start()
+        return self._thread
+
+    def run(self):
+        """Warm every catalogued model, blocking until all are done"""
+        started = time.perf_counter()
+        names = self._catalog.names()
+        with self._lock:
+            self._models = {name: {"status": "pending"} for name in names}
+        with ThreadPoolExecutor(max(1, len(names)), thread_name_prefix="warmup") as pool:
+            list(pool.map(self._warm, names))
+        with self._lock:
+            self._duration = time.perf_counter() - started
+
+    def _warm(self, model_name):
+        self._update(model_name, status="loading")
+        started = time.perf_counter()
+        try:
+            model = self._registry.get(model_name)
+            loaded = time.perf_counter()
+            matrix = synthetic_batch(self._catalog.spec(model_name).feature_count, self.rows)
+            timed_predict(model, matrix)
+            logic.recommend_batch([WARMUP_PROFILE], model=model, cache=None)
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            self._update(model_name, status="failed", error=str(e))
+            return
+        self._update(
+            model_name,
+            status="ready",
+            load_ms=(loaded - started) * 1000,
+            warmup_ms=(time.perf_counter() - loaded) * 1000,
+        )
+
+    def _update(self, model_name, **fields):
+        with self._lock:
+            self._models[model_name] = {**self._models.get(model_name, {}), **fields}
+
+    @property
+    def ready(self):
+        """Whether warmup finished and every model warmed successfully"""
+        with self._lock:
+            return self._duration is not None and all(
+                model["status"] == "ready" for model in self._models.values()
+            )
+
+    def status(self):
+        """
+        Readiness plus per-model timings, as a JSON-ready dict.
+
+        Returns:
+            dict: ready, total warmup duration in ms (None while running) and, per model,
+            its status, load_ms and warmup_ms, or the error that failed it
+        """
+        ready = self.ready
+        with self._lock:
+            return {
+                "ready": ready,
+                "duration_ms": self._duration * 1000 if self._duration is not None else None,
+                "models": {name: dict(model) for name, model in self._models.items()},
+            }
+
+
+model_warmup = ModelWarmup(rows=int(os.getenv("MODEL_WARMUP_ROWS", str(DEFAULT_WARMUP_ROWS))))
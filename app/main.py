@@ -1,36 +1,116 @@
 """
 Main application module for the Common Assessment Tool.
-This module initializes the FastAPI application and includes all routers.
-Handles database initialization and CORS middleware configuration.
+This module builds the FastAPI application and includes all routers.
+Importing it has no side effects: database initialization and model loading are
+start-up steps run by the application's lifespan, see create_app.
 """
 
+import os
+import time
+from contextlib import asynccontextmanager
+
+from dotenv import load_dotenv
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from app import models
 from app.auth.router import router as auth_router
 from app.clients.router import router as clients_router
+from app.clients.service import logic
+from app.clients.service.inference import inference_executor
 from app.clients.service.ml_models_router import router as ml_models_router
+from app.clients.service.recommendations_router import router as recommendations_router
+from app.clients.service.warmup import model_warmup
 from app.database import engine
 
-# Initialize database tables
-models.Base.metadata.create_all(bind=engine)
-
-# Create FastAPI application
-app = FastAPI(
-    title="Case Management API", description="API for managing client cases", version="1.0.0"
-)
-
-# Include routers
-app.include_router(auth_router)
-app.include_router(clients_router)
-app.include_router(ml_models_router)
-
-# Configure CORS middleware
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],  # Allows all origins
-    allow_methods=["*"],  # Allows all methods
-    allow_headers=["*"],  # Allows all headers
-    allow_credentials=True,
-)
+load_dotenv()
+
+
+def create_schema():
+    """Initialize database tables"""
+    models.Base.metadata.create_all(bind=engine)
+
+
+def load_models():
+    """Load and warm every catalogued model and the recommendation model, blocking"""
+    model_warmup.run()
+    logic.get_model()
+
+
+def startup_steps(schema=True, preload_models=False):
+    """
+    The steps the application runs at start-up, in order.
+
+    Args:
+        schema (bool): Initialize database tables
+        preload_models (bool): Load every model before serving. Otherwise the models are
+            warmed in the background while serving; see GET /ml_models/ready
+
+    Returns:
+        list: (name, function) pairs
+    """
+    steps = [("create_schema", create_schema)] if schema else []
+    if preload_models:
+        steps.append(("load_models", load_models))
+    else:
+        steps.append(("start_warmup", model_warmup.start))
+    return steps
+
+
+def preload_models_from_env():
+    """Whether PRELOAD_MODELS asks for the models to be loaded before serving"""
+    return os.getenv("PRELOAD_MODELS", "0").lower() in ("1", "true", "yes")
+
+
+def create_app(schema=True, preload_models=None):
+    """
+    Build the FastAPI application.
+
+    Args:
+        schema (bool): Initialize database tables at start-up
+        preload_models (bool): Load every model at start-up, before serving. Defaults to
+            the PRELOAD_MODELS setting
+
+    Returns:
+        FastAPI: The application. app.state.startup_ms holds each start-up step's
+        duration once it has run
+    """
+    if preload_models is None:
+        preload_models = preload_models_from_env()
+    steps = startup_steps(schema, preload_models)
+
+    @asynccontextmanager
+    async def lifespan(application: FastAPI):
+        for name, step in steps:
+            started = time.perf_counter()
+            step()
+            application.state.startup_ms[name] = (time.perf_counter() - started) * 1000
+        yield
+        inference_executor.shutdown()
+
+    application = FastAPI(
+        title="Case Management API",
+        description="API for managing client cases",
+        version="1.0.0",
+        lifespan=lifespan,
+    )
+    application.state.startup_ms = {}
+
+    # Include routers
+    application.include_router(auth_router)
+    application.include_router(clients_router)
+    application.include_router(ml_models_router)
+    application.include_router(recommendations_router)
+
+    # Configure CORS middleware
+    application.add_middleware(
+        CORSMiddleware,
+        allow_origins=["*"],  # Allows all origins
+        allow_methods=["*"],  # Allows all methods
+        allow_headers=["*"],  # Allows all headers
+        allow_credentials=True,
+    )
+    return application
+
+
+app = create_app()
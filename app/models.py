@@ -1,11 +1,22 @@
 """
 Database models module defining SQLAlchemy ORM models for the Common Assessment Tool.
-Contains the Client model for storing client information in the database.
+Contains the Client model for storing client information in the database, and the
+materialized intervention recommendations computed for each client.
 """
 # pylint: disable=too-few-public-methods
 import enum
 
-from sqlalchemy import Boolean, CheckConstraint, Column, Enum, ForeignKey, Integer, String
+from sqlalchemy import (
+    JSON,
+    Boolean,
+    CheckConstraint,
+    Column,
+    Enum,
+    Float,
+    ForeignKey,
+    Integer,
+    String,
+)
 from sqlalchemy.orm import relationship
 
 from app.database import Base
@@ -93,3 +104,18 @@ class ClientCase(Base):
 
     client = relationship("Client", back_populates="cases")
     user = relationship("User", back_populates="cases")
+
+
+class ClientRecommendation(Base):
+    """
+    Materialized intervention recommendation for a client, tagged with the model version
+    that produced it. Rows are refreshed when the client's answers or the model change.
+    """
+
+    __tablename__ = "client_recommendations"
+
+    client_id = Column(Integer, ForeignKey("clients.id"), primary_key=True)
+    model_version = Column(String(200), nullable=False)
+    baseline = Column(Float, nullable=False)
+    # [rate, [intervention names]] pairs in ascending order of rate
+    interventions = Column(JSON, nullable=False)
@@ -0,0 +1,152 @@
+"""
+Start-up profiler for the Common Assessment Tool.
+
+Imports the application one module at a time, in the order app.main imports it, then
+runs create_app and each of its start-up steps with the models preloaded. Every step
+reports its wall time, the resident memory after it and how much it added, and how many
+modules it imported. A step's import time counts only what earlier steps had not
+already imported. For a per-module breakdown use python -X importtime -c "import app.main".
+
+Run from the repository root, in a fresh interpreter:
+python -m app.startup_report [--budget-ms MS] [--json] [--no-schema]
+It exits with status 1 when start-up takes longer than the budget, STARTUP_BUDGET_MS
+by default.
+"""
+
+import argparse
+import importlib
+import json
+import os
+import resource
+import sys
+import time
+
+# Imported in this order, so each step is charged for what it adds
+IMPORT_STEPS = (
+    "numpy",
+    "fastapi",
+    "sqlalchemy",
+    "app.database",
+    "app.models",
+    "app.auth.router",
+    "app.clients.router",
+    "app.clients.service.ml_models_router",
+    "app.clients.service.recommendations_router",
+    "app.clients.service.warmup",
+    "app.main",
+)
+
+
+def rss_mib():
+    """Current resident memory in MiB, or the peak where the current value is unavailable"""
+    try:
+        with open("/proc/self/statm", encoding="ascii") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def measure(name, kind, function):
+    """
+    Run one start-up step and measure it.
+
+    Returns:
+        dict: The step's name, kind, wall_ms, rss_mib, rss_delta_mib and modules
+    """
+    modules = len(sys.modules)
+    memory = rss_mib()
+    started = time.perf_counter()
+    function()
+    wall_ms = (time.perf_counter() - started) * 1000
+    after = rss_mib()
+    return {
+        "step": name,
+        "kind": kind,
+        "wall_ms": wall_ms,
+        "rss_mib": after,
+        "rss_delta_mib": after - memory,
+        "modules": len(sys.modules) - modules,
+    }
+
+
+def profile_startup(schema=True):
+    """
+    Import, build and start the application step by step, with the models preloaded.
+
+    Args:
+        schema (bool): Include initializing the database tables
+
+    Returns:
+        dict: The steps, per-model load and warmup times, total_ms, peak_rss_mib and
+        whether sklearn was imported
+    """
+    steps = []
+    for module in IMPORT_STEPS:
+        steps.append(
+            measure(module, "import", lambda module=module: importlib.import_module(module))
+        )
+    app_main = sys.modules["app.main"]
+    steps.append(measure("create_app", "init", lambda: app_main.create_app(schema, True)))
+    for name, function in app_main.startup_steps(schema, preload_models=True):
+        steps.append(measure(name, "init", function))
+    warmup = sys.modules["app.clients.service.warmup"].model_warmup.status()
+    return {
+        "steps": steps,
+        "models": warmup["models"],
+        "total_ms": sum(step["wall_ms"] for step in steps),
+        "peak_rss_mib": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        "sklearn_imported": "sklearn" in sys.modules,
+    }
+
+
+def format_report(report):
+    """Render a profile_startup report as a text table"""
+    lines = [f"{'step':<52} {'wall ms':>9} {'RSS MiB':>8} {'+MiB':>7} {'modules':>7}"]
+    for step in report["steps"]:
+        name = f"{step['kind']} {step['step']}"
+        lines.append(
+            f"{name:<52} {step['wall_ms']:9.1f} {step['rss_mib']:8.1f} "
+            f"{step['rss_delta_mib']:+7.1f} {step['modules']:7d}"
+        )
+    for model_name, model in report["models"].items():
+        if model.get("status") == "ready":
+            lines.append(
+                f"  {model_name:<50} load {model['load_ms']:.1f} ms, "
+                f"warmup {model['warmup_ms']:.1f} ms"
+            )
+        else:
+            lines.append(f"  {model_name:<50} {model.get('status')}: {model.get('error')}")
+    lines.append(
+        f"{'total':<52} {report['total_ms']:9.1f}  peak RSS {report['peak_rss_mib']:.1f} MiB"
+    )
+    lines.append(f"sklearn imported: {'yes' if report['sklearn_imported'] else 'no'}")
+    if report["budget_ms"] is not None:
+        verdict = "within" if report["within_budget"] else "OVER"
+        lines.append(f"{verdict} budget of {report['budget_ms']:.0f} ms")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    """Profile start-up, print the report and return 1 if it exceeded the budget"""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "--budget-ms",
+        type=float,
+        default=float(os.environ["STARTUP_BUDGET_MS"]) if os.getenv("STARTUP_BUDGET_MS") else None,
+        help="Fail when start-up takes longer, default STARTUP_BUDGET_MS",
+    )
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    parser.add_argument(
+        "--no-schema", action="store_true", help="Skip initializing the database tables"
+    )
+    args = parser.parse_args(argv)
+
+    report = profile_startup(schema=not args.no_schema)
+    report["budget_ms"] = args.budget_ms
+    report["within_budget"] = args.budget_ms is None or report["total_ms"] <= args.budget_ms
+    print(json.dumps(report, indent=2) if args.json else format_report(report))
+    return 0 if report["within_budget"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,42 @@
+"""
+Benchmark for bulk scoring through /ml_models/predict.
+Compares one request per row with a single /ml_models/predict/batch request carrying
+the same rows as columns, using the in-process test client.
+
+Run from the repository root: python -m benchmarks.bench_batch_predict
+"""
+
+import time
+
+from fastapi.testclient import TestClient
+
+from app.clients.service.model_helper import get_all_feature_columns
+from app.main import app
+
+# One valid value for every model input; the rows below vary the age
+FEATURES = dict.fromkeys(get_all_feature_columns(), 1)
+
+
+def main(rows=500):
+    """Time both ways of scoring the same rows and print the rows per second"""
+    client = TestClient(app)
+    batch = [dict(FEATURES, age=18 + i % 50) for i in range(rows)]
+    columns = {name: [row[name] for row in batch] for name in FEATURES}
+    client.post("/ml_models/predict", json=FEATURES)
+
+    started = time.perf_counter()
+    single = [client.post("/ml_models/predict", json=row).json()["prediction"][0] for row in batch]
+    one_by_one = time.perf_counter() - started
+
+    started = time.perf_counter()
+    response = client.post("/ml_models/predict/batch", json={"columns": columns})
+    batched = time.perf_counter() - started
+    assert response.json()["predictions"] == single
+
+    print(f"{rows} single requests: {rows / one_by_one:10.0f} rows/s")
+    print(f"1 batch request:     {rows / batched:10.0f} rows/s")
+    print(f"speedup:             {one_by_one / batched:10.1f}x")
+
+
+if __name__ == "__main__":
+    main()
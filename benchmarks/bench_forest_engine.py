@@ -0,0 +1,44 @@
+"""
+Benchmark for the array forest engine.
+Compares RandomForestRegressor.predict with CompactForestRegressor.predict on the
+pretrained forest for batches of 1 to 3000 rows, and reports the largest difference.
+
+Run from the repository root: python -m benchmarks.bench_forest_engine
+"""
+
+import time
+
+import numpy as np
+
+from app.clients.service.flat_forest import CompactForestRegressor
+from app.clients.service.ml_models import model_registry
+
+BATCH_SIZES = (1, 10, 100, 300, 1000, 3000)
+
+
+def _per_call(predict, matrix, repeat):
+    started = time.perf_counter()
+    for _ in range(repeat):
+        predict(matrix)
+    return (time.perf_counter() - started) / repeat
+
+
+def main(repeat=30):
+    """Time both engines for each batch size and print milliseconds per call"""
+    forest = model_registry.get("Random Forest Regressor").model
+    compact = CompactForestRegressor.from_forest(forest)
+    rng = np.random.default_rng(0)
+    print(f"{'rows':>6} {'sklearn ms':>11} {'arrays ms':>10} {'speedup':>8} {'max diff':>9}")
+    for rows in BATCH_SIZES:
+        matrix = rng.integers(0, 10, size=(rows, forest.n_features_in_)).astype(float)
+        difference = np.abs(compact.predict(matrix) - forest.predict(matrix)).max()
+        sklearn = _per_call(forest.predict, matrix, repeat)
+        arrays = _per_call(compact.predict, matrix, repeat)
+        print(
+            f"{rows:6d} {sklearn * 1000:11.2f} {arrays * 1000:10.2f} "
+            f"{sklearn / arrays:7.1f}x {difference:9.1e}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+"""
+Benchmark for scoring all intervention combinations with the random forest.
+Compares RandomForestRegressor.predict on the expanded 128-row matrix with the
+intervention-aware evaluator in app.clients.service.forest, asserting identical output.
+
+Run from the repository root: python -m benchmarks.bench_forest_evaluator
+"""
+
+import timeit
+
+import numpy as np
+
+from app.clients.service import forest, logic
+from benchmarks.bench_intervention_matrix import SAMPLE_CLIENT
+
+
+def main(number=20, batches=(1, 4, 16, 64)):
+    """Time both paths for several batch sizes and print the per-client cost"""
+    model = logic.get_model()
+    rows = logic.FULL_SEARCH_SPACE.rows
+    evaluator = forest.get_evaluator(model, logic.NUM_FEATURES, logic.INTERVENTION_GRID)
+    row = np.array(logic.clean_input_data(SAMPLE_CLIENT))
+    rng = np.random.default_rng(0)
+
+    for batch in batches:
+        rows_data = row + rng.integers(-2, 3, size=(batch, logic.NUM_FEATURES))
+        naive = model.predict(logic.create_batch_matrix(rows_data, rows))
+        assert np.array_equal(naive, evaluator.score_batch(rows_data, rows).ravel())
+
+        predict = timeit.timeit(
+            lambda data=rows_data: model.predict(logic.create_batch_matrix(data, rows)),
+            number=number,
+        )
+        walked = timeit.timeit(
+            lambda data=rows_data: evaluator.score_batch(data, rows), number=number
+        )
+        predict, walked = predict / number / batch, walked / number / batch
+        print(
+            f"{batch:4d} clients  predict: {predict * 1e3:6.3f} ms/client  "
+            f"evaluator: {walked * 1e3:6.3f} ms/client  speedup: {predict / walked:5.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
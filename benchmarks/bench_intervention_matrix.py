@@ -0,0 +1,64 @@
+"""
+Benchmark for building the intervention feature matrix used by logic.interpret_and_calculate.
+Compares the original per-call itertools/copy construction with the precomputed grid.
+
+Run from the repository root: python -m benchmarks.bench_intervention_matrix
+"""
+
+import timeit
+from itertools import product
+
+import numpy as np
+
+from app.clients.service.logic import NUM_FEATURES, clean_input_data, create_matrix
+
+SAMPLE_CLIENT = {
+    "age": "23",
+    "gender": "1",
+    "work_experience": "1",
+    "canada_workex": "1",
+    "dep_num": "0",
+    "canada_born": "1",
+    "citizen_status": "2",
+    "level_of_schooling": "2",
+    "fluent_english": "3",
+    "reading_english_scale": "2",
+    "speaking_english_scale": "2",
+    "writing_english_scale": "3",
+    "numeracy_scale": "2",
+    "computer_scale": "3",
+    "transportation_bool": "2",
+    "caregiver_bool": "1",
+    "housing": "1",
+    "income_source": "5",
+    "felony_bool": "1",
+    "attending_school": "0",
+    "currently_employed": "1",
+    "substance_use": "1",
+    "time_unemployed": "1",
+    "need_mental_health_support_bool": "1",
+}
+
+
+def legacy_create_matrix(row_data):
+    """The original create_matrix: rebuild the grid and copy the row 128 times"""
+    data = [row_data.copy() for _ in range(128)]
+    perms = np.array(list(product([0, 1], repeat=7)))
+    return np.concatenate((np.array(data), np.array(perms)), axis=1)
+
+
+def main(number=20000):
+    """Time both builders and print the per-call cost"""
+    row = clean_input_data(SAMPLE_CLIENT)
+    assert np.array_equal(legacy_create_matrix(row), create_matrix(row))
+    assert create_matrix(row).shape[1] == NUM_FEATURES + 7
+
+    legacy = timeit.timeit(lambda: legacy_create_matrix(row), number=number) / number
+    current = timeit.timeit(lambda: create_matrix(row), number=number) / number
+    print(f"legacy create_matrix:      {legacy * 1e6:8.2f} us/call")
+    print(f"precomputed create_matrix: {current * 1e6:8.2f} us/call")
+    print(f"speedup:                   {legacy / current:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+"""
+Benchmark for recommending interventions with the linear regression model.
+Compares predicting all 128 combinations with the closed-form shortlist in
+app.clients.service.linear, asserting the recommended rates agree to within rounding.
+
+Run from the repository root: python -m benchmarks.bench_linear_recommendation
+"""
+
+import timeit
+
+import numpy as np
+
+from app.clients.service import linear, logic
+from app.clients.service.ml_models import LinearRegressionModel
+from benchmarks.bench_intervention_matrix import SAMPLE_CLIENT
+
+
+def brute_force(row, model, top_k):
+    """Predict every combination and rank them"""
+    space = logic.FULL_SEARCH_SPACE
+    predictions = model.predict(logic.create_batch_matrix([row], space.rows))
+    return logic.top_interventions(predictions, top_k, space)
+
+
+def rates(result):
+    """The baseline and recommended rates of a recommendation"""
+    return [result["baseline"]] + [rate for rate, _ in result["interventions"]]
+
+
+def main(number=2000, top_k=3):
+    """Time both paths for one client and print the per-call cost"""
+    model = LinearRegressionModel()
+    model.load_if_trained()
+    scorer = linear.get_scorer(model, logic.NUM_FEATURES, logic.INTERVENTION_GRID)
+    row = logic.encode_profiles([SAMPLE_CLIENT])[0]
+    assert np.allclose(
+        rates(brute_force(row, model, top_k)),
+        rates(logic.linear_recommendation(row, scorer, top_k)),
+    )
+
+    naive = timeit.timeit(lambda: brute_force(row, model, top_k), number=number) / number
+    closed = timeit.timeit(lambda: logic.linear_recommendation(row, scorer, top_k), number=number)
+    closed /= number
+    print(f"predict 128 rows: {naive * 1e6:8.2f} us/client")
+    print(f"closed form:      {closed * 1e6:8.2f} us/client")
+    print(f"speedup:          {naive / closed:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
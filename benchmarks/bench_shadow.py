@@ -0,0 +1,58 @@
+"""
+Benchmark for shadow evaluation.
+Measures the latency of single-row predictions with the primary model, first alone and
+then with every request also queued for the shadow models, and prints p50 and p99.
+
+Run from the repository root: python -m benchmarks.bench_shadow
+"""
+
+import time
+
+import numpy as np
+
+from app.clients.service.ml_models import model_registry
+from app.clients.service.shadow import ShadowEvaluator
+
+PRIMARY = "Random Forest Regressor"
+SHADOWS = ("Linear Regression", "Support Vector Machine")
+
+
+def _latencies(model, rows, evaluator=None):
+    latencies = []
+    for row in rows:
+        started = time.perf_counter()
+        matrix = row[np.newaxis, :]
+        predictions = model.predict(matrix)
+        if evaluator is not None:
+            evaluator.submit_prediction(PRIMARY, matrix, predictions)
+        latencies.append(time.perf_counter() - started)
+    return np.array(latencies) * 1000
+
+
+def _report(label, latencies):
+    p50, p99 = np.percentile(latencies, [50, 99])
+    print(f"{label:>16}: p50 {p50:6.2f} ms, p99 {p99:6.2f} ms")
+
+
+def main(requests=2000):
+    """Time the primary path without and with shadow models"""
+    model = model_registry.get(PRIMARY)
+    for name in SHADOWS:
+        model_registry.get(name)
+    rows = np.random.default_rng(0).integers(0, 10, size=(requests, 31)).astype(float)
+    _latencies(model, rows[:100])
+    _report("no shadow", _latencies(model, rows))
+    evaluator = ShadowEvaluator(SHADOWS)
+    _report("shadowed", _latencies(model, rows, evaluator))
+    evaluator.join()
+    snapshot = evaluator.snapshot()
+    print(f"submitted {snapshot['submitted']}, dropped {snapshot['dropped']}")
+    for comparison in snapshot["comparisons"]:
+        print(
+            f"{comparison['shadow']:>24}: mean |diff| {comparison['mean_abs_diff']:.4f}, "
+            f"p99 latency {comparison['latency_ms']['p99']:.2f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
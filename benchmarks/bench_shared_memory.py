@@ -0,0 +1,94 @@
+"""
+Benchmark for the memory cost of the models across worker processes.
+Starts 1, 4 and 8 worker processes that each load every catalogued model plus the default
+recommendation model and predict once with each, first with private unpickled copies and
+then with SHARED_MODELS=1. Reports the proportional set size (PSS) the models add per
+worker and in total while every worker is alive, read from /proc (Linux only).
+
+Run from the repository root: python -m benchmarks.bench_shared_memory
+"""
+
+import multiprocessing
+import os
+import tempfile
+
+import numpy as np
+
+WORKER_COUNTS = (1, 4, 8)
+
+
+def _pss_kib():
+    with open("/proc/self/smaps_rollup", encoding="ascii") as rollup:
+        for line in rollup:
+            if line.startswith("Pss:"):
+                return int(line.split()[1])
+    raise RuntimeError("No Pss in /proc/self/smaps_rollup")
+
+
+def _load_models():
+    # pylint: disable=import-outside-toplevel
+    from app.clients.service import logic
+    from app.clients.service.ml_models import model_registry
+    from app.clients.service.model_catalog import MODEL_CATALOG
+
+    matrix = np.zeros((1, 31))
+    for model_name in MODEL_CATALOG.names():
+        model_registry.get(model_name).predict(matrix)
+    logic.get_model().predict(matrix)
+
+
+def _export():
+    # pylint: disable=import-outside-toplevel
+    from app.clients.service.logic import MODEL_PATH
+    from app.clients.service.model_catalog import MODEL_CATALOG
+    from app.clients.service.shared_models import load_shared
+
+    for path in [MODEL_CATALOG.artifact_path(name) for name in MODEL_CATALOG.names()]:
+        load_shared(path)
+    load_shared(MODEL_PATH)
+
+
+def _worker(barrier, results):
+    # pylint: disable=import-outside-toplevel, unused-import
+    import app.clients.service.ml_models  # noqa: F401 the imports are not model memory
+
+    barrier.wait()
+    before = _pss_kib()
+    barrier.wait()
+    _load_models()
+    barrier.wait()
+    results.put(_pss_kib() - before)
+    barrier.wait()
+
+
+def measure(context, workers):
+    """Return the PSS in KiB the models add to each of `workers` live processes"""
+    barrier = context.Barrier(workers)
+    results = context.Queue()
+    processes = [context.Process(target=_worker, args=(barrier, results)) for _ in range(workers)]
+    for process in processes:
+        process.start()
+    added = [results.get() for _ in processes]
+    for process in processes:
+        process.join()
+    return added
+
+
+def main():
+    """Measure private and shared models for each worker count and print the results"""
+    context = multiprocessing.get_context("spawn")
+    os.environ["SHARED_MODEL_DIR"] = tempfile.mkdtemp(prefix="shared-models-")
+    print(f"{'mode':8} {'workers':>7} {'per worker MiB':>15} {'total MiB':>10}")
+    for mode in ("private", "shared"):
+        os.environ["SHARED_MODELS"] = "1" if mode == "shared" else "0"
+        if mode == "shared":
+            exporter = context.Process(target=_export)
+            exporter.start()
+            exporter.join()
+        for workers in WORKER_COUNTS:
+            added = measure(context, workers)
+            print(f"{mode:8} {workers:7d} {np.mean(added) / 1024:15.2f} {sum(added) / 1024:10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""
+Benchmark for serving start-up with the sklearn and NumPy backends.
+Each run starts a fresh interpreter that imports the app, loads every catalogued model
+and predicts one row with each. It reports the median import time, load time and peak
+RSS, and whether sklearn was imported.
+
+Export the NumPy artifacts first: python -m app.clients.service.export_numpy
+Run from the repository root: python -m benchmarks.bench_startup
+"""
+
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+SCRIPT = """
+import json, resource, sys, time
+started = time.perf_counter()
+import app.main
+imported = time.perf_counter()
+from app.clients.service.ml_models import model_registry
+from app.clients.service.model_catalog import MODEL_CATALOG
+for name in MODEL_CATALOG.names():
+    model_registry.get(name).predict([[0.0] * 31])
+loaded = time.perf_counter()
+print(json.dumps({
+    "import_ms": (imported - started) * 1000,
+    "load_ms": (loaded - imported) * 1000,
+    "rss_mib": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    "sklearn": "sklearn" in sys.modules,
+}))
+"""
+
+
+def _run(backend):
+    env = dict(os.environ, MODEL_BACKEND=backend)
+    output = subprocess.run(
+        [sys.executable, "-c", SCRIPT], env=env, check=True, capture_output=True, text=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main(runs=5):
+    """Start the app several times with each backend and print the medians"""
+    print(f"{'backend':>8} {'import ms':>10} {'load ms':>8} {'total ms':>9} {'RSS MiB':>8} sklearn")
+    for backend in ("sklearn", "numpy"):
+        results = [_run(backend) for _ in range(runs)]
+        import_ms = statistics.median(result["import_ms"] for result in results)
+        load_ms = statistics.median(result["load_ms"] for result in results)
+        total_ms = statistics.median(result["import_ms"] + result["load_ms"] for result in results)
+        rss = statistics.median(result["rss_mib"] for result in results)
+        print(
+            f"{backend:>8} {import_ms:10.0f} {load_ms:8.0f} {total_ms:9.0f} {rss:8.1f} "
+            f"{results[0]['sklearn']}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+"""
+Benchmark for scoring intervention combinations with the support vector machine.
+Compares SVR.predict over every combination with the factorized RBF kernel in
+app.clients.service.kernel, checking the scores agree.
+
+Run from the repository root: python -m benchmarks.bench_svm_recommendation
+"""
+
+import timeit
+
+import numpy as np
+
+from app.clients.service import logic
+from app.clients.service.ml_models import SVMModel
+from benchmarks.bench_intervention_matrix import SAMPLE_CLIENT
+
+
+def predict_all(rows_data, model):
+    """Predict every combination for each client"""
+    space = logic.FULL_SEARCH_SPACE
+    predictions = model.predict(logic.create_batch_matrix(rows_data, space.rows))
+    return predictions.reshape(len(rows_data), len(space.rows))
+
+
+def main(number=20):
+    """Time both paths for 1, 8 and 256 clients and print the per-client cost"""
+    model = SVMModel()
+    model.load_if_trained()
+    row = logic.encode_profiles([SAMPLE_CLIENT])[0]
+    rng = np.random.default_rng(0)
+    for clients in (1, 8, 256):
+        rows_data = row + rng.integers(-3, 4, size=(clients, logic.NUM_FEATURES))
+        np.testing.assert_allclose(
+            logic.score_interventions(rows_data, model), predict_all(rows_data, model), rtol=1e-12
+        )
+        naive = timeit.timeit(
+            lambda rows_data=rows_data: predict_all(rows_data, model), number=number
+        )
+        factorized = timeit.timeit(
+            lambda rows_data=rows_data: logic.score_interventions(rows_data, model), number=number
+        )
+        print(
+            f"{clients:4d} clients: predict {naive / number / clients * 1e6:9.1f} us/client, "
+            f"factorized {factorized / number / clients * 1e6:7.1f} us/client, "
+            f"{naive / factorized:5.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
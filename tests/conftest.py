@@ -1,8 +1,12 @@
 # pylint: disable=redefined-outer-name
+import shutil
+
 import pytest
 from fastapi.testclient import TestClient
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
+from app.clients.service import recommendation_service
+from app.clients.service.model_catalog import MODEL_CATALOG, ModelCatalog
 from app.database import Base, get_db
 from app.main import app
 from app.auth.router import get_password_hash
@@ -14,6 +18,21 @@ engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread
 TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 
+@pytest.fixture
+def artifact_catalog(tmp_path):
+    """Factory of a ModelCatalog in tmp_path holding copies of the named pretrained artifacts"""
+
+    def copy_artifacts(*model_names):
+        catalog = ModelCatalog(artifact_dir=str(tmp_path))
+        for model_name in model_names:
+            shutil.copyfile(
+                MODEL_CATALOG.artifact_path(model_name), catalog.artifact_path(model_name)
+            )
+        return catalog
+
+    return copy_artifacts
+
+
 @pytest.fixture
 def test_db():
     # Create tables
@@ -136,7 +155,7 @@ def test_db():
 
 
 @pytest.fixture
-def client(test_db):
+def client(test_db, monkeypatch):
     def override_get_db():
         try:
             yield test_db
@@ -144,6 +163,8 @@ def client(test_db):
             test_db.close()
 
     app.dependency_overrides[get_db] = override_get_db
+    # Background tasks open their own sessions
+    monkeypatch.setattr(recommendation_service, "SessionLocal", TestingSessionLocal)
     yield TestClient(app)
     app.dependency_overrides.clear()
 
@@ -0,0 +1,62 @@
+"""
+Sample inputs shared by the test modules.
+"""
+
+import numpy as np
+
+from app.clients.service import logic
+from app.clients.service.constants import COLUMNS_FIELDS
+
+# One client's features with interventions, as /ml_models/predict receives them
+FEATURES = {
+    "age": 23,
+    "gender": 1,
+    "work_experience": 1,
+    "canada_workex": 1,
+    "dep_num": 0,
+    "canada_born": 1,
+    "citizen_status": 2,
+    "level_of_schooling": 2,
+    "fluent_english": 3,
+    "reading_english_scale": 2,
+    "speaking_english_scale": 2,
+    "writing_english_scale": 3,
+    "numeracy_scale": 2,
+    "computer_scale": 3,
+    "transportation_bool": 2,
+    "caregiver_bool": 1,
+    "housing": 1,
+    "income_source": 5,
+    "felony_bool": 1,
+    "attending_school": 0,
+    "currently_employed": 1,
+    "substance_use": 1,
+    "time_unemployed": 1,
+    "need_mental_health_support_bool": 1,
+    "employment_assistance": 1,
+    "life_stabilization": 0,
+    "retention_services": 1,
+    "specialized_services": 0,
+    "employment_related_financial_supports": 0,
+    "employer_financial_supports": 1,
+    "enhanced_referrals": 0,
+}
+
+
+# The same client's raw form answers, as the recommendation endpoints receive them
+SAMPLE_CLIENT = {column: str(FEATURES[column]) for column in COLUMNS_FIELDS}
+
+
+def perturbed_rows(count, seed=0):
+    """Cleaned client rows scattered around the sample client"""
+    row = np.array(logic.clean_input_data(SAMPLE_CLIENT))
+    rng = np.random.default_rng(seed)
+    return row + rng.integers(-3, 4, size=(count, logic.NUM_FEATURES))
+
+
+def forest_matrix(rows=200):
+    """Feature rows with demographic values on and around the split thresholds"""
+    rng = np.random.default_rng(3)
+    demographics = np.vstack([perturbed_rows(rows // 2), perturbed_rows(rows // 2, 1) + 0.5])
+    interventions = logic.INTERVENTION_GRID[rng.integers(0, 128, size=len(demographics))]
+    return np.hstack([demographics, interventions])
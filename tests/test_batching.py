@@ -0,0 +1,75 @@
+# pylint: disable=too-few-public-methods
+import asyncio
+import time
+
+import numpy as np
+import pytest
+from fastapi import status
+
+from app.clients.service import ml_models_router
+from app.clients.service.batching import MicroBatcher
+from app.clients.service.inference import timed_predict
+from tests.samples import FEATURES
+
+
+class _SlowSumModel:
+    """Predicts each row's sum and records the size of every batch"""
+
+    def __init__(self, delay=0.02):
+        self.delay = delay
+        self.batches = []
+
+    def predict(self, matrix):
+        self.batches.append(len(matrix))
+        time.sleep(self.delay)
+        if np.isnan(matrix).any():
+            raise ValueError("Input contains NaN")
+        return matrix.sum(axis=1)
+
+
+async def _predict_all(batcher, model, rows):
+    return await asyncio.gather(*(batcher.predict(model, row) for row in rows))
+
+
+def test_concurrent_requests_share_batches():
+    """Test queued rows are predicted together and fanned back out in order"""
+    model = _SlowSumModel()
+    batcher = MicroBatcher(max_batch_size=8, window_ms=50)
+    rows = [[i, 1.0] for i in range(20)]
+    assert asyncio.run(_predict_all(batcher, model, rows)) == [i + 1.0 for i in range(20)]
+    assert sum(model.batches) == 20 and max(model.batches) <= 8
+    assert len(model.batches) < 20
+
+    metrics = batcher.metrics.snapshot()
+    assert (metrics["requests"], metrics["batches"]) == (20, len(model.batches))
+    assert metrics["queue_depth"] == 0 and metrics["max_queue_depth"] >= max(model.batches)
+    assert metrics["max_batch_size"] == max(model.batches)
+
+
+def test_lone_request_is_not_delayed():
+    """Test an idle model dispatches immediately instead of waiting for the window"""
+    batcher = MicroBatcher(window_ms=5000)
+    started = time.perf_counter()
+    assert asyncio.run(_predict_all(batcher, _SlowSumModel(delay=0), [[1.0, 2.0]])) == [3.0]
+    assert time.perf_counter() - started < 1
+
+
+def test_batch_errors_reach_every_waiter():
+    """Test a failed predict call raises in each request of the batch"""
+    batcher = MicroBatcher()
+    with pytest.raises(ValueError):
+        asyncio.run(_predict_all(batcher, _SlowSumModel(), [[1.0], [float("nan")]]))
+
+
+def test_predict_endpoint_with_micro_batching(client, monkeypatch):
+    """Test enabling the batcher leaves single-row predictions unchanged"""
+    monkeypatch.setattr(ml_models_router, "prediction_cache", None)
+    expected = client.post("/ml_models/predict", json=FEATURES).json()
+    assert client.get("/ml_models/batching").json() == {"enabled": False}
+
+    batcher = MicroBatcher(predict=timed_predict)
+    monkeypatch.setattr(ml_models_router, "prediction_batcher", batcher)
+    response = client.post("/ml_models/predict", json=FEATURES)
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json() == expected
+    assert client.get("/ml_models/batching").json()["metrics"]["requests"] == 1
@@ -0,0 +1,88 @@
+from fastapi import status
+
+from app.clients.service import cache as cache_module, ml_models_router
+from app.clients.service.cache import LRUCache, PredictionCache, SQLiteCacheStore, feature_key
+from app.clients.service.ml_models import MLModelRepository, ModelRegistry
+from tests.samples import FEATURES
+
+
+def test_feature_key_is_canonical():
+    """Test equal feature vectors hash alike regardless of their Python types"""
+    assert feature_key([23, 1, 0.0]) == feature_key([23.0, 1.0, -0.0])
+    assert feature_key([23, 1, 0]) != feature_key([24, 1, 0])
+
+
+def test_lru_eviction_and_counters():
+    """Test the least recently used entry is evicted and counted"""
+    cache = LRUCache(maxsize=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["evictions"]) == (1, 1, 1)
+    assert stats["size"] == 2
+
+
+def test_ttl_expiry(monkeypatch):
+    """Test entries expire once their time-to-live has passed"""
+    now = [100.0]
+    monkeypatch.setattr(cache_module.time, "monotonic", lambda: now[0])
+    cache = LRUCache(maxsize=4, ttl_seconds=10)
+    cache.set("a", 1)
+    now[0] += 11
+    assert cache.get("a") is None
+    assert cache.stats()["expirations"] == 1
+
+
+def test_predict_endpoint_reports_cache_hits(client, monkeypatch):
+    """Test a repeated prediction is served from the cache with X-Cache: HIT"""
+    monkeypatch.setattr(ml_models_router, "prediction_cache", PredictionCache(maxsize=8))
+    first = client.post("/ml_models/predict/Linear Regression", json=FEATURES)
+    second = client.post("/ml_models/predict/Linear Regression", json=FEATURES)
+    assert first.status_code == second.status_code == status.HTTP_200_OK
+    assert (first.headers["X-Cache"], second.headers["X-Cache"]) == ("MISS", "HIT")
+    assert first.json() == second.json()
+    other = client.post("/ml_models/predict/Linear Regression", json=dict(FEATURES, age=60))
+    assert other.headers["X-Cache"] == "MISS"
+    stats = client.get("/ml_models/cache").json()
+    assert (stats["hits"], stats["misses"], stats["size"]) == (1, 2, 2)
+
+
+def test_prediction_cache_is_invalidated_on_reload(artifact_catalog):
+    """Test reloading a model drops its entries and changes its keys"""
+    catalog = artifact_catalog("Linear Regression")
+    registry = ModelRegistry(MLModelRepository(catalog))
+    path = catalog.artifact_path("Linear Regression")
+    cache = PredictionCache(maxsize=8)
+    registry.on_change(cache.invalidate)
+    model = registry.get("Linear Regression")
+    key = cache.key(model, list(FEATURES.values()))
+    cache.set(key, [1.0])
+    assert cache.get(key) == [1.0]
+
+    with open(path, "ab") as artifact:
+        artifact.write(b"\0")
+    reloaded = registry.get("Linear Regression")
+    assert reloaded is not model and len(cache.memory) == 0
+    assert cache.key(reloaded, list(FEATURES.values())) != key
+
+
+def test_prediction_cache_second_tier_survives_restart(tmp_path, artifact_catalog):
+    """Test predictions stored in SQLite are found by a new cache and purged by model"""
+    registry = ModelRegistry(MLModelRepository(artifact_catalog("Linear Regression")))
+    model = registry.get("Linear Regression")
+    path = str(tmp_path / "predictions.db")
+    key = PredictionCache.key(model, list(FEATURES.values()))
+    PredictionCache(maxsize=1, store=SQLiteCacheStore(path)).set(key, [0.5])
+
+    restarted = PredictionCache(maxsize=1, store=SQLiteCacheStore(path))
+    assert restarted.get(key) == [0.5] and len(restarted.memory) == 1
+    assert restarted.get(key) == [0.5]
+    stats = restarted.stats()
+    assert (stats["hits"], stats["misses"]) == (2, 0)
+    assert (stats["memory_hits"], stats["store_hits"]) == (1, 1)
+    restarted.invalidate("Linear Regression")
+    assert restarted.get(key) is None
+    assert restarted.stats()["misses"] == 1
@@ -1,3 +1,5 @@
+import json
+
 from fastapi import status
 
 
@@ -139,3 +141,16 @@ def test_delete_client(client, admin_headers):
     # Test deleting non-existent client
     response = client.delete("/clients/999", headers=admin_headers)
     assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+def test_stream_case_worker_recommendations(client, case_worker_headers):
+    """Test a case worker's caseload is streamed as one JSON line per client"""
+    response = client.get("/clients/case-worker/2/recommendations", headers=case_worker_headers)
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert [line["client_id"] for line in lines] == [2]
+    assert len(lines[0]["interventions"]) == 3
+
+    response = client.get("/clients/case-worker/999/recommendations", headers=case_worker_headers)
+    assert response.status_code == status.HTTP_404_NOT_FOUND
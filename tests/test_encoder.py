@@ -0,0 +1,44 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.clients.service.constants import COLUMNS_FIELDS
+from app.clients.service.encoder import CategoricalEncoder, UnknownLabelError, encode_profiles
+from tests.samples import SAMPLE_CLIENT
+
+
+def test_encodes_labels_per_column():
+    """Test text answers map through their own column's labels"""
+    profile = dict(
+        SAMPLE_CLIENT,
+        canada_born="Yes",
+        level_of_schooling="Bachelor's degree",
+        housing="Homeowner",
+        income_source="Employment",
+    )
+    encoded = encode_profiles([profile])[0]
+    columns = dict(zip(COLUMNS_FIELDS, encoded))
+    assert columns["canada_born"] == 1
+    assert columns["level_of_schooling"] == 13
+    assert columns["housing"] == 4
+    assert columns["income_source"] == 8
+    assert columns["age"] == 23
+
+
+def test_reports_unknown_labels_per_column():
+    """Test labels from another column or outside every label set are reported"""
+    profiles = [dict(SAMPLE_CLIENT, age="Homeowner"), dict(SAMPLE_CLIENT, housing="Grade 9")]
+    encoded, unknown = CategoricalEncoder().encode_records(profiles)
+    assert unknown == {"age": ["Homeowner"], "housing": ["Grade 9"]}
+    assert np.isnan(encoded[0, 0]) and not np.isnan(encoded[1, 0])
+    with pytest.raises(UnknownLabelError):
+        encode_profiles(profiles)
+
+
+def test_frame_and_records_encode_alike():
+    """Test DataFrame columns encode the same way as the equivalent dicts"""
+    profiles = [dict(SAMPLE_CLIENT, age=str(age), housing="Homeowner") for age in range(20, 30)]
+    encoder = CategoricalEncoder()
+    from_frame, unknown = encoder.encode_frame(pd.DataFrame(profiles))
+    assert not unknown
+    assert np.array_equal(from_frame, encoder.encode_records(profiles)[0])
@@ -0,0 +1,66 @@
+import numpy as np
+from sklearn.ensemble import RandomForestRegressor
+
+from app.clients.service import forest, logic
+from app.clients.service.ml_models import RandomForestModel
+from tests.samples import perturbed_rows
+
+
+def test_evaluator_is_bit_identical_to_predict():
+    """Test the evaluator reproduces predict exactly for the full grid"""
+    evaluator = forest.get_evaluator(logic.MODEL, logic.NUM_FEATURES, logic.INTERVENTION_GRID)
+    rows = logic.FULL_SEARCH_SPACE.rows
+    for row in perturbed_rows(50):
+        expected = logic.MODEL.predict(logic.create_batch_matrix([row], rows))
+        assert np.array_equal(evaluator.score(row, rows), expected)
+
+
+def test_evaluator_scores_constrained_spaces():
+    """Test a subset of the grid matches predict on the same rows"""
+    space = logic.intervention_search_space(max_interventions=2, exclude=["Specialized Services"])
+    rows_data = perturbed_rows(5, seed=1)
+    expected = logic.MODEL.predict(logic.create_batch_matrix(rows_data, space.rows))
+    scores = logic.score_interventions(rows_data, space=space)
+    assert np.array_equal(scores, expected.reshape(len(rows_data), len(space.rows)))
+
+
+def test_evaluator_handles_any_split_threshold():
+    """Test a freshly fitted forest with arbitrary thresholds still matches predict"""
+    rng = np.random.default_rng(2)
+    grid = logic.INTERVENTION_GRID
+    features = np.hstack(
+        [rng.integers(0, 5, size=(400, logic.NUM_FEATURES)), grid[rng.integers(0, 128, size=400)]]
+    )
+    model = RandomForestRegressor(n_estimators=7, random_state=0).fit(features, rng.random(400))
+    evaluator = forest.InterventionForestEvaluator(model, logic.NUM_FEATURES, grid)
+    rows = logic.FULL_SEARCH_SPACE.rows
+    for row in features[:20, : logic.NUM_FEATURES]:
+        expected = model.predict(logic.create_batch_matrix([row], rows))
+        assert np.array_equal(evaluator.score(row, rows), expected)
+
+
+def test_evaluator_is_shared_per_forest():
+    """Test wrappers resolve to their forest and other models are not supported"""
+    wrapper = RandomForestModel()
+    wrapper.model = logic.MODEL
+    first = forest.get_evaluator(wrapper, logic.NUM_FEATURES, logic.INTERVENTION_GRID)
+    assert first is forest.get_evaluator(logic.MODEL, logic.NUM_FEATURES, logic.INTERVENTION_GRID)
+    assert forest.get_evaluator(object(), logic.NUM_FEATURES, logic.INTERVENTION_GRID) is None
+
+
+def test_column_masks_are_bounded(monkeypatch):
+    """Test the per-search-space masks are evicted like the search spaces they mirror"""
+    monkeypatch.setattr(forest, "MASK_CACHE_SIZE", 4)
+    rng = np.random.default_rng(4)
+    grid = logic.INTERVENTION_GRID
+    features = np.hstack(
+        [rng.integers(0, 5, size=(200, logic.NUM_FEATURES)), grid[rng.integers(0, 128, size=200)]]
+    )
+    model = RandomForestRegressor(n_estimators=3, random_state=0).fit(features, rng.random(200))
+    evaluator = forest.InterventionForestEvaluator(model, logic.NUM_FEATURES, grid)
+    row = features[0, : logic.NUM_FEATURES]
+    for limit in range(1, 8):
+        space = logic.intervention_search_space(max_interventions=limit)
+        expected = model.predict(logic.create_batch_matrix([row], space.rows))
+        assert np.array_equal(evaluator.score(row, space.rows), expected)
+    assert len(evaluator._masks) == 4  # pylint: disable=protected-access
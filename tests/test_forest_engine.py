@@ -0,0 +1,59 @@
+import numpy as np
+import pytest
+from sklearn.ensemble import RandomForestRegressor
+
+from app.clients.service import logic
+from app.clients.service.flat_forest import CompactForestRegressor, FlatForestRegressor
+from app.clients.service.ml_models import MLModelRepository, ModelRegistry, engines_from_env
+from tests.samples import forest_matrix
+
+
+def test_compact_forest_matches_predict():
+    """Test the level-by-level engine agrees with predict across batch sizes"""
+    compact = CompactForestRegressor.from_forest(logic.MODEL)
+    assert compact.n_estimators == len(logic.MODEL.estimators_)
+    matrix = forest_matrix(600)
+    for rows in (1, 7, 256, 600):
+        np.testing.assert_allclose(
+            compact.predict(matrix[:rows]), logic.MODEL.predict(matrix[:rows]), rtol=1e-6
+        )
+
+
+def test_compact_forest_splits_exactly_at_thresholds():
+    """Test float32 thresholds send values on either side of a split the same way"""
+    rng = np.random.default_rng(4)
+    features = rng.normal(size=(300, 5)) * 1000
+    model = RandomForestRegressor(n_estimators=5, max_depth=20, random_state=0)
+    model.fit(features, rng.random(300))
+    thresholds = np.concatenate([e.tree_.threshold for e in model.estimators_])
+    near = thresholds[thresholds != -2].astype(np.float32)
+    probes = np.concatenate([near, np.nextafter(near, np.float32(np.inf))])
+    matrix = np.repeat(probes[:, np.newaxis], 5, axis=1)
+
+    flat = FlatForestRegressor.from_forest(model)
+    compact = CompactForestRegressor.from_forest(flat)
+    assert np.array_equal(flat.predict(matrix), model.predict(matrix))
+    np.testing.assert_allclose(compact.predict(matrix), model.predict(matrix), rtol=1e-6)
+
+
+def test_registry_serves_selected_engine(artifact_catalog, monkeypatch):
+    """Test a model is compiled to the engine selected for it in the registry"""
+    catalog = artifact_catalog("Random Forest Regressor", "Linear Regression")
+    registry = ModelRegistry(MLModelRepository(catalog))
+    default = registry.get("Random Forest Regressor")
+    assert registry.engine("Random Forest Regressor") == "sklearn"
+
+    registry.set_engine("Random Forest Regressor", "arrays")
+    compact = registry.get("Random Forest Regressor")
+    assert isinstance(compact.model, CompactForestRegressor)
+    assert compact.identity() != default.identity()
+    np.testing.assert_allclose(
+        compact.predict(forest_matrix()), default.predict(forest_matrix()), rtol=1e-6
+    )
+
+    with pytest.raises(ValueError):
+        registry.set_engine("Linear Regression", "arrays")
+    monkeypatch.setenv("MODEL_ENGINES", "Random Forest Regressor=arrays")
+    assert engines_from_env() == {"Random Forest Regressor": "arrays"}
+    with pytest.raises(ValueError):
+        ModelRegistry(MLModelRepository(catalog), {"Support Vector Machine": "arrays"})
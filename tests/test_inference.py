@@ -0,0 +1,84 @@
+# pylint: disable=too-few-public-methods
+import asyncio
+import threading
+import time
+
+import numpy as np
+import pytest
+from fastapi import HTTPException
+
+from app.clients.service.inference import CLIENT_CLOSED_REQUEST, InferenceExecutor, run_cancellable
+from app.clients.service.ml_models import model_registry
+from tests.samples import FEATURES, SAMPLE_CLIENT
+
+
+class _DisconnectedRequest:
+    async def is_disconnected(self):
+        return True
+
+
+class _ConnectedRequest:
+    async def is_disconnected(self):
+        return False
+
+
+def test_disconnect_cancels_inference():
+    """Test a call still running when the client goes away is cancelled with a 499"""
+    cancelled = []
+
+    async def slow_inference():
+        try:
+            await asyncio.sleep(5)
+        except asyncio.CancelledError:
+            cancelled.append(True)
+            raise
+
+    async def run():
+        with pytest.raises(HTTPException) as error:
+            await run_cancellable(_DisconnectedRequest(), slow_inference())
+        await asyncio.sleep(0)
+        assert error.value.status_code == CLIENT_CLOSED_REQUEST
+
+    asyncio.run(run())
+    assert cancelled == [True]
+
+
+def test_pending_calls_are_bounded():
+    """Test no more than max_pending calls are submitted to the pool at once"""
+    executor = InferenceExecutor(workers=4, max_pending=2)
+    running, peak, lock = [0], [0], threading.Lock()
+
+    def work(value):
+        with lock:
+            running[0] += 1
+            peak[0] = max(peak[0], running[0])
+        time.sleep(0.02)
+        with lock:
+            running[0] -= 1
+        return value
+
+    async def run():
+        return await asyncio.gather(*(executor.run(work, i) for i in range(8)))
+
+    try:
+        assert asyncio.run(run()) == list(range(8))
+    finally:
+        executor.shutdown()
+    assert peak[0] == 2
+
+
+def test_process_pool_matches_in_process_predictions():
+    """Test worker processes predict and recommend with their own preloaded models"""
+    model = model_registry.get("Random Forest Regressor")
+    matrix = np.array([list(FEATURES.values())] * 3, dtype=float)
+    threaded, spawned = InferenceExecutor("thread", 1), InferenceExecutor("process", 1)
+
+    async def run(executor):
+        predictions = await run_cancellable(_ConnectedRequest(), executor.predict(model, matrix))
+        return predictions.tolist(), await executor.recommend(model, [SAMPLE_CLIENT], 3)
+
+    try:
+        assert asyncio.run(run(spawned)) == asyncio.run(run(threaded))
+    finally:
+        threaded.shutdown()
+        spawned.shutdown()
@@ -0,0 +1,56 @@
+import numpy as np
+from sklearn.svm import SVR
+
+from app.clients.service import kernel, logic
+from app.clients.service.ml_models import SVMModel
+from tests.samples import perturbed_rows
+
+
+def _predicted(model, rows_data, space=logic.FULL_SEARCH_SPACE):
+    """Scores from predicting every combination in the space"""
+    predictions = model.predict(logic.create_batch_matrix(rows_data, space.rows))
+    return predictions.reshape(len(rows_data), len(space.rows))
+
+
+def test_factorized_kernel_matches_predict():
+    """Test the pretrained SVM's factorized scores agree with SVR.predict"""
+    model = SVMModel()
+    model.load_if_trained()
+    rows_data = perturbed_rows(40).astype(float)
+    space = logic.intervention_search_space(max_interventions=2, exclude=["Specialized Services"])
+    for search_space in (logic.FULL_SEARCH_SPACE, space):
+        scores = logic.score_interventions(rows_data, model, search_space)
+        np.testing.assert_allclose(
+            scores, _predicted(model, rows_data, search_space), rtol=1e-12, atol=1e-12
+        )
+
+
+def test_factorized_kernel_with_fitted_gamma():
+    """Test a freshly fitted SVR with a large gamma still matches predict"""
+    rng = np.random.default_rng(5)
+    grid = logic.INTERVENTION_GRID
+    features = np.hstack(
+        [rng.normal(size=(300, logic.NUM_FEATURES)), grid[rng.integers(0, 128, size=300)]]
+    )
+    model = SVR(gamma=0.5, C=10).fit(features, rng.random(300))
+    rows_data = rng.normal(size=(6, logic.NUM_FEATURES))
+    scorer = kernel.get_scorer(model, logic.NUM_FEATURES, grid)
+    np.testing.assert_allclose(
+        scorer.score_batch(rows_data, logic.FULL_SEARCH_SPACE.rows),
+        _predicted(model, rows_data),
+        rtol=1e-12,
+        atol=1e-12,
+    )
+
+
+def test_scorer_is_rebuilt_after_refit():
+    """Test refitting invalidates the kernel table and only RBF SVRs are supported"""
+    rng = np.random.default_rng(6)
+    features = rng.random((50, logic.NUM_FEATURES + logic.NUM_INTERVENTIONS))
+    model = SVR().fit(features, rng.random(50))
+    first = kernel.get_scorer(model, logic.NUM_FEATURES, logic.INTERVENTION_GRID)
+    assert first is kernel.get_scorer(model, logic.NUM_FEATURES, logic.INTERVENTION_GRID)
+    model.fit(features, rng.random(50))
+    assert first is not kernel.get_scorer(model, logic.NUM_FEATURES, logic.INTERVENTION_GRID)
+    linear_svr = SVR(kernel="linear").fit(features, rng.random(50))
+    assert not kernel.supports(linear_svr) and not kernel.supports(SVMModel())
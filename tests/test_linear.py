@@ -0,0 +1,82 @@
+import numpy as np
+import pytest
+from sklearn.linear_model import LinearRegression
+
+from app.clients.service import linear, logic
+from app.clients.service.ml_models import LinearRegressionModel
+from tests.samples import SAMPLE_CLIENT
+
+
+def _assert_matches_brute_force(clients, model, top_k, space=logic.FULL_SEARCH_SPACE, **search):
+    """
+    Check the recommendations against predicting every combination in the space.
+
+    The closed-form rates agree with predict to within rounding, so combinations that tie
+    to within rounding may be returned in a different order or swapped for one another.
+    """
+    rows = logic.encode_profiles(clients)
+    predictions = model.predict(logic.create_batch_matrix(rows, space.rows))
+    predictions = predictions.reshape(len(rows), len(space.rows))
+    results = logic.recommend_batch(clients, top_k, model, **search)
+    for result, scores in zip(results, predictions):
+        expected = logic.top_interventions(scores, top_k, space)
+        by_names = {
+            tuple(logic.intervention_row_to_names(logic.INTERVENTION_GRID[row])): score
+            for row, score in zip(space.rows, scores)
+        }
+        assert result["baseline"] == pytest.approx(expected["baseline"])
+        rates = [rate for rate, _ in result["interventions"]]
+        assert rates == pytest.approx([rate for rate, _ in expected["interventions"]])
+        assert rates == pytest.approx(
+            [by_names[tuple(names)] for _, names in result["interventions"]]
+        )
+
+
+def _clients(count, seed=0):
+    """Sample client dicts with scattered numeric answers"""
+    rng = np.random.default_rng(seed)
+    clients = []
+    for _ in range(count):
+        client = dict(SAMPLE_CLIENT)
+        for field in ("age", "work_experience", "dep_num", "time_unemployed"):
+            client[field] = str(rng.integers(0, 60))
+        clients.append(client)
+    return clients
+
+
+def test_linear_fast_path_matches_brute_force():
+    """Test the closed-form ranking returns the brute-force recommendation"""
+    model = LinearRegressionModel()
+    model.load_if_trained()
+    clients = _clients(40)
+    for top_k in (1, 3, 10, 128):
+        _assert_matches_brute_force(clients, model, top_k)
+
+
+def test_linear_fast_path_with_constraints_and_ties():
+    """Test tied coefficients and constrained spaces rank like the full sort"""
+    rng = np.random.default_rng(1)
+    features = rng.integers(0, 5, size=(200, logic.NUM_FEATURES + logic.NUM_INTERVENTIONS))
+    model = LinearRegression().fit(features, rng.random(200))
+    model.coef_[logic.NUM_FEATURES :] = [0.1, 0.1, -0.2, 0.3, 0.1 + 1e-17, 0.0, 0.2]
+    space = logic.intervention_search_space(max_interventions=3, exclude=["Specialized Services"])
+    clients = _clients(20, seed=2)
+    for top_k in (1, 4, 20):
+        _assert_matches_brute_force(
+            clients, model, top_k, space, max_interventions=3, exclude=["Specialized Services"]
+        )
+
+
+def test_scorer_is_rebuilt_after_refit():
+    """Test refitting a model invalidates its precomputed contributions"""
+    rng = np.random.default_rng(3)
+    features = rng.random((50, logic.NUM_FEATURES + logic.NUM_INTERVENTIONS))
+    model = LinearRegression().fit(features, rng.random(50))
+    first = linear.get_scorer(model, logic.NUM_FEATURES, logic.INTERVENTION_GRID)
+    assert first is linear.get_scorer(model, logic.NUM_FEATURES, logic.INTERVENTION_GRID)
+    model.fit(features, rng.random(50))
+    assert first is not linear.get_scorer(model, logic.NUM_FEATURES, logic.INTERVENTION_GRID)
+    assert (
+        linear.get_scorer(LinearRegressionModel(), logic.NUM_FEATURES, logic.INTERVENTION_GRID)
+        is None
+    )
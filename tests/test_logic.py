@@ -0,0 +1,157 @@
+import os
+import subprocess
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from itertools import product
+
+import numpy as np
+
+from app.clients.service import logic, model_helper
+from app.clients.service.model_catalog import MODEL_CATALOG
+from app.clients.service.model_helper import (
+    LazyModelLoader,
+    load_model_artifact,
+    save_model_artifact,
+)
+from tests.samples import SAMPLE_CLIENT
+
+
+def test_intervention_grid_matches_product_order():
+    """Test the precomputed grid keeps itertools.product ordering and is read-only"""
+    expected = np.array(list(product([0, 1], repeat=7)))
+    assert np.array_equal(logic.INTERVENTION_GRID, expected)
+    assert not logic.INTERVENTION_GRID.flags.writeable
+
+
+def test_create_matrix_broadcasts_client_row():
+    """Test every row of the matrix carries the client features and one combination"""
+    row = logic.clean_input_data(SAMPLE_CLIENT)
+    matrix = logic.create_matrix(row)
+    assert matrix.shape == (128, 31)
+    assert np.array_equal(matrix[:, :24], np.tile(row, (128, 1)))
+    assert np.array_equal(matrix[:, 24:], logic.INTERVENTION_GRID)
+
+
+def test_interpret_and_calculate_returns_top_three():
+    """Test the recommendation output keeps its shape"""
+    results = logic.interpret_and_calculate(SAMPLE_CLIENT)
+    assert "baseline" in results
+    assert len(results["interventions"]) == 3
+    rates = [rate for rate, _ in results["interventions"]]
+    assert rates == sorted(rates)
+
+
+def test_recommend_batch_matches_single_client_scoring():
+    """Test batch scoring across chunks agrees with scoring each client alone"""
+    clients = [dict(SAMPLE_CLIENT, age=str(age)) for age in range(20, 27)]
+    batch = logic.recommend_batch(clients, top_k=5, chunk_size=3)
+    assert len(batch) == len(clients)
+    for input_data, result in zip(clients, batch):
+        row = logic.clean_input_data(input_data)
+        predictions = logic.MODEL.predict(logic.create_matrix(row))
+        assert result["baseline"] == predictions[0]
+        assert [rate for rate, _ in result["interventions"]] == sorted(predictions)[-5:]
+
+
+def test_top_k_indices_matches_stable_sort():
+    """Test partial selection agrees with a stable full sort, ties included"""
+    scores = np.array([3.0, 1.0, 3.0, 2.0, 3.0, 0.5])
+    expected = np.argsort(scores, kind="stable")[-2:]
+    assert np.array_equal(logic.top_k_indices(scores, 2), expected)
+
+
+def test_search_space_filters_infeasible_combinations():
+    """Test constraints shrink the rows scored while keeping the baseline first"""
+    space = logic.intervention_search_space(
+        max_interventions=2, include=["Retention Services"], exclude=["Specialized Services"]
+    )
+    assert space.rows[0] == 0 and space.first_candidate == 1
+    candidates = logic.INTERVENTION_GRID[space.rows[1:]]
+    assert len(candidates) == 6
+    assert (candidates.sum(axis=1) <= 2).all()
+    assert (candidates[:, 2] == 1).all() and (candidates[:, 3] == 0).all()
+
+
+def test_search_interventions_respects_constraints():
+    """Test constrained search only returns feasible combinations"""
+    result = logic.search_interventions(
+        SAMPLE_CLIENT, top_k=4, max_interventions=1, exclude=["Life Stabilization"]
+    )
+    assert result["baseline"] == logic.interpret_and_calculate(SAMPLE_CLIENT)["baseline"]
+    assert len(result["interventions"]) == 4
+    for _, names in result["interventions"]:
+        assert len(names) <= 1 and "Life Stabilization" not in names
+
+
+class _IdentifiedModel:
+    """Wraps MODEL with a settable identity"""
+
+    def __init__(self, name):
+        self.name = name
+
+    def predict(self, features):
+        return logic.MODEL.predict(features)
+
+    def identity(self):
+        return (self.name, None)
+
+
+def test_recommendations_are_cached_per_model_identity():
+    """Test repeated profiles hit the cache and a new model identity misses"""
+    cache = logic.LRUCache(maxsize=16)
+    first = logic.recommend_batch([SAMPLE_CLIENT], model=_IdentifiedModel("a"), cache=cache)
+    again = logic.recommend_batch([SAMPLE_CLIENT], model=_IdentifiedModel("a"), cache=cache)
+    assert first == again
+    assert (cache.stats()["hits"], cache.stats()["misses"]) == (1, 1)
+
+    logic.recommend_batch([SAMPLE_CLIENT], model=_IdentifiedModel("b"), cache=cache)
+    assert cache.stats()["misses"] == 2
+
+
+def test_model_is_loaded_on_first_use():
+    """Test importing logic does not load the model until it is needed"""
+    script = (
+        "from app.clients.service import logic\n"
+        "assert not logic.MODEL_LOADER.loaded\n"
+        f"logic.interpret_and_calculate({SAMPLE_CLIENT!r})\n"
+        "assert logic.MODEL_LOADER.loaded\n"
+    )
+    subprocess.run([sys.executable, "-c", script], check=True)
+
+
+def test_retrained_default_model_misses_the_cache(tmp_path, monkeypatch):
+    """Test retraining the default artifact reloads it and its cached results are not reused"""
+    path = str(tmp_path / "model.joblib")
+    save_model_artifact(logic.MODEL, path)
+    monkeypatch.setattr(logic, "MODEL_LOADER", LazyModelLoader(path))
+    cache = logic.LRUCache(maxsize=16)
+    logic.recommend_batch([SAMPLE_CLIENT], cache=cache)
+    logic.recommend_batch([SAMPLE_CLIENT], cache=cache)
+    assert (cache.stats()["hits"], cache.stats()["misses"]) == (1, 1)
+    original = logic.get_model()
+
+    retrained = load_model_artifact(MODEL_CATALOG.artifact_path("Support Vector Machine"))
+    save_model_artifact(retrained, path)
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+    result = logic.recommend_batch([SAMPLE_CLIENT], cache=cache)[0]
+    assert cache.stats()["misses"] == 2 and logic.get_model() is not original
+    expected = logic.recommend_batch([SAMPLE_CLIENT], model=retrained, cache=None)[0]
+    assert result["baseline"] == expected["baseline"]
+
+
+def test_lazy_loader_loads_once_across_threads(tmp_path, monkeypatch):
+    """Test concurrent first calls share a single artifact load"""
+    path = str(tmp_path / "model.joblib")
+    save_model_artifact(logic.MODEL, path)
+    calls = []
+    monkeypatch.setattr(
+        model_helper,
+        "load_model_artifact",
+        lambda artifact: calls.append(artifact) or load_model_artifact(artifact),
+    )
+    loader = LazyModelLoader(path)
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        models = list(pool.map(lambda _: loader.get(), range(8)))
+    assert len(calls) == 1
+    assert all(model is models[0] for model in models)
@@ -0,0 +1,67 @@
+import asyncio
+
+import numpy as np
+
+from app.clients.service import metrics, ml_models_router
+from app.clients.service.inference import InferenceExecutor
+from app.clients.service.ml_models import model_registry
+from tests.samples import FEATURES
+
+MODEL = "Linear Regression"
+
+
+def _sample(name, **labels):
+    return metrics.METRICS_REGISTRY.get_sample_value(name, labels) or 0
+
+
+def test_predict_records_every_stage(client, monkeypatch):
+    """Test a single prediction observes validate, build, predict and serialize once each"""
+    monkeypatch.setattr(ml_models_router, "prediction_cache", None)
+    before = {
+        stage: _sample("model_stage_seconds_count", model=MODEL, stage=stage)
+        for stage in metrics.STAGES
+    }
+    assert client.post(f"/ml_models/predict/{MODEL}", json=FEATURES).status_code == 200
+    for stage in metrics.STAGES:
+        assert _sample("model_stage_seconds_count", model=MODEL, stage=stage) == before[stage] + 1
+
+
+def test_batch_prediction_counts_rows(client):
+    """Test /predict/batch records its validation timings and the rows per predict call"""
+    rows_before = _sample("model_predict_rows_sum", model=MODEL)
+    calls_before = _sample("model_predict_rows_count", model=MODEL)
+    validate_before = _sample("model_stage_seconds_count", model=MODEL, stage="validate")
+    response = client.post(
+        "/ml_models/predict/batch", params={"model_name": MODEL}, json={"rows": [FEATURES] * 5}
+    )
+    assert response.status_code == 200
+    assert _sample("model_predict_rows_sum", model=MODEL) == rows_before + 5
+    assert _sample("model_predict_rows_count", model=MODEL) == calls_before + 1
+    assert _sample("model_stage_seconds_count", model=MODEL, stage="validate") == (
+        validate_before + 1
+    )
+
+
+def test_metrics_endpoint_exports_prometheus_text(client):
+    """Test the endpoint serves histograms in the Prometheus text format"""
+    client.post(f"/ml_models/predict/{MODEL}", json=FEATURES)
+    response = client.get("/ml_models/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert "# TYPE model_stage_seconds histogram" in response.text
+    assert f'model_stage_seconds_bucket{{le="0.001",model="{MODEL}",stage="predict"}}' in (
+        response.text
+    )
+    assert f'model_predict_rows_count{{model="{MODEL}"}}' in response.text
+
+
+def test_process_pool_predictions_are_recorded_in_parent():
+    """Test timings measured in a pool process are recorded by the calling process"""
+    model = model_registry.get(MODEL)
+    executor = InferenceExecutor(kind="process", workers=1)
+    calls_before = _sample("model_predict_rows_count", model=MODEL)
+    try:
+        asyncio.run(executor.predict(model, np.zeros((3, 31))))
+    finally:
+        executor.shutdown()
+    assert _sample("model_predict_rows_count", model=MODEL) == calls_before + 1
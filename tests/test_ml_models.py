@@ -0,0 +1,213 @@
+import os
+import subprocess
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from fastapi import status
+
+from app.clients.service.ml_models import (
+    InterfaceBaseMLModel,
+    MLModelManager,
+    MLModelRepository,
+    ModelRegistry,
+    model_manager,
+)
+from tests.samples import FEATURES
+
+
+def _count_loads(monkeypatch):
+    """Record every artifact unpickled by InterfaceBaseMLModel.load"""
+    loads = []
+    original = InterfaceBaseMLModel.load
+
+    def counting_load(path):
+        loads.append(path)
+        return original(path)
+
+    monkeypatch.setattr(InterfaceBaseMLModel, "load", staticmethod(counting_load))
+    return loads
+
+
+def test_registry_loads_only_when_artifact_changes(artifact_catalog, monkeypatch):
+    """Test a resident model survives a touch and is reloaded when the contents change"""
+    loads = _count_loads(monkeypatch)
+    catalog = artifact_catalog("Linear Regression")
+    registry = ModelRegistry(MLModelRepository(catalog))
+    path = catalog.artifact_path("Linear Regression")
+    first = registry.get("Linear Regression")
+    assert registry.get("Linear Regression") is first and len(loads) == 1
+
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    assert registry.get("Linear Regression") is first and len(loads) == 1
+
+    with open(path, "ab") as artifact:
+        artifact.write(b"\0")
+    assert registry.get("Linear Regression") is not first and len(loads) == 2
+
+
+def test_registry_loads_are_single_flight(artifact_catalog, monkeypatch):
+    """Test concurrent first lookups share a single artifact load"""
+    loads = _count_loads(monkeypatch)
+    registry = ModelRegistry(MLModelRepository(artifact_catalog("Linear Regression")))
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        models = list(pool.map(lambda _: registry.get("Linear Regression"), range(16)))
+    assert len(loads) == 1
+    assert all(model is models[0] for model in models)
+
+
+def test_predict_reuses_resident_models(client, monkeypatch):
+    """Test repeated predictions do not unpickle the artifact again"""
+    client.post("/ml_models/predict", json=FEATURES)
+    loads = _count_loads(monkeypatch)
+    for model_name in ("Random Forest Regressor", "Linear Regression", "Support Vector Machine"):
+        for _ in range(2):
+            response = client.post(f"/ml_models/predict/{model_name}", json=FEATURES)
+            assert response.status_code == status.HTTP_200_OK
+            assert response.json()["model"] == model_name
+    assert len(loads) <= 2
+
+    response = client.post("/ml_models/predict/Unknown", json=FEATURES)
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+def test_list_models_reads_the_catalog(client):
+    """Test listing describes every model and predictions record their latency"""
+    client.post("/ml_models/predict/Linear Regression", json=FEATURES)
+    response = client.get("/ml_models/list")
+    assert response.status_code == status.HTTP_200_OK
+    body = response.json()
+    assert body["models"] == [
+        "Linear Regression",
+        "Random Forest Regressor",
+        "Support Vector Machine",
+    ]
+    details = {model["name"]: model for model in body["catalog"]}
+    forest = details["Random Forest Regressor"]
+    assert forest["artifact_size"] == os.path.getsize(forest["artifact_path"])
+    assert forest["feature_count"] == 31 and forest["trained_at"]
+    assert details["Linear Regression"]["last_latency_ms"] > 0
+
+    assert client.get("/ml_models/info/Support Vector Machine").json()["class"] == "SVMModel"
+    assert client.get("/ml_models/info/Unknown").status_code == status.HTTP_404_NOT_FOUND
+
+
+def test_catalog_does_not_import_models():
+    """Test describing models never imports the model classes or sklearn"""
+    script = (
+        "import sys\n"
+        "from app.clients.service.model_catalog import MODEL_CATALOG\n"
+        "assert len(MODEL_CATALOG.describe_all()) == 3\n"
+        "assert 'sklearn' not in sys.modules\n"
+        "assert 'app.clients.service.ml_models' not in sys.modules\n"
+    )
+    subprocess.run([sys.executable, "-c", script], check=True)
+
+
+def test_predict_batch_accepts_rows_and_columns(client):
+    """Test row and columnar payloads give the same predictions as single-row predict"""
+    second = dict(FEATURES, age=45, time_unemployed=3)
+    single = [
+        client.post("/ml_models/predict", json=row).json()["prediction"][0]
+        for row in (FEATURES, second)
+    ]
+    response = client.post("/ml_models/predict/batch", json={"rows": [FEATURES, second]})
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["predictions"] == single
+
+    columns = {name: [value, second[name]] for name, value in FEATURES.items()}
+    response = client.post(
+        "/ml_models/predict/batch",
+        params={"model_name": "Linear Regression"},
+        json={"columns": columns},
+    )
+    assert response.json()["model"] == "Linear Regression"
+    assert response.json()["count"] == 2
+
+
+def test_predict_batch_rejects_invalid_payloads(client):
+    """Test malformed batches are rejected before predicting"""
+    incomplete = {key: value for key, value in FEATURES.items() if key != "age"}
+    columns = {name: [value] for name, value in FEATURES.items()}
+    for payload in (
+        {"rows": [FEATURES, incomplete]},
+        {"columns": dict(columns, age=[1, 2])},
+        {"rows": [FEATURES], "columns": columns},
+        {"rows": []},
+    ):
+        response = client.post("/ml_models/predict/batch", json=payload)
+        assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+
+def _manager_for(catalog):
+    """A manager with its own registry over a catalog"""
+    return MLModelManager(MLModelRepository(catalog), ModelRegistry(MLModelRepository(catalog)))
+
+
+def test_switch_is_versioned_and_rolls_back_without_loading(artifact_catalog, monkeypatch):
+    """Test a swap bumps the version, in-flight models stay usable and rollback is instant"""
+    loads = _count_loads(monkeypatch)
+    manager = _manager_for(artifact_catalog("Random Forest Regressor", "Linear Regression"))
+    assert not manager.switch_model("Support Vector Machine")
+    assert not manager.switch_model("Unknown")
+    assert manager.active.version == 1 and manager.previous is None
+
+    in_flight = manager.get_current_model()
+    active = manager.swap("Linear Regression")
+    assert (active.name, active.version) == ("Linear Regression", 2)
+    assert active.duration_ms >= active.load_ms + active.warmup_ms > 0
+    assert in_flight.predict([list(FEATURES.values())]).shape == (1,)
+    assert len(loads) == 2
+
+    rolled_back = manager.rollback()
+    assert (rolled_back.name, rolled_back.version) == ("Random Forest Regressor", 3)
+    assert manager.get_current_model() is in_flight
+    assert manager.rollback().name == "Linear Regression" and len(loads) == 2
+
+
+def test_requests_use_the_old_model_while_the_target_loads(artifact_catalog, monkeypatch):
+    """Test the current model is only replaced once the target finished loading"""
+    manager = _manager_for(artifact_catalog("Random Forest Regressor", "Linear Regression"))
+    current = manager.get_current_model()
+    original = InterfaceBaseMLModel.load
+    loading, release = threading.Event(), threading.Event()
+
+    def blocking_load(path):
+        loading.set()
+        release.wait(5)
+        return original(path)
+
+    monkeypatch.setattr(InterfaceBaseMLModel, "load", staticmethod(blocking_load))
+    switch = threading.Thread(target=manager.swap, args=("Linear Regression",))
+    switch.start()
+    assert loading.wait(5)
+    assert manager.get_current_model() is current
+    assert manager.active.version == 1
+    release.set()
+    switch.join(5)
+    assert str(manager.get_current_model()) == "Linear Regression"
+    assert manager.active.version == 2
+
+
+def test_switch_and_rollback_endpoints(client):
+    """Test the endpoints report the swap timings and the rollback restores the model"""
+    try:
+        response = client.post("/ml_models/switch/Linear Regression")
+        assert response.status_code == status.HTTP_200_OK
+        switched = response.json()
+        assert switched["model"] == "Linear Regression" and switched["duration_ms"] > 0
+        current = client.get("/ml_models/current").json()
+        assert current["current_model"] == "Linear Regression"
+        assert current["version"] == switched["version"]
+
+        response = client.post("/ml_models/rollback")
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["model"] == "Random Forest Regressor"
+        assert response.json()["version"] == switched["version"] + 1
+        assert client.get("/ml_models/current").json()["previous_model"] == "Linear Regression"
+
+        response = client.post("/ml_models/switch/Unknown")
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+    finally:
+        model_manager.switch_model("Random Forest Regressor")
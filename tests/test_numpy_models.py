@@ -0,0 +1,68 @@
+import subprocess
+import sys
+
+import numpy as np
+
+from app.clients.service import logic, numpy_models
+from app.clients.service.flat_forest import FlatForestRegressor
+from app.clients.service.model_catalog import MODEL_CATALOG
+from app.clients.service.model_helper import load_model_artifact
+from tests.samples import SAMPLE_CLIENT
+
+
+def _matrix(rows):
+    rng = np.random.default_rng(7)
+    return rng.integers(0, 10, size=(rows, 31)).astype(float)
+
+
+def test_exports_predict_like_sklearn(tmp_path):
+    """Test every exported model round-trips and predicts like its sklearn original"""
+    matrix = _matrix(numpy_models.RBF_ROW_BLOCK + 10)
+    for model_name in MODEL_CATALOG.names():
+        estimator = load_model_artifact(MODEL_CATALOG.artifact_path(model_name), mmap_mode=None)
+        path = str(tmp_path / f"{model_name}.npz")
+        numpy_models.save_numpy_artifact(estimator, path)
+        exported = numpy_models.load_numpy_artifact(path)
+        if model_name == "Support Vector Machine":
+            np.testing.assert_allclose(
+                exported.predict(matrix), estimator.predict(matrix), rtol=1e-12
+            )
+        else:
+            np.testing.assert_array_equal(exported.predict(matrix), estimator.predict(matrix))
+    assert isinstance(exported, numpy_models.NumpyRBFRegressor)
+
+
+def test_numpy_models_recommend_like_sklearn():
+    """Test recommendations from the shipped exports match the sklearn models"""
+    for model_name in MODEL_CATALOG.names():
+        path = MODEL_CATALOG.artifact_path(model_name)
+        estimator = load_model_artifact(path, mmap_mode=None)
+        exported = numpy_models.load_numpy_artifact(numpy_models.numpy_artifact_path(path))
+        expected = logic.recommend_batch([SAMPLE_CLIENT], 5, estimator, cache=None)[0]
+        result = logic.recommend_batch([SAMPLE_CLIENT], 5, exported, cache=None)[0]
+        assert [names for _, names in result["interventions"]] == [
+            names for _, names in expected["interventions"]
+        ]
+        np.testing.assert_allclose(result["baseline"], expected["baseline"], rtol=1e-12)
+    assert isinstance(exported, (FlatForestRegressor, numpy_models.NumpyRBFRegressor))
+
+
+def test_numpy_backend_serves_without_sklearn():
+    """Test the app starts, predicts and recommends with MODEL_BACKEND=numpy without sklearn"""
+    script = (
+        "import os, sys\n"
+        "os.environ['MODEL_BACKEND'] = 'numpy'\n"
+        "import app.main\n"
+        "from app.clients.service import logic\n"
+        "from app.clients.service.ml_models import model_registry\n"
+        "from app.clients.service.model_catalog import MODEL_CATALOG\n"
+        "from tests.samples import SAMPLE_CLIENT\n"
+        "for name in MODEL_CATALOG.names():\n"
+        "    model = model_registry.get(name)\n"
+        "    assert model.model_path.endswith('.npz'), model.model_path\n"
+        "    assert model.predict([[1.0] * 31]).shape == (1,)\n"
+        "    logic.recommend_batch([SAMPLE_CLIENT], 3, model)\n"
+        "logic.recommend_batch([SAMPLE_CLIENT])\n"
+        "assert 'sklearn' not in sys.modules\n"
+    )
+    subprocess.run([sys.executable, "-c", script], check=True)
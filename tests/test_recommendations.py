@@ -0,0 +1,202 @@
+# pylint: disable=too-few-public-methods
+import asyncio
+import json
+from types import SimpleNamespace
+
+from fastapi import status
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.clients.service import client_service, recommendation_service
+from app.clients.service.logic import recommend_batch
+from app.clients.service.ml_models import model_manager
+from app.clients.service.recommendation_service import (
+    backfill_recommendations,
+    client_profile,
+    get_recommendation_model,
+    model_version,
+    stream_recommendations,
+)
+from app.models import Client, ClientRecommendation
+from tests.samples import SAMPLE_CLIENT
+
+
+def test_batch_recommendations(client):
+    """Test batch recommendations return top_k combinations per client"""
+    payload = {"clients": [SAMPLE_CLIENT, dict(SAMPLE_CLIENT, age="40")], "top_k": 2}
+    response = client.post("/recommendations/batch", json=payload)
+    assert response.status_code == status.HTTP_200_OK
+    results = response.json()["results"]
+    assert len(results) == 2
+    assert all(len(result["interventions"]) == 2 for result in results)
+
+
+def test_batch_recommendations_missing_feature(client):
+    """Test a profile missing a feature is rejected"""
+    profile = {key: value for key, value in SAMPLE_CLIENT.items() if key != "age"}
+    response = client.post("/recommendations/batch", json={"clients": [profile]})
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+def test_search_recommendations_with_constraints(client):
+    """Test single-client search honours max_interventions and include"""
+    payload = {
+        "client": SAMPLE_CLIENT,
+        "top_k": 2,
+        "max_interventions": 2,
+        "include": ["Specialized Services"],
+    }
+    response = client.post("/recommendations/search", json=payload)
+    assert response.status_code == status.HTTP_200_OK
+    for _, names in response.json()["interventions"]:
+        assert "Specialized Services" in names and len(names) <= 2
+
+
+def test_search_recommendations_unknown_intervention(client):
+    """Test unknown intervention names are rejected"""
+    payload = {"client": SAMPLE_CLIENT, "exclude": ["Not An Intervention"]}
+    response = client.post("/recommendations/search", json=payload)
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+def test_recommendation_cache_stats(client):
+    """Test repeated requests are served from the cache"""
+    payload = {"clients": [dict(SAMPLE_CLIENT, age="57")]}
+    client.post("/recommendations/batch", json=payload)
+    before = client.get("/recommendations/cache").json()
+    client.post("/recommendations/batch", json=payload)
+    after = client.get("/recommendations/cache").json()
+    assert after["hits"] == before["hits"] + 1
+
+
+def test_stream_recommendations_scores_lazily():
+    """Test the stream only pulls the first chunk before emitting its first line"""
+    consumed = []
+
+    def clients():
+        for client_id in range(1, 6):
+            consumed.append(client_id)
+            yield SimpleNamespace(id=client_id, **dict(SAMPLE_CLIENT, age=str(20 + client_id)))
+
+    stream = stream_recommendations(clients(), top_k=1, chunk_size=2)
+    first = json.loads(next(stream))
+    assert first["client_id"] == 1 and consumed == [1, 2]
+    rest = [json.loads(line)["client_id"] for line in stream]
+    assert rest == [2, 3, 4, 5]
+
+
+def test_client_recommendation_is_materialized(client, test_db, case_worker_headers):
+    """Test the first read stores the recommendation and later reads use the stored row"""
+    response = client.get("/clients/1/recommendations?top_k=2", headers=case_worker_headers)
+    assert response.status_code == status.HTTP_200_OK
+    body = response.json()
+    expected = recommend_batch([client_profile(test_db.get(Client, 1))], 2)[0]
+    assert body["baseline"] == expected["baseline"]
+    assert [tuple(pair) for pair in body["interventions"]] == expected["interventions"]
+
+    stored = test_db.get(ClientRecommendation, 1)
+    assert stored.model_version == model_version(get_recommendation_model())
+    stored.baseline = -1.0
+    test_db.commit()
+    response = client.get("/clients/1/recommendations", headers=case_worker_headers)
+    assert response.json()["baseline"] == -1.0
+
+    response = client.get("/clients/999/recommendations", headers=case_worker_headers)
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+def test_client_endpoints_score_off_the_event_loop(
+    client, monkeypatch, admin_headers, case_worker_headers
+):
+    """Test refreshing recommendations on read and on update never runs on the event loop"""
+    refresh = recommendation_service.refresh_recommendations
+    loop_threads = []
+
+    def recording_refresh(*args, **kwargs):
+        try:
+            asyncio.get_running_loop()
+            loop_threads.append(True)
+        except RuntimeError:
+            loop_threads.append(False)
+        return refresh(*args, **kwargs)
+
+    monkeypatch.setattr(recommendation_service, "refresh_recommendations", recording_refresh)
+    monkeypatch.setattr(client_service, "refresh_recommendations", recording_refresh)
+    response = client.get("/clients/1/recommendations", headers=case_worker_headers)
+    assert response.status_code == status.HTTP_200_OK
+    assert client.put("/clients/1", json={"age": 61}, headers=admin_headers).status_code == 200
+    assert loop_threads == [False, False]
+
+
+def test_backfill_skips_up_to_date_rows(test_db):
+    """Test the backfill job only rewrites missing or stale recommendations"""
+    assert backfill_recommendations(test_db, chunk_size=1) == 2
+    assert backfill_recommendations(test_db) == 0
+    test_db.get(ClientRecommendation, 2).model_version = "retired model"
+    test_db.commit()
+    assert backfill_recommendations(test_db) == 1
+
+
+def test_update_and_delete_keep_recommendations_current(client, test_db, admin_headers):
+    """Test changing answers refreshes the stored row and deleting the client removes it"""
+    backfill_recommendations(test_db)
+    response = client.put("/clients/1", json={"age": 60}, headers=admin_headers)
+    assert response.status_code == status.HTTP_200_OK
+    test_db.expire_all()
+    expected = recommend_batch(
+        [client_profile(test_db.get(Client, 1))], recommendation_service.MATERIALIZED_TOP_K
+    )[0]
+    assert test_db.get(ClientRecommendation, 1).baseline == expected["baseline"]
+
+    client.delete("/clients/1", headers=admin_headers)
+    test_db.expire_all()
+    assert test_db.get(ClientRecommendation, 1) is None
+
+
+def test_update_is_saved_when_rescoring_fails(
+    client, test_db, monkeypatch, admin_headers, case_worker_headers
+):
+    """Test a scoring failure after an update leaves the recommendation to be read lazily"""
+    backfill_recommendations(test_db)
+
+    def failing_refresh(*args, **kwargs):
+        raise RuntimeError("model unavailable")
+
+    monkeypatch.setattr(client_service, "refresh_recommendations", failing_refresh)
+    response = client.put("/clients/1", json={"age": 61}, headers=admin_headers)
+    assert response.status_code == status.HTTP_200_OK and response.json()["age"] == 61
+    test_db.expire_all()
+    assert test_db.get(Client, 1).age == 61
+    assert test_db.get(ClientRecommendation, 1) is None
+
+    response = client.get("/clients/1/recommendations", headers=case_worker_headers)
+    expected = recommend_batch([client_profile(test_db.get(Client, 1))])[0]
+    assert response.json()["baseline"] == expected["baseline"]
+
+
+class _TrackedSession(Session):
+    """A session that records when it is closed"""
+
+    closed = []
+
+    def close(self):
+        _TrackedSession.closed.append(self)
+        super().close()
+
+
+def test_model_switch_refreshes_recommendations(client, test_db, monkeypatch):
+    """Test switching the active model re-tags the stored recommendations in a new session"""
+    backfill_recommendations(test_db)
+    sessions = sessionmaker(bind=test_db.get_bind(), class_=_TrackedSession)
+    monkeypatch.setattr(recommendation_service, "SessionLocal", sessions)
+    _TrackedSession.closed.clear()
+    try:
+        response = client.post("/ml_models/switch/Linear Regression")
+        assert response.status_code == status.HTTP_200_OK
+        test_db.expire_all()
+        version = model_version(get_recommendation_model())
+        assert version.startswith("Linear Regression")
+        rows = test_db.query(ClientRecommendation).all()
+        assert len(rows) == 2 and all(row.model_version == version for row in rows)
+        assert len(_TrackedSession.closed) == 1
+    finally:
+        model_manager.switch_model("Random Forest Regressor")
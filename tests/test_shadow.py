@@ -0,0 +1,129 @@
+# pylint: disable=too-few-public-methods
+import threading
+import time
+
+import numpy as np
+from fastapi import status
+
+from app.clients.service import logic, ml_models_router, recommendations_router
+from app.clients.service.ml_models import model_registry
+from app.clients.service.shadow import ShadowEvaluator
+from tests.samples import FEATURES, SAMPLE_CLIENT
+
+
+class _InterventionModel:
+    """Scores a row by weighting its intervention columns"""
+
+    def __init__(self, weights):
+        self.weights = np.asarray(weights, dtype=float)
+
+    def predict(self, matrix):
+        return np.asarray(matrix)[:, -len(self.weights) :] @ self.weights
+
+
+class _FixedRegistry:
+    """A registry serving fixed models by name"""
+
+    def __init__(self, models):
+        self.models = models
+
+    def get(self, model_name):
+        return self.models[model_name]
+
+
+class _BlockingRegistry:
+    """A registry whose lookups wait until released"""
+
+    def __init__(self):
+        self.called = threading.Event()
+        self.release = threading.Event()
+
+    def get(self, model_name):
+        self.called.set()
+        self.release.wait(5)
+        return model_registry.get(model_name)
+
+
+def test_shadow_predictions_record_disagreement():
+    """Test shadows score the same rows off the caller's thread and skip the primary"""
+    primary = model_registry.get("Random Forest Regressor")
+    shadow = model_registry.get("Linear Regression")
+    matrix = np.array([list(FEATURES.values()), list(dict(FEATURES, age=60).values())], float)
+    evaluator = ShadowEvaluator(["Linear Regression", "Random Forest Regressor"])
+    assert evaluator.submit_prediction(str(primary), matrix, primary.predict(matrix))
+    evaluator.join()
+
+    [comparison] = evaluator.snapshot()["comparisons"]
+    assert (comparison["primary"], comparison["shadow"]) == (str(primary), str(shadow))
+    assert comparison["calls"] == 1 and comparison["rows"] == 2
+    differences = np.abs(shadow.predict(matrix) - primary.predict(matrix))
+    assert np.isclose(comparison["mean_abs_diff"], differences.mean())
+    assert np.isclose(comparison["max_abs_diff"], differences.max())
+    assert comparison["latency_ms"]["p99"] > 0
+
+
+def test_top_choice_agreement_compares_best_combinations():
+    """Test agreement counts only the best combination, not the order of the runners-up"""
+    primary = _InterventionModel([4, 2, 1, -9, -9, -9, -9])
+    registry = _FixedRegistry(
+        {
+            # Same best combination, second and third swapped
+            "agrees": _InterventionModel([4, 1, 2, -9, -9, -9, -9]),
+            "disagrees": _InterventionModel([-9, 2, 1, 4, -9, -9, -9]),
+        }
+    )
+    results = logic.recommend_batch([SAMPLE_CLIENT], 3, primary, cache=None)
+    evaluator = ShadowEvaluator(["agrees", "disagrees"], registry=registry)
+    assert evaluator.submit_recommendations("primary", [SAMPLE_CLIENT], 3, {}, results)
+    evaluator.join()
+
+    agreement = {
+        comparison["shadow"]: comparison["top_choice_agreement"]
+        for comparison in evaluator.snapshot()["comparisons"]
+    }
+    assert agreement == {"agrees": 1.0, "disagrees": 0.0}
+
+
+def test_full_queue_drops_instead_of_waiting():
+    """Test submitting to a full queue returns at once and counts the dropped work"""
+    registry = _BlockingRegistry()
+    evaluator = ShadowEvaluator(["Linear Regression"], queue_size=1, registry=registry)
+    matrix = np.zeros((1, 31))
+    assert evaluator.submit_prediction("Random Forest Regressor", matrix, [0.0])
+    assert registry.called.wait(5)
+    started = time.perf_counter()
+    assert evaluator.submit_prediction("Random Forest Regressor", matrix, [0.0])
+    assert not evaluator.submit_prediction("Random Forest Regressor", matrix, [0.0])
+    assert time.perf_counter() - started < 0.1
+    registry.release.set()
+    evaluator.join()
+    snapshot = evaluator.snapshot()
+    assert (snapshot["submitted"], snapshot["dropped"]) == (2, 1)
+    assert snapshot["comparisons"][0]["calls"] == 2
+
+
+def test_shadow_endpoint_reports_predict_and_recommender(client, monkeypatch):
+    """Test live predictions and recommendations are shadowed and the stats are queryable"""
+    assert client.get("/ml_models/shadow").json() == {"enabled": False}
+    evaluator = ShadowEvaluator(["Linear Regression"])
+    monkeypatch.setattr(ml_models_router, "prediction_cache", None)
+    monkeypatch.setattr(ml_models_router, "shadow_evaluator", evaluator)
+    monkeypatch.setattr(recommendations_router, "shadow_evaluator", evaluator)
+    primary = client.post("/ml_models/predict", json=FEATURES).json()
+    assert primary["model"] == "Random Forest Regressor"
+    response = client.post("/recommendations/search", json={"client": SAMPLE_CLIENT})
+    assert response.status_code == status.HTTP_200_OK
+    evaluator.join()
+
+    report = client.get("/ml_models/shadow").json()
+    comparisons = {comparison["route"]: comparison for comparison in report["comparisons"]}
+    assert comparisons["predict"]["calls"] == 1 and comparisons["recommend"]["calls"] == 1
+    assert comparisons["predict"]["shadow"] == "Linear Regression"
+    shadow_top, primary_top = (
+        logic.search_interventions(SAMPLE_CLIENT, model=model_registry.get(name))["interventions"]
+        for name in ("Linear Regression", "Random Forest Regressor")
+    )
+    assert comparisons["recommend"]["top_choice_agreement"] == float(
+        shadow_top[-1][1] == primary_top[-1][1]
+    )
+    assert report["dropped"] == 0
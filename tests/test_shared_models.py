@@ -0,0 +1,72 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from app.clients.service import forest, logic, shared_models
+from app.clients.service.flat_forest import FlatForestRegressor
+from app.clients.service.ml_models import MLModelRepository, ModelRegistry
+from app.clients.service.model_catalog import MODEL_CATALOG
+from app.clients.service.model_helper import load_model_artifact
+from tests.samples import SAMPLE_CLIENT, forest_matrix
+
+
+def test_flat_forest_is_bit_identical_to_predict():
+    """Test the flattened forest reproduces RandomForestRegressor.predict exactly"""
+    flat = FlatForestRegressor.from_forest(logic.MODEL)
+    assert flat.n_estimators == len(logic.MODEL.estimators_)
+    assert np.array_equal(flat.predict(forest_matrix()), logic.MODEL.predict(forest_matrix()))
+
+
+def test_shared_exports_are_mapped_and_reused(tmp_path):
+    """Test each artifact is exported once, then memory-mapped with identical predictions"""
+    for model_name in MODEL_CATALOG.names():
+        path = MODEL_CATALOG.artifact_path(model_name)
+        shared = shared_models.load_shared(path, str(tmp_path))
+        expected = load_model_artifact(path).predict(forest_matrix())
+        assert np.array_equal(shared.predict(forest_matrix()), expected)
+
+    exports = sorted(os.listdir(tmp_path))
+    assert len(exports) == len(MODEL_CATALOG.names())
+    mtimes = [os.stat(tmp_path / export).st_mtime_ns for export in exports]
+    flat = shared_models.load_shared(
+        MODEL_CATALOG.artifact_path("Random Forest Regressor"), str(tmp_path)
+    )
+    assert isinstance(flat, FlatForestRegressor) and isinstance(flat.threshold, np.memmap)
+    assert not flat.threshold.flags.writeable
+    assert [os.stat(tmp_path / export).st_mtime_ns for export in exports] == mtimes
+
+
+def test_threads_exporting_at_once_write_separate_files(tmp_path, monkeypatch):
+    """Test threads of one process exporting the same artifact never share a partial file"""
+    partials = []
+    save = shared_models.save_model_artifact
+
+    def recording_save(model, path):
+        partials.append(path)
+        save(model, path)
+
+    monkeypatch.setattr(shared_models, "save_model_artifact", recording_save)
+    path = MODEL_CATALOG.artifact_path("Linear Regression")
+    with ThreadPoolExecutor(4) as pool:
+        models = list(pool.map(lambda _: shared_models.load_shared(path, str(tmp_path)), range(4)))
+    assert len(set(partials)) == len(partials)
+    assert os.listdir(tmp_path) == [
+        os.path.basename(shared_models.shared_artifact_path(path, str(tmp_path)))
+    ]
+    expected = load_model_artifact(path).predict(forest_matrix())
+    assert all(np.array_equal(model.predict(forest_matrix()), expected) for model in models)
+
+
+def test_registry_serves_shared_models(tmp_path, artifact_catalog, monkeypatch):
+    """Test SHARED_MODELS=1 makes the registry map exports and keeps recommendations exact"""
+    monkeypatch.setenv("SHARED_MODELS", "1")
+    monkeypatch.setattr(shared_models, "SHARED_MODEL_DIR", str(tmp_path / "shared"))
+    catalog = artifact_catalog("Random Forest Regressor")
+    model = ModelRegistry(MLModelRepository(catalog)).get("Random Forest Regressor")
+
+    assert isinstance(model.model, FlatForestRegressor) and forest.supports(model)
+    expected = logic.recommend_batch(
+        [SAMPLE_CLIENT], 5, load_model_artifact(catalog.artifact_path(str(model))), cache=None
+    )
+    assert logic.recommend_batch([SAMPLE_CLIENT], 5, model, cache=None) == expected
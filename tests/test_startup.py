@@ -0,0 +1,53 @@
+import json
+import os
+import subprocess
+import sys
+
+from fastapi.testclient import TestClient
+
+from app import main
+from app.clients.service import logic
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _run(args, cwd):
+    env = dict(os.environ, PYTHONPATH=ROOT)
+    return subprocess.run(
+        [sys.executable, *args], cwd=cwd, env=env, capture_output=True, text=True, check=False
+    )
+
+
+def test_import_has_no_side_effects(tmp_path):
+    """Test importing app.main neither creates the database nor loads a model"""
+    script = (
+        "import os, app.main\n"
+        "from app.clients.service import logic\n"
+        "from app.clients.service.warmup import model_warmup\n"
+        "assert not os.path.exists('sql_app.db')\n"
+        "assert not logic.MODEL_LOADER.loaded and not model_warmup.status()['models']\n"
+    )
+    result = _run(["-c", script], tmp_path)
+    assert result.returncode == 0, result.stderr
+
+
+def test_preloading_app_runs_explicit_startup_steps():
+    """Test create_app's lifespan loads the models before serving and times each step"""
+    application = main.create_app(schema=False, preload_models=True)
+    assert [name for name, _ in main.startup_steps(False, True)] == ["load_models"]
+    with TestClient(application) as client:
+        assert list(application.state.startup_ms) == ["load_models"]
+        assert logic.MODEL_LOADER.loaded
+        assert client.get("/ml_models/ready").json()["ready"]
+
+
+def test_startup_report_measures_steps_against_budget(tmp_path):
+    """Test the report covers every import and start-up step and fails an exceeded budget"""
+    result = _run(["-m", "app.startup_report", "--json", "--budget-ms", "1"], tmp_path)
+    assert result.returncode == 1, result.stderr
+    report = json.loads(result.stdout)
+    steps = [step["step"] for step in report["steps"]]
+    assert steps[-3:] == ["create_app", "create_schema", "load_models"]
+    assert "app.main" in steps and os.path.exists(tmp_path / "sql_app.db")
+    assert report["total_ms"] > 1 and not report["within_budget"]
+    assert {model["status"] for model in report["models"].values()} == {"ready"}
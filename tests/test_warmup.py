@@ -0,0 +1,53 @@
+from fastapi import status
+
+from app.clients.service import ml_models_router
+from app.clients.service.ml_models import MLModelRepository, ModelRegistry
+from app.clients.service.model_catalog import MODEL_CATALOG
+from app.clients.service.warmup import ModelWarmup
+
+
+def _warmup_for(catalog):
+    """A warmup over the full catalog, with its own registry"""
+    registry = ModelRegistry(MLModelRepository(catalog))
+    return ModelWarmup(registry, catalog, rows=8), registry
+
+
+def test_warmup_loads_every_model(artifact_catalog):
+    """Test every catalogued model ends up resident with load and warmup timings"""
+    warmup, registry = _warmup_for(artifact_catalog(*MODEL_CATALOG.names()))
+    assert not warmup.ready
+    warmup.start().join()
+
+    report = warmup.status()
+    assert report["ready"] and report["duration_ms"] > 0
+    assert set(report["models"]) == set(MODEL_CATALOG.names())
+    for model_name, model in report["models"].items():
+        assert model["status"] == "ready"
+        assert model["load_ms"] >= 0 and model["warmup_ms"] > 0
+        assert registry.get(model_name).model is not None
+
+
+def test_failed_model_keeps_service_unready(artifact_catalog):
+    """Test a model that cannot be warmed is reported and blocks readiness"""
+    warmup, _ = _warmup_for(artifact_catalog("Linear Regression"))
+    warmup.run()
+
+    report = warmup.status()
+    assert not report["ready"] and report["duration_ms"] is not None
+    assert report["models"]["Linear Regression"]["status"] == "ready"
+    assert report["models"]["Random Forest Regressor"]["status"] == "failed"
+    assert report["models"]["Random Forest Regressor"]["error"]
+
+
+def test_ready_endpoint(client, artifact_catalog, monkeypatch):
+    """Test the readiness probe answers 503 until warmup has finished"""
+    warmup, _ = _warmup_for(artifact_catalog(*MODEL_CATALOG.names()))
+    monkeypatch.setattr(ml_models_router, "model_warmup", warmup)
+    response = client.get("/ml_models/ready")
+    assert response.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+    assert response.json()["ready"] is False
+
+    warmup.run()
+    response = client.get("/ml_models/ready")
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["models"]["Support Vector Machine"]["status"] == "ready"